@@ -1,5 +1,6 @@
 import asyncio
 import logging
+import threading
 from abc import ABC, abstractmethod
 from datetime import datetime
 from typing import List, Dict, Optional
@@ -7,11 +8,98 @@ from typing import List, Dict, Optional
 import httpx  # Modern asynchronous HTTP client
 from bs4 import BeautifulSoup # For parsing HTML
 from pymongo import MongoClient, UpdateOne
-from pymongo.errors import ConnectionFailure, OperationFailure
+from pymongo.errors import OperationFailure
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# MongoClient is thread-safe and pools its connections, so crawlers pointed at the same server share one
+# (a single monitor thread and pool) rather than each opening their own.
+_MONGO_CLIENTS: Dict[str, MongoClient] = {}
+_MONGO_CLIENTS_LOCK = threading.Lock()
+
+
+def get_mongo_client(mongo_uri: str) -> MongoClient:
+    """Returns the shared MongoClient for mongo_uri, creating it on first use."""
+    with _MONGO_CLIENTS_LOCK:
+        client = _MONGO_CLIENTS.get(mongo_uri)
+        if client is None:
+            client = _MONGO_CLIENTS[mongo_uri] = MongoClient(mongo_uri, serverSelectionTimeoutMS=5000, maxPoolSize=50) # 5 second timeout
+    return client
+
+
+def close_mongo_clients():
+    """Closes every shared MongoClient; call once when no crawler will touch the database again."""
+    with _MONGO_CLIENTS_LOCK:
+        for client in _MONGO_CLIENTS.values():
+            client.close()
+        _MONGO_CLIENTS.clear()
+
+class WriteBuffer:
+    """
+    Buffers article documents in-process and flushes them to MongoDB with one
+    unordered bulk upsert, either once `max_docs` accumulate or every
+    `flush_interval` seconds from a background task.
+    Uses 'url' as the unique identifier, same as the previous per-run bulk write.
+    """
+
+    def __init__(self, collection, label: str, max_docs: int = 500, flush_interval: float = 1.0):
+        self.collection = collection
+        self.label = label
+        self.max_docs = max_docs
+        self.flush_interval = flush_interval
+        self._docs: List[Dict] = []
+        self._lock = asyncio.Lock()
+        self._flush_task: Optional[asyncio.Task] = None
+
+    def start(self):
+        """Starts the periodic background flush. Must be called from a running event loop."""
+        if self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._periodic_flush())
+
+    async def _periodic_flush(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+    async def append(self, doc: Dict):
+        self._docs.append(doc)
+        if len(self._docs) >= self.max_docs:
+            await self.flush()
+
+    async def flush(self):
+        async with self._lock:
+            if not self._docs:
+                return
+            docs, self._docs = self._docs, []
+            operations = [UpdateOne({"url": doc["url"]}, {"$set": doc}, upsert=True) for doc in docs]
+            logger.info(f"Flushing {len(operations)} buffered articles to {self.label}.")
+            try:
+                # pymongo is blocking; keep the crawler's event loop free during the round-trip.
+                result = await asyncio.to_thread(self.collection.bulk_write, operations, ordered=False)
+                logger.info(
+                    f"Bulk write to MongoDB successful: "
+                    f"{result.inserted_count} inserted, "
+                    f"{result.matched_count} matched, "
+                    f"{result.modified_count} modified, "
+                    f"{result.upserted_count} upserted."
+                )
+            except OperationFailure as e:
+                logger.error(f"MongoDB bulk write operation failed: {e.details}", exc_info=True)
+            except Exception as e:
+                logger.error(f"An unexpected error occurred during MongoDB bulk write: {e}", exc_info=True)
+
+    async def close(self):
+        """Stops the background flush and drains whatever is still buffered."""
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+            self._flush_task = None
+        await self.flush()
+
 class BaseCrawler(ABC):
     """
     Abstract base class for news crawlers.
@@ -26,6 +114,7 @@ class BaseCrawler(ABC):
         self.db = None
         self.collection = None
         self._connect_db()
+        self.write_buffer = WriteBuffer(self.collection, label=f"{db_name}/{collection_name}")
         self.retry_delay: int = 5 # Default retry delay in seconds
         self.force_encoding: Optional[str] = None # Allow crawlers to force an encoding
 
@@ -46,17 +135,12 @@ class BaseCrawler(ABC):
     def _connect_db(self):
         """Establishes connection to MongoDB."""
         try:
-            self.client = MongoClient(self.mongo_uri, serverSelectionTimeoutMS=5000) # 5 second timeout
-            # The ismaster command is cheap and does not require auth.
-            self.client.admin.command('ismaster')
+            # MongoClient connects in the background; an unreachable server surfaces as ServerSelectionTimeoutError
+            # (after 5s) on the first query in run(), which runs off the event loop, instead of blocking startup here.
+            self.client = get_mongo_client(self.mongo_uri)
             self.db = self.client[self.db_name]
             self.collection = self.db[self.collection_name]
-            logger.info(f"Successfully connected to MongoDB: {self.mongo_uri}, using {self.db_name}/{self.collection_name}")
-        except ConnectionFailure:
-            logger.error(f"MongoDB connection failed to {self.mongo_uri}. Please check MongoDB instance and URI.", exc_info=True)
-            # Decide how to handle this: raise error, or allow to run without DB (if applicable)
-            # For a crawler, DB connection is usually critical.
-            raise
+            logger.info(f"MongoDB client created for {self.mongo_uri}, using {self.db_name}/{self.collection_name}")
         except Exception as e:
             logger.error(f"An unexpected error occurred during MongoDB connection: {e}", exc_info=True)
             raise
@@ -179,9 +263,20 @@ class BaseCrawler(ABC):
                 logger.info(f"No new news items found by {self.__class__.__name__}.")
                 return
 
-            articles_to_save = []
+            self.write_buffer.start()
+            saved_count = 0
             processed_urls = set() # To avoid processing duplicate URLs from news list
 
+            # Check which listed URLs already exist with a single query instead of one find_one per article
+            listed_urls = [item.get("url") for item in news_items if item.get("url")]
+            existing_urls = set()
+            if self.collection is not None and listed_urls:
+                existing_urls = {
+                    doc["url"] for doc in await asyncio.to_thread(
+                        lambda: list(self.collection.find({"url": {"$in": listed_urls}}, {"url": 1, "_id": 0}))
+                    )
+                }
+
             for item in news_items:
                 # Fetch content only if the article is new or we need to update it (not implemented yet)
                 article_url = item.get("url")
@@ -190,12 +285,7 @@ class BaseCrawler(ABC):
                     continue
 
                 # Check if article already exists
-                logger.debug(f"Checking DB for existing URL: {article_url}") # LOG URL being checked
-                existing_article = None
-                if self.collection is not None:
-                    existing_article = self.collection.find_one({"url": article_url})
-                
-                if existing_article:
+                if article_url in existing_urls:
                     logger.info(f"Article already exists in DB, skipping content fetch: {article_url}") # LOG if found
                     # Potentially update existing article here if needed in the future
                     continue
@@ -224,12 +314,13 @@ class BaseCrawler(ABC):
                         "analyzed": False, # Mark as not analyzed initially
                         # Add any other metadata common to all articles
                     }
-                    articles_to_save.append(article_data)
+                    await self.write_buffer.append(article_data)
+                    saved_count += 1
                 else:
                     logger.warning(f"Could not fetch content for {article_url}. It will not be saved.")
             
-            if articles_to_save:
-                await self.save_articles(articles_to_save)
+            if saved_count:
+                await self.write_buffer.flush()
             else:
                 logger.info(f"No new articles to save for {self.__class__.__name__}.")
 
@@ -241,7 +332,7 @@ class BaseCrawler(ABC):
 
     async def save_articles(self, articles: List[Dict]):
         """
-        Saves a list of fetched articles to MongoDB using bulk operations for efficiency.
+        Saves a list of fetched articles to MongoDB through the write buffer.
         Uses update_one with upsert=True to avoid duplicates based on URL.
         """
         if self.collection is None:
@@ -251,41 +342,15 @@ class BaseCrawler(ABC):
             logger.info("No articles to save.")
             return
 
-        operations = []
+        logger.info(f"Attempting to save/update {len(articles)} articles to {self.db_name}/{self.collection_name}.")
         for article in articles:
-            # Using 'url' as the unique identifier for an article.
-            # If an article with this URL already exists, it will be updated.
-            # If not, it will be inserted.
-            operations.append(
-                UpdateOne({"url": article["url"]}, {"$set": article}, upsert=True)
-            )
-
-        if not operations:
-            logger.info("No operations to perform for saving articles.")
-            return
-
-        logger.info(f"Attempting to save/update {len(operations)} articles to {self.db_name}/{self.collection_name}.")
-        try:
-            result = self.collection.bulk_write(operations)
-            logger.info(
-                f"Bulk write to MongoDB successful: "
-                f"{result.inserted_count} inserted, "
-                f"{result.matched_count} matched, "
-                f"{result.modified_count} modified, "
-                f"{result.upserted_count} upserted."
-            )
-        except OperationFailure as e:
-            logger.error(f"MongoDB bulk write operation failed: {e.details}", exc_info=True)
-            # Optionally, you could try individual inserts here as a fallback,
-            # or log which articles failed if `e.details` provides that info.
-        except Exception as e:
-            logger.error(f"An unexpected error occurred during MongoDB bulk write: {e}", exc_info=True)
+            await self.write_buffer.append(article)
+        await self.write_buffer.flush()
             
     async def close(self):
-        """Closes the httpx client and MongoDB client."""
+        """Drains the write buffer and closes the httpx client. The shared MongoClient is left open (see close_mongo_clients)."""
+        await self.write_buffer.close()
         await self.http_client.aclose()
-        if self.client:
-            self.client.close()
         logger.info(f"{self.__class__.__name__} clients closed.")
 
 # Example of how a concrete crawler might look (incomplete, for structure only)
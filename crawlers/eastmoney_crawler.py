@@ -3,7 +3,7 @@ import logging
 from typing import List, Dict, Optional
 from urllib.parse import urljoin
 import re
-import json
+import orjson
 import time
 from datetime import datetime
 
@@ -57,8 +57,8 @@ class EastmoneyCrawler(BaseCrawler):
             return news_items
 
         try:
-            data = json.loads(json_string)
-        except json.JSONDecodeError as e:
+            data = orjson.loads(json_string)
+        except orjson.JSONDecodeError as e:
             logger.error(f"JSON decoding failed for Kuaixun API response: {e}. String: {json_string[:500]}...")
             return news_items
 
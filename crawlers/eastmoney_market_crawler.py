@@ -7,7 +7,7 @@ from bs4 import BeautifulSoup
 import pandas as pd
 from motor.motor_asyncio import AsyncIOMotorClient
 from urllib.parse import urljoin
-import json
+import orjson
 import re
 
 logger = logging.getLogger(__name__)
@@ -63,7 +63,7 @@ class EastmoneyMarketCrawler:
                     # Remove JSONP wrapper if present
                     match = re.search(r"^.*?\\((.*)\\);?$", text, re.DOTALL)
                     json_str = match.group(1) if match else text
-                    data = json.loads(json_str)
+                    data = orjson.loads(json_str)
                     if data.get("success") and "result" in data and "data" in data["result"]:
                         records = data["result"]["data"]
                         if not records:
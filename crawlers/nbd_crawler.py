@@ -3,7 +3,7 @@ import logging
 from typing import List, Dict, Optional
 from urllib.parse import urljoin
 import re
-import json # Added for ld+json parsing
+import orjson # Added for ld+json parsing
 
 from crawlers.base_crawler import BaseCrawler
 from utils.date_utils import parse_date_string_to_datetime
@@ -139,7 +139,7 @@ class NbdCrawler(BaseCrawler):
         try:
             ld_json_script = soup.find("script", type="application/ld+json")
             if ld_json_script:
-                data = json.loads(ld_json_script.string)
+                data = orjson.loads(str(ld_json_script.string))  # orjson rejects str subclasses such as bs4.NavigableString
                 if isinstance(data, list): # Sometimes ld+json is a list of objects
                     data = data[0] if data else {}
                 
@@ -157,7 +157,7 @@ class NbdCrawler(BaseCrawler):
                     logger.info(f"ld+json found for {url}, but 'articleBody' or 'description' key was missing or content was not a non-empty string.")
             else:
                 logger.info(f"No ld+json script found on {url}.")
-        except json.JSONDecodeError:
+        except orjson.JSONDecodeError:
             logger.warning(f"Failed to parse ld+json for {url}.", exc_info=True)
         except Exception as e:
             logger.warning(f"Error processing ld+json for {url}: {e}", exc_info=True)
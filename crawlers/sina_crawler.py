@@ -2,7 +2,7 @@ import asyncio
 import logging
 from typing import List, Dict, Optional
 from urllib.parse import urljoin
-import json # For handling JSON data if Sina uses it for news lists
+import orjson # For handling JSON data if Sina uses it for news lists
 import datetime # For converting timestamp
 
 from crawlers.base_crawler import BaseCrawler
@@ -38,8 +38,8 @@ class SinaCrawler(BaseCrawler):
             json_str = json_str[:-1]
 
         try:
-            data = json.loads(json_str)
-        except json.JSONDecodeError as e:
+            data = orjson.loads(json_str)
+        except orjson.JSONDecodeError as e:
             logger.error(f"Failed to decode JSON from {self.start_url}. Error: {e}")
             logger.error(f"Received text snippet: {json_str[:1000]}")
             return news_items
@@ -1,13 +1,118 @@
 import smtplib
 import ssl
 import logging
+import threading
 from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
+from typing import Optional
 
 from config import settings
 
 logger = logging.getLogger(__name__)
 
+SMTP_SSL_PORT = 465  # Implicit TLS
+SMTP_STARTTLS_PORT = 587
+SMTP_TIMEOUT_SECONDS = 10  # Connect/read timeout; a port silently dropped by a firewall fails fast enough to try the fallback
+
+class EmailSender:
+    """
+    Keeps one authenticated SMTP session open across sends, so several messages in a run
+    pay the TCP + TLS + AUTH handshake once. Usable as a context manager; thread-safe.
+    Port 465 uses implicit TLS (no EHLO/STARTTLS/EHLO round trip); any other port uses STARTTLS.
+    If connecting on `port` fails, `fallback_port` is tried.
+    """
+    def __init__(self, smtp_server: str, port: int, sender_email: str, password: str, fallback_port: Optional[int] = None):
+        self.smtp_server = smtp_server
+        self.port = port
+        self.fallback_port = fallback_port
+        self.sender_email = sender_email
+        self.password = password
+        self._server: Optional[smtplib.SMTP] = None
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        self.connect()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _connect(self, port: int) -> smtplib.SMTP:
+        logger.info(f"Connecting to SMTP server {self.smtp_server}:{port}...")
+        context = ssl.create_default_context()
+        if port == SMTP_SSL_PORT:
+            return smtplib.SMTP_SSL(self.smtp_server, port, context=context, timeout=SMTP_TIMEOUT_SECONDS)  # TLS negotiated on connect
+        server = smtplib.SMTP(self.smtp_server, port, timeout=SMTP_TIMEOUT_SECONDS)
+        try:
+            server.starttls(context=context)  # Secure the connection
+        except Exception:
+            server.close()
+            raise
+        return server
+
+    def _open(self):
+        try:
+            server = self._connect(self.port)
+        except (smtplib.SMTPConnectError, OSError) as e:
+            if not self.fallback_port:
+                raise
+            # Some networks block 465; submission on 587 with STARTTLS usually still works
+            logger.warning(f"Could not connect on port {self.port} ({e}); falling back to port {self.fallback_port}.")
+            server = self._connect(self.fallback_port)
+        try:
+            server.login(self.sender_email, self.password)
+        except Exception:
+            server.close()
+            raise
+        self._server = server
+
+    def _close_quietly(self):
+        if self._server is None:
+            return
+        try:
+            self._server.quit()
+        except (smtplib.SMTPException, OSError):
+            self._server.close()
+        self._server = None
+
+    def _is_alive(self) -> bool:
+        """NOOP round-trip; servers drop idle sessions, so check before reusing one."""
+        if self._server is None:
+            return False
+        try:
+            return self._server.noop()[0] == 250
+        except (smtplib.SMTPException, OSError):
+            return False
+
+    def connect(self):
+        with self._lock:
+            if not self._is_alive():
+                self._close_quietly()
+                self._open()
+
+    def close(self):
+        with self._lock:
+            self._close_quietly()
+
+    def send(self, receiver_email: str, subject: str, body: str):
+        """Sends a plain-text message on the open session, reconnecting if the server has dropped it."""
+        message = MIMEText(body, "plain", "utf-8")
+        message["Subject"] = subject
+        message["From"] = self.sender_email
+        message["To"] = receiver_email
+        payload = message.as_string()
+
+        with self._lock:
+            if not self._is_alive():
+                self._close_quietly()
+                self._open()
+            try:
+                self._server.sendmail(self.sender_email, receiver_email, payload)
+            except smtplib.SMTPServerDisconnected:
+                # Dropped between the NOOP and the send; retry once on a fresh session
+                self._close_quietly()
+                self._open()
+                self._server.sendmail(self.sender_email, receiver_email, payload)
+
 class EmailService:
     """
     A service class for handling email sending operations.
@@ -17,7 +122,7 @@ class EmailService:
         Initializes the EmailService with credentials from the global settings.
         """
         self.smtp_server = "smtp.gmail.com"
-        self.port = 587  # For starttls
+        self.port = SMTP_SSL_PORT
         self.sender_email = settings.GMAIL_USERNAME
         self.password = settings.GMAIL_APP_PASSWORD
         self.receiver_email = settings.RECEIVER_EMAIL
@@ -25,6 +130,10 @@ class EmailService:
         if not all([self.sender_email, self.password, self.receiver_email]):
             raise ValueError("Email credentials (username, password, receiver) are not fully configured in settings.")
 
+        # Connects lazily on the first send and stays open for later ones
+        self._sender = EmailSender(self.smtp_server, self.port, self.sender_email, self.password,
+                                   fallback_port=SMTP_STARTTLS_PORT)
+
     def send_email(self, subject: str, body: str):
         """
         Sends an email with the given subject and body.
@@ -33,29 +142,16 @@ class EmailService:
             subject (str): The subject of the email.
             body (str): The body of the email (can be HTML or plain text).
         """
-        message = MIMEMultipart("alternative")
-        message["Subject"] = subject
-        message["From"] = self.sender_email
-        message["To"] = self.receiver_email
-
-        # Attach the body to the email
-        message.attach(MIMEText(body, "plain"))
-
         try:
-            # Create a secure SSL context
-            context = ssl.create_default_context()
-            
-            logger.info(f"Connecting to SMTP server {self.smtp_server}:{self.port}...")
-            with smtplib.SMTP(self.smtp_server, self.port) as server:
-                server.starttls(context=context)  # Secure the connection
-                server.login(self.sender_email, self.password)
-                server.sendmail(
-                    self.sender_email, self.receiver_email, message.as_string()
-                )
+            self._sender.send(self.receiver_email, subject, body)
             logger.info(f"Email alert titled '{subject[:30]}...' sent successfully to {self.receiver_email}.")
         except smtplib.SMTPAuthenticationError as e:
             logger.error(f"SMTP Authentication Error: Failed to send email. Please check your Gmail username and app password. Error: {e}")
             raise
         except Exception as e:
             logger.error(f"An error occurred while sending email: {e}", exc_info=True)
-            raise 
\ No newline at end of file
+            raise 
+
+    def close(self):
+        """Closes the SMTP session, if one is open."""
+        self._sender.close()
@@ -2,7 +2,7 @@ import logging
 from datetime import datetime
 from pymongo import MongoClient, UpdateOne
 from market_data.finnhub_adapter import FinnhubAdapter
-import asyncio
+from utils.event_loop import run_async
 
 # MongoDB config
 MONGO_URI = "mongodb://localhost:27017/"
@@ -20,8 +20,8 @@ async def fetch_and_save_finnhub_news():
     collection = db[COLLECTION_NAME]
 
     # Fetch news from Finnhub
-    adapter = FinnhubAdapter()
-    news_items = await adapter.get_latest_market_news(category='general')
+    async with FinnhubAdapter() as adapter:
+        news_items = await adapter.get_latest_market_news(category='general')
     if not news_items:
         logger.warning("No news items fetched from Finnhub.")
         return
@@ -69,4 +69,4 @@ async def fetch_and_save_finnhub_news():
     logger.info(f"Total new articles processed: {new_count}")
 
 if __name__ == "__main__":
-    asyncio.run(fetch_and_save_finnhub_news()) 
\ No newline at end of file
+    run_async(fetch_and_save_finnhub_news()) 
\ No newline at end of file
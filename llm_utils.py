@@ -1,6 +1,12 @@
 import os
 import sys
+import threading
 import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable
+import httpx
 from config import settings
 script_start_time = time.time()
 print(f"{script_start_time:.2f}: Script started (using google-genai SDK pattern with client.models.generate_content).")
@@ -8,6 +14,7 @@ print(f"{script_start_time:.2f}: Script started (using google-genai SDK pattern
 try:
     import_start_genai = time.time()
     from google import genai # Using the newer google-genai package
+    from google.genai import types as genai_types
     print(f"{time.time():.2f}: Imported google.genai (took {time.time() - import_start_genai:.2f}s)")
 except ImportError:
     print("The 'google-genai' library is not found. Please install it by running: 'pip install google-genai'")
@@ -16,83 +23,135 @@ except ImportError:
 
 # --- Configuration ---
 config_start_time = time.time()
-# GOOGLE_API_KEY = os.environ.get("GOOGLE_API_KEY")
-# GOOGLE_PROJECT_ID = os.environ.get("GOOGLE_PROJECT_ID")
-# GOOGLE_REGION = os.environ.get("GOOGLE_REGION", "us-central1")
-GOOGLE_API_KEY = settings.GOOGLE_API_KEY
-GOOGLE_PROJECT_ID = settings.GOOGLE_PROJECT_ID
-GOOGLE_REGION = settings.GOOGLE_REGION
 
-print(f"{time.time():.2f}: Environment variables loaded (took {time.time() - config_start_time:.2f}s)")
-print(f"    GOOGLE_API_KEY: {'Set' if GOOGLE_API_KEY else 'Not Set'}")
-print(f"    GOOGLE_PROJECT_ID (from GOOGLE_PROJECT_ID): {GOOGLE_PROJECT_ID}")
-print(f"    GOOGLE_REGION (from GOOGLE_REGION): {GOOGLE_REGION}")
-
-GEMINI_MODELS_CONFIG = {
-    "gemini-2.5-flash-exp": {"rpm": 10, "type": "vertex_via_genai", "name_override": "gemini-2.5-flash-preview-04-17"},
-    "gemini-2.5-flash-latest-studio": {"rpm": 10, "type": "studio_via_genai", "name_override": "gemini-2.5-flash-preview-04-17"},
-    "gemini-2.0-flash-latest-studio": {"rpm": 2, "type": "studio_via_genai", "name_override": "gemini-2.0-flash-latest"},
+@dataclass(frozen=True, slots=True)
+class GeminiEnv:
+    """Google credentials resolved once from settings; passed explicitly to create_clients()."""
+    api_key: str | None
+    project: str | None
+    region: str
+
+    @classmethod
+    def from_settings(cls) -> "GeminiEnv":
+        return cls(
+            api_key=settings.GOOGLE_API_KEY or None,
+            project=settings.GOOGLE_PROJECT_ID or None,
+            region=settings.GOOGLE_REGION or "us-central1",
+        )
+
+@dataclass(frozen=True, slots=True)
+class ModelConfig:
+    """Static per-model settings. Attribute access replaces the old per-call dict lookups."""
+    rpm: int
+    type: str
+    name_override: str | None = None
+
+GEMINI_MODELS_CONFIG: dict[str, ModelConfig] = {
+    "gemini-2.5-flash-exp": ModelConfig(rpm=10, type="vertex_via_genai", name_override="gemini-2.5-flash-preview-04-17"),
+    "gemini-2.5-flash-latest-studio": ModelConfig(rpm=10, type="studio_via_genai", name_override="gemini-2.5-flash-preview-04-17"),
+    "gemini-2.0-flash-latest-studio": ModelConfig(rpm=2, type="studio_via_genai", name_override="gemini-2.0-flash-latest"),
 }
 
-def create_clients() -> tuple[genai.Client, genai.Client]:
-    studio_client = None
-    vertex_client = None
+def validate_gemini_env(env: GeminiEnv, models_config: dict[str, ModelConfig]) -> None:
+    """
+    Fails fast if no configured model type has credentials to build its client.
+    Models whose credentials are missing are skipped later by build_model_callers.
+    """
+    has_credentials = {
+        "studio_via_genai": bool(env.api_key),
+        "vertex_via_genai": bool(env.project and env.region),
+    }
+    model_types = {details.type for details in models_config.values()}
+    if not any(has_credentials.get(model_type) for model_type in model_types):
+        raise RuntimeError("Neither GOOGLE_API_KEY nor GOOGLE_PROJECT_ID/GOOGLE_REGION is set; no configured Gemini model can be used.")
 
-    # Initialize Google AI Studio client
+GEMINI_ENV = GeminiEnv.from_settings()
 
-    if GOOGLE_API_KEY:
-        client_init_start = time.time()
-        try:
-            studio_client = genai.Client(api_key=GOOGLE_API_KEY)
-            print(f"{time.time():.2f}: Google AI Studio Client (genai.Client with api_key) initialized. (took {time.time() - client_init_start:.2f}s)")
-        except Exception as e:
-            print(f"{time.time():.2f}: Error initializing Google AI Studio Client: {e}. 'studio_via_genai' type models may fail.")
-    else:
+print(f"{time.time():.2f}: Environment variables loaded (took {time.time() - config_start_time:.2f}s)")
+print(f"    GOOGLE_API_KEY: {'Set' if GEMINI_ENV.api_key else 'Not Set'}")
+print(f"    GOOGLE_PROJECT_ID (from GOOGLE_PROJECT_ID): {GEMINI_ENV.project}")
+print(f"    GOOGLE_REGION (from GOOGLE_REGION): {GEMINI_ENV.region}")
+
+# One keep-alive pool configuration shared by both clients so repeated generate_content
+# calls reuse DNS/TCP/TLS state instead of reconnecting per request.
+GENAI_HTTP_LIMITS = httpx.Limits(max_connections=100, max_keepalive_connections=20, keepalive_expiry=30)
+
+def build_http_options() -> genai_types.HttpOptions:
+    pool_args = {"limits": GENAI_HTTP_LIMITS}
+    return genai_types.HttpOptions(client_args=pool_args, async_client_args=pool_args)
+
+def _create_studio_client(env: GeminiEnv, http_options: genai_types.HttpOptions) -> genai.Client | None:
+    if not env.api_key:
         print(f"{time.time():.2f}: Warning: GOOGLE_API_KEY not set. Cannot initialize Google AI Studio Client.")
+        return None
+    client_init_start = time.time()
+    try:
+        studio_client = genai.Client(api_key=env.api_key, http_options=http_options)
+        print(f"{time.time():.2f}: Google AI Studio Client (genai.Client with api_key) initialized. (took {time.time() - client_init_start:.2f}s)")
+        return studio_client
+    except Exception as e:
+        print(f"{time.time():.2f}: Error initializing Google AI Studio Client: {e}. 'studio_via_genai' type models may fail.")
+        return None
 
-    # Initialize Vertex AI client
-    if GOOGLE_PROJECT_ID and GOOGLE_REGION:
-        client_init_start = time.time()
-        try:
-            # The vertexai=True flag might or might not be needed/supported by your genai.Client version.
-            # If it causes an error, remove it. Providing project & location usually suffices for ADC mode.
-            client_args = {
-                "vertexai": True,
-                "project": GOOGLE_PROJECT_ID,
-                "location": GOOGLE_REGION
-            }
-            # Add vertexai=True if you are sure your SDK version uses it and it helps
-            # client_args["vertexai"] = True # As per your recollection
-            
-            vertex_client = genai.Client(**client_args)
-            print(f"{time.time():.2f}: Vertex AI Client (genai.Client with project/location) initialized for project '{GOOGLE_PROJECT_ID}'. (took {time.time() - client_init_start:.2f}s)")
-        except TypeError as te: # Catch if 'vertexai' is an unexpected keyword
-            if 'vertexai' in str(te):
-                print(f"{time.time():.2f}: Note: 'vertexai=True' might not be a valid parameter for your genai.Client version. Trying without it.")
-                try:
-                    vertex_client = genai.Client(project=GOOGLE_PROJECT_ID, location=GOOGLE_REGION)
-                    print(f"{time.time():.2f}: Vertex AI Client (genai.Client project/location only) initialized. (took {time.time() - client_init_start:.2f}s)")
-                except Exception as e_inner:
-                    print(f"{time.time():.2f}: Error initializing Vertex AI Client (fallback attempt): {e_inner}.")
-            else:
-                print(f"{time.time():.2f}: Error initializing Vertex AI Client: {te}.")
-        except Exception as e:
-            print(f"{time.time():.2f}: Error initializing Vertex AI Client: {e}. 'vertex_via_genai' type models may fail.")
-    else:
+def _create_vertex_client(env: GeminiEnv, http_options: genai_types.HttpOptions) -> genai.Client | None:
+    if not (env.project and env.region):
         print(f"{time.time():.2f}: Warning: GOOGLE_PROJECT_ID or GOOGLE_REGION not set. Cannot initialize Vertex AI Client.")
+        return None
+    client_init_start = time.time()
+    try:
+        # The vertexai=True flag might or might not be needed/supported by your genai.Client version.
+        # If it causes an error, remove it. Providing project & location usually suffices for ADC mode.
+        client_args = {
+            "vertexai": True,
+            "project": env.project,
+            "location": env.region,
+            "http_options": http_options
+        }
+        # Add vertexai=True if you are sure your SDK version uses it and it helps
+        # client_args["vertexai"] = True # As per your recollection
+        
+        vertex_client = genai.Client(**client_args)
+        print(f"{time.time():.2f}: Vertex AI Client (genai.Client with project/location) initialized for project '{env.project}'. (took {time.time() - client_init_start:.2f}s)")
+        return vertex_client
+    except TypeError as te: # Catch if 'vertexai' is an unexpected keyword
+        if 'vertexai' in str(te):
+            print(f"{time.time():.2f}: Note: 'vertexai=True' might not be a valid parameter for your genai.Client version. Trying without it.")
+            try:
+                vertex_client = genai.Client(project=env.project, location=env.region, http_options=http_options)
+                print(f"{time.time():.2f}: Vertex AI Client (genai.Client project/location only) initialized. (took {time.time() - client_init_start:.2f}s)")
+                return vertex_client
+            except Exception as e_inner:
+                print(f"{time.time():.2f}: Error initializing Vertex AI Client (fallback attempt): {e_inner}.")
+        else:
+            print(f"{time.time():.2f}: Error initializing Vertex AI Client: {te}.")
+    except Exception as e:
+        print(f"{time.time():.2f}: Error initializing Vertex AI Client: {e}. 'vertex_via_genai' type models may fail.")
+    return None
 
-    return studio_client, vertex_client
+def create_clients(env: GeminiEnv = GEMINI_ENV, models_config: dict[str, ModelConfig] = GEMINI_MODELS_CONFIG) -> tuple[genai.Client, genai.Client]:
+    """
+    Builds the AI Studio and Vertex AI clients; either is None if its credentials are missing or it fails to build.
+    Raises RuntimeError if no configured model type has credentials at all.
+    Each constructor does blocking credential discovery (ADC for Vertex), so the two run in parallel threads:
+    startup costs the slower one, not the sum.
+    """
+    validate_gemini_env(env, models_config)
+    http_options = build_http_options()
+    with ThreadPoolExecutor(max_workers=2, thread_name_prefix="genai-init") as executor:
+        studio_future = executor.submit(_create_studio_client, env, http_options)
+        vertex_future = executor.submit(_create_vertex_client, env, http_options)
+        return studio_future.result(), vertex_future.result()
 
 # --- API Call Function using genai.Client.models.generate_content ---
 def call_model_via_genai_client(
     client_type_str: str,
     client_instance: genai.Client,
     model_name_key: str,
-    model_config: dict,
+    model_config: ModelConfig,
     query: str
 ) -> tuple[bool, str]:
 
-    actual_model_name = model_config.get("name_override", model_name_key)
+    actual_model_name = model_config.name_override or model_name_key
     model_path_for_call = actual_model_name
 
     print(f"{time.time():.2f}: Attempting API call via {client_type_str} client.models.generate_content for model: {model_path_for_call}")
@@ -137,57 +196,194 @@ def call_model_via_genai_client(
     finally:
         print(f"{time.time():.2f}: Exiting call_model_via_genai_client for {actual_model_name} ({client_type_str}) (total duration: {time.time() - call_api_start_time:.2f}s)")
 
-def send_query_to_first_available_model(query: str, studio_client: genai.Client, vertex_client: genai.Client, models_config: dict) -> tuple[str, str] | None:
+CLIENT_TYPE_LABELS = {
+    "studio_via_genai": "Google AI Studio",
+    "vertex_via_genai": "Vertex AI",
+}
+
+ModelCaller = Callable[[str], tuple[bool, str]]
+
+def _make_caller(client_type_str: str, client_instance: genai.Client, model_name_key: str, model_config: ModelConfig) -> ModelCaller:
+    def call(query: str) -> tuple[bool, str]:
+        return call_model_via_genai_client(client_type_str, client_instance, model_name_key, model_config, query)
+    return call
+
+def build_model_callers(studio_client: genai.Client, vertex_client: genai.Client, models_config: dict[str, ModelConfig]) -> list[tuple[str, str, ModelCaller]]:
+    """
+    Resolves client, label and model name for every configured model once, returning
+    (model_name_key, model_type, caller) entries in priority order.
+    Models whose type is unsupported or whose client is unavailable are dropped here.
+    """
+    clients_by_type = {
+        "studio_via_genai": studio_client,
+        "vertex_via_genai": vertex_client,
+    }
+    model_callers = []
+    for model_name_key, model_details in models_config.items():
+        model_type = model_details.type
+        if model_type not in CLIENT_TYPE_LABELS:
+            print(f"{time.time():.2f}: Unsupported model type '{model_type}' for {model_name_key}. Skipping.")
+            continue
+        client_to_use = clients_by_type[model_type]
+        client_type_str = CLIENT_TYPE_LABELS[model_type]
+        if not client_to_use:
+            print(f"{time.time():.2f}: Skipping {model_name_key}: {client_type_str} client not available/initialized.")
+            continue
+        MODEL_LIMITERS.setdefault(model_name_key, ModelRateLimiter(model_details.rpm))
+        model_callers.append((model_name_key, model_type, _make_caller(client_type_str, client_to_use, model_name_key, model_details)))
+    return model_callers
+
+class ModelRateLimiter:
+    """
+    Sliding-window limiter enforcing one model's requests-per-minute budget.
+    Thread-safe because the blocking genai calls are dispatched via asyncio.to_thread.
+    """
+    def __init__(self, rpm: int, period: float = 60.0):
+        self.rpm = rpm
+        self.period = period
+        self._calls: deque[float] = deque()
+        self._lock = threading.Lock()
+
+    def _prune(self, now: float) -> None:
+        while self._calls and now - self._calls[0] >= self.period:
+            self._calls.popleft()
+
+    def has_capacity(self) -> bool:
+        with self._lock:
+            self._prune(time.monotonic())
+            return len(self._calls) < self.rpm
+
+    def try_acquire(self) -> bool:
+        with self._lock:
+            now = time.monotonic()
+            self._prune(now)
+            if len(self._calls) >= self.rpm:
+                return False
+            self._calls.append(now)
+            return True
+
+    def seconds_until_available(self) -> float:
+        with self._lock:
+            now = time.monotonic()
+            self._prune(now)
+            if len(self._calls) < self.rpm:
+                return 0.0
+            return self.period - (now - self._calls[0])
+
+MODEL_LIMITERS: dict[str, ModelRateLimiter] = {
+    name: ModelRateLimiter(details.rpm) for name, details in GEMINI_MODELS_CONFIG.items()
+}
+
+# Exponentially weighted moving average of successful call latency per model, in seconds.
+LATENCY_EWMA_ALPHA = 0.3
+MODEL_LATENCY_EWMA: dict[str, float] = {}
+
+def _record_latency(model_name_key: str, elapsed: float) -> None:
+    previous = MODEL_LATENCY_EWMA.get(model_name_key)
+    MODEL_LATENCY_EWMA[model_name_key] = elapsed if previous is None else LATENCY_EWMA_ALPHA * elapsed + (1 - LATENCY_EWMA_ALPHA) * previous
+
+def _schedule_callers(model_callers: list[tuple[str, str, ModelCaller]]) -> list[tuple[str, str, ModelCaller]]:
+    """Orders models with remaining RPM budget first, then by observed latency (config order breaks ties)."""
+    return sorted(
+        model_callers,
+        key=lambda entry: (not MODEL_LIMITERS[entry[0]].has_capacity(), MODEL_LATENCY_EWMA.get(entry[0], 0.0)),
+    )
+
+def send_query_with_model_callers(query: str, model_callers: list[tuple[str, str, ModelCaller]]) -> tuple[str, str] | None:
     func_start_time = time.time()
-    print(f"{time.time():.2f}: Entered send_query_to_first_available_model (using genai.Client with client.models.generate_content)")
+    print(f"{time.time():.2f}: Entered send_query_with_model_callers (using genai.Client with client.models.generate_content)")
+    if not model_callers:
+        print(f"{time.time():.2f}: Error: No models available.")
+        return None
+
+    pending = _schedule_callers(model_callers)
+    while pending:
+        throttled = []
+        for model_name_key, model_type, caller in pending:
+            if not MODEL_LIMITERS[model_name_key].try_acquire():
+                print(f"{time.time():.2f}: {model_name_key} has no RPM budget left in the current window. Deferring.")
+                throttled.append((model_name_key, model_type, caller))
+                continue
+
+            print(f"\n{time.time():.2f}: Trying model: {model_name_key} (Type: {model_type})")
+            attempt_loop_start_time = time.time()
+            success, api_response_message = caller(query)
+
+            if success:
+                _record_latency(model_name_key, time.time() - attempt_loop_start_time)
+                print(f"{time.time():.2f}: Query successfully processed by {model_name_key} (Type: {model_type}). (Attempt took {time.time() - attempt_loop_start_time:.2f}s)")
+                print(f"{time.time():.2f}: Exiting send_query_with_model_callers (SUCCESS after {time.time() - func_start_time:.2f}s)")
+                return model_name_key, api_response_message
+            else:
+                print(f"{time.time():.2f}: Failed with {model_name_key}. Trying next model... (Attempt took {time.time() - attempt_loop_start_time:.2f}s)")
+
+        if throttled:
+            # Every remaining model is out of budget: wait for the earliest window slot instead of burning a 429.
+            wait_seconds = min(MODEL_LIMITERS[name].seconds_until_available() for name, _, _ in throttled)
+            print(f"{time.time():.2f}: All remaining models are rate limited. Waiting {wait_seconds:.2f}s for budget.")
+            time.sleep(wait_seconds)
+        pending = throttled
+
+    print(f"\n{time.time():.2f}: All models were tried, but none successfully processed the query.")
+    print(f"{time.time():.2f}: Exiting send_query_with_model_callers (ALL FAILED after {time.time() - func_start_time:.2f}s)")
+    return None
+
+def send_query_to_first_available_model(query: str, studio_client: genai.Client, vertex_client: genai.Client, models_config: dict[str, ModelConfig]) -> tuple[str, str] | None:
+    """One-off convenience wrapper; long-lived callers should build the callers once and reuse them."""
     if not models_config:
         print(f"{time.time():.2f}: Error: No models configured.")
         return None
+    return send_query_with_model_callers(query, build_model_callers(studio_client, vertex_client, models_config))
+
+# --- Batch API (Gemini Developer API batch mode) ---
+# Batch jobs are billed at about half the interactive price and complete asynchronously (target: within 24h),
+# so they suit backlog articles nobody is waiting on. Inline requests are only accepted by the AI Studio API.
+# Jobs are submitted on one run and collected on a later one; nothing here waits for a job to finish.
+BATCH_FINISHED_STATES = {"JOB_STATE_SUCCEEDED", "JOB_STATE_FAILED", "JOB_STATE_CANCELLED", "JOB_STATE_EXPIRED"}
 
-    
+def resolve_batch_model(models_config: dict[str, ModelConfig]) -> tuple[str, ModelConfig] | None:
+    """First configured AI Studio model, in priority order; batch jobs with inline requests need the AI Studio client."""
     for model_name_key, model_details in models_config.items():
-        model_type = model_details.get("type")
-        print(f"\n{time.time():.2f}: Trying model: {model_name_key} (Type: {model_type})")
+        if model_details.type == "studio_via_genai":
+            return model_name_key, model_details
+    return None
 
-        success = False
-        api_response_message = "Model type not specified or client not configured for this type."
-        attempt_loop_start_time = time.time()
-        
-        client_to_use = None
-        client_type_str = "Unknown"
-
-        if model_type == "studio_via_genai":
-            client_to_use = studio_client
-            client_type_str = "Google AI Studio"
-            if not client_to_use:
-                api_response_message = "Google AI Studio client not available/initialized."
-        elif model_type == "vertex_via_genai":
-            client_to_use = vertex_client
-            client_type_str = "Vertex AI"
-            if not client_to_use:
-                api_response_message = "Vertex AI client not available/initialized."
-        else:
-            api_response_message = f"Unsupported model type '{model_type}' for {model_name_key}."
-            print(f"{time.time():.2f}: {api_response_message} Skipping.")
-            continue 
-
-        if client_to_use:
-            success, api_response_message = call_model_via_genai_client(
-                client_type_str, client_to_use, model_name_key, model_details, query
-            )
-        else:
-            print(f"{time.time():.2f}: Skipping {model_name_key}: {api_response_message}")
+def submit_batch_job(client_instance: genai.Client, model_name_key: str, model_config: ModelConfig, queries: list[str],
+                     display_name: str = "news-analysis-backlog") -> str:
+    """Submits queries as one batch job and returns the job name to collect it with later."""
+    actual_model_name = model_config.name_override or model_name_key
+    inline_requests = [{"contents": [{"parts": [{"text": query}], "role": "user"}]} for query in queries]
+    job = client_instance.batches.create(model=actual_model_name, src=inline_requests, config={"display_name": display_name})
+    print(f"{time.time():.2f}: Submitted batch job {job.name} with {len(queries)} requests to {actual_model_name}")
+    return job.name
 
-        if success:
-            print(f"{time.time():.2f}: Query successfully processed by {model_name_key} (Type: {model_type}). (Attempt took {time.time() - attempt_loop_start_time:.2f}s)")
-            print(f"{time.time():.2f}: Exiting send_query_to_first_available_model (SUCCESS after {time.time() - func_start_time:.2f}s)")
-            return model_name_key, api_response_message
-        else:
-            print(f"{time.time():.2f}: Failed with {model_name_key}. Trying next model... (Attempt took {time.time() - attempt_loop_start_time:.2f}s)")
+def collect_batch_job(client_instance: genai.Client, job_name: str, expected_count: int) -> list[str | None] | None:
+    """
+    Checks a batch job once. Returns None while it is still running, otherwise the response texts in query order
+    (None for requests that failed). Raises RuntimeError if the job did not succeed or its responses do not line up
+    with the expected_count queries that were submitted.
+    """
+    job = client_instance.batches.get(name=job_name)
+    if job.state.name not in BATCH_FINISHED_STATES:
+        print(f"{time.time():.2f}: Batch job {job_name} is still {job.state.name}.")
+        return None
+    if job.state.name != "JOB_STATE_SUCCEEDED":
+        raise RuntimeError(f"Batch job {job_name} ended as {job.state.name}: {job.error}")
 
-    print(f"\n{time.time():.2f}: All models were tried, but none successfully processed the query.")
-    print(f"{time.time():.2f}: Exiting send_query_to_first_available_model (ALL FAILED after {time.time() - func_start_time:.2f}s)")
-    return None
+    inlined_responses = job.dest.inlined_responses if job.dest else None
+    if not inlined_responses or len(inlined_responses) != expected_count:
+        got = len(inlined_responses) if inlined_responses else 0
+        raise RuntimeError(f"Batch job {job_name} returned {got} responses for {expected_count} requests")
+
+    texts = []
+    for inline_response in inlined_responses:
+        if inline_response.error or inline_response.response is None:
+            print(f"{time.time():.2f}:   Batch request failed: {inline_response.error}")
+            texts.append(None)
+        else:
+            texts.append(inline_response.response.text)
+    print(f"{time.time():.2f}: Collected batch job {job_name}: {sum(text is not None for text in texts)}/{expected_count} succeeded.")
+    return texts
 
 # --- Main Execution Block (remains the same) ---
 if __name__ == "__main__":
@@ -204,9 +400,6 @@ if __name__ == "__main__":
         "3. Authenticated with Google Cloud (e.g., `gcloud auth application-default login`) for Vertex AI calls.")
     print("-" * 40)
 
-    if not GOOGLE_PROJECT_ID and any(details.get("type") == "vertex_via_genai" for details in GEMINI_MODELS_CONFIG.values()):
-        print(f"{time.time():.2f}: NOTICE: GOOGLE_PROJECT_ID (for Vertex AI) resolved to: {GOOGLE_PROJECT_ID if GOOGLE_PROJECT_ID else 'Not Set'}")
-
     print(f"{time.time():.2f}: Effective GEMINI_MODELS_CONFIG being used:")
     if not GEMINI_MODELS_CONFIG:
         print(f"{time.time():.2f}: No models defined in GEMINI_MODELS_CONFIG. Exiting.")
@@ -9,6 +9,7 @@ project_root = os.path.dirname(os.path.abspath(__file__))
 sys.path.insert(0, project_root)
 
 # Import crawlers
+from crawlers.base_crawler import close_mongo_clients
 from crawlers.cnstock_crawler import CnstockCrawler
 from crawlers.jrj_crawler import JrjCrawler
 from crawlers.nbd_crawler import NbdCrawler
@@ -89,7 +90,10 @@ async def main():
         return
 
     tasks = [run_crawler(cls, args.limit) for cls in crawlers_to_run]
-    await asyncio.gather(*tasks)
+    try:
+        await asyncio.gather(*tasks)
+    finally:
+        close_mongo_clients()
 
     logger.info("All requested crawler tasks have completed.")
 
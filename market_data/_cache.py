@@ -0,0 +1,76 @@
+import hashlib
+import json
+import logging
+import math
+import os
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_ROOT = Path(".cache")
+
+class ParquetTTLCache:
+    """
+    Two-tier cache for API responses that come back as DataFrames.
+    Entries live on disk at <root>/<endpoint>/<md5 of params>.parquet and expire by file age. Recently used
+    entries are also kept in memory as protocol-5 pickles, so repeat hits in a long-lived process skip Parquet
+    decoding; each hit unpickles a fresh copy that callers may mutate.
+    """
+    def __init__(self, root: Path = DEFAULT_CACHE_ROOT, memory_items: int = 256):
+        self.root = Path(root)
+        self.memory_items = memory_items
+        self._memory: "OrderedDict[Path, tuple[float, bytes]]" = OrderedDict() # path -> (stored_at, pickle)
+        self._lock = threading.Lock()
+
+    def _remember(self, path: Path, df: pd.DataFrame, stored_at: float):
+        payload = pickle.dumps(df, protocol=5)
+        with self._lock:
+            self._memory[path] = (stored_at, payload)
+            self._memory.move_to_end(path)
+            while len(self._memory) > self.memory_items:
+                self._memory.popitem(last=False)
+
+    def _path(self, endpoint: str, params: Dict[str, Any]) -> Path:
+        key = hashlib.md5(f"{endpoint}:{json.dumps(params, sort_keys=True, default=str)}".encode("utf-8")).hexdigest()
+        return self.root / endpoint / f"{key}.parquet"
+
+    def get(self, endpoint: str, params: Dict[str, Any], ttl: float) -> Optional[pd.DataFrame]:
+        """Returns the cached DataFrame if present and younger than ttl seconds (math.inf never expires)."""
+        path = self._path(endpoint, params)
+        with self._lock:
+            entry = self._memory.get(path)
+            if entry is not None:
+                self._memory.move_to_end(path)
+        if entry is not None and (ttl == math.inf or time.time() - entry[0] <= ttl):
+            return pickle.loads(entry[1])
+        try:
+            stored_at = path.stat().st_mtime
+            if ttl != math.inf and time.time() - stored_at > ttl:
+                return None
+            df = pd.read_parquet(path)
+            self._remember(path, df, stored_at)
+            return df
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable cache entry {path}: {e}")
+            return None
+
+    def set(self, endpoint: str, params: Dict[str, Any], df: pd.DataFrame):
+        """Stores a DataFrame; written to a temp file first so concurrent readers never see partial data."""
+        path = self._path(endpoint, params)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_suffix(f".{os.getpid()}.{time.monotonic_ns()}.tmp")
+            df.to_parquet(tmp_path, compression="zstd")
+            os.replace(tmp_path, path)
+            self._remember(path, df, time.time())
+        except Exception as e:
+            logger.warning(f"Could not write cache entry {path}: {e}")
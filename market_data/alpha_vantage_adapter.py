@@ -1,63 +1,200 @@
+from __future__ import annotations
+
 import os
 import logging
 import asyncio
-from alpha_vantage.async_support.timeseries import TimeSeries
-from alpha_vantage.async_support.fundamentaldata import FundamentalData
+import time
 # For news/sentiment, Alpha Vantage library might not have a direct async method yet,
 # or it might be under a different module. We might need to make a direct HTTP request
 # or check library updates. For now, let's assume we might use httpx for it.
 import httpx 
-import pandas as pd
-from datetime import datetime, timedelta
-from typing import Optional, List, Dict, Any
+import orjson
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
+    import pyarrow.parquet as pq
+except ImportError: # Symbol loading falls back to pandas; the time series cache needs pyarrow
+    pa = pacsv = pq = None
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+from pathlib import Path
+from typing import TYPE_CHECKING, Optional, List, Dict, Any, AsyncIterator, Tuple
 from config import settings
+from utils.rate_limiter import AsyncRateLimiter
+
+if TYPE_CHECKING:
+    import pandas as pd
 
 logger = logging.getLogger(__name__)
 
 # Read API key from environment variable
 ALPHA_VANTAGE_API_KEY = settings.ALPHA_VANTAGE_API_KEY
 DEFAULT_SP500_CSV_PATH = "sp500_tickers.csv"
+ALPHA_VANTAGE_BASE_URL = "https://www.alphavantage.co/query"
+CACHE_DIR = Path(".av_cache") # Per-day Parquet snapshots of time series responses
+# TIME_SERIES_DAILY returns a fixed column set, so the rename map is built once
+_AV_DAILY_COL_MAP = {"1. open": "open", "2. high": "high", "3. low": "low", "4. close": "close", "5. volume": "volume"}
+MAX_RETRIES = 5 # Retries for HTTP 429 responses
+NEWS_TICKERS_PER_REQUEST = 50 # Tickers coalesced into a single NEWS_SENTIMENT call
 
 # DEFAULT_SYMBOLS_US = ['SPY', 'AAPL', 'MSFT', 'GOOGL'] # We'll replace this logic
 
-def load_symbols_from_csv(csv_path: str = DEFAULT_SP500_CSV_PATH) -> List[str]:
-    """Loads stock symbols from a CSV file. Expects a column named 'Symbol'."""
+def ensure_parquet_cache(csv_path: str, columns: Optional[List[str]] = None) -> str:
+    """
+    Returns the path of a Parquet copy of the ticker CSV, (re)writing it when it is
+    missing or older than the CSV. Only 'columns' are parsed and kept when given.
+    Raises FileNotFoundError if neither file exists.
+    """
+    parquet_path = os.path.splitext(csv_path)[0] + ".parquet"
+    if not os.path.exists(csv_path):
+        if os.path.exists(parquet_path):
+            return parquet_path
+        raise FileNotFoundError(csv_path)
+    if not os.path.exists(parquet_path) or os.path.getmtime(parquet_path) < os.path.getmtime(csv_path):
+        convert_options = pacsv.ConvertOptions(include_columns=columns) if columns else None
+        pq.write_table(pacsv.read_csv(csv_path, convert_options=convert_options), parquet_path)
+        logger.info(f"Wrote Parquet symbol cache {parquet_path} from {csv_path}")
+    return parquet_path
+
+def _load_symbols_pandas(abs_path: str) -> Tuple[str, ...]:
+    """Fallback symbol loader for environments without pyarrow."""
+    import pandas as pd
+    df = pd.read_csv(abs_path, usecols=lambda col: col == "Symbol")
+    if "Symbol" not in df.columns:
+        logger.error(f"'Symbol' column not found in {abs_path}")
+        return ()
+    return tuple(df["Symbol"].dropna().unique().tolist())
+
+@lru_cache(maxsize=4)
+def _load_symbols_cached(abs_path: str, mtime: float) -> Tuple[str, ...]:
+    """Parses the 'Symbol' column once per (path, mtime); a changed file gets a fresh cache key."""
     try:
-        df = pd.read_csv(csv_path)
-        if "Symbol" not in df.columns:
-            logger.error(f"'Symbol' column not found in {csv_path}")
-            return []
-        symbols = df["Symbol"].dropna().unique().tolist()
-        logger.info(f"Loaded {len(symbols)} unique symbols from {csv_path}")
+        if pa is None:
+            symbols = _load_symbols_pandas(abs_path)
+        else:
+            parquet_path = ensure_parquet_cache(abs_path, columns=["Symbol"])
+            if "Symbol" not in pq.read_schema(parquet_path).names:
+                logger.error(f"'Symbol' column not found in {abs_path}")
+                return ()
+            symbols = tuple(pq.read_table(parquet_path, columns=["Symbol"]).column("Symbol").drop_null().unique().to_pylist())
+        logger.info(f"Loaded {len(symbols)} unique symbols from {abs_path}")
         return symbols
     except FileNotFoundError:
-        logger.warning(f"Ticker CSV file not found at {csv_path}. Returning empty list.")
-        return []
+        logger.warning(f"Ticker CSV file not found at {abs_path}. Returning empty list.")
+        return ()
     except Exception as e:
-        logger.error(f"Error loading symbols from {csv_path}: {e}", exc_info=True)
-        return []
+        # pyarrow raises ArrowInvalid when an include_columns entry is absent from the header
+        logger.error(f"Error loading symbols from {abs_path} (is there a 'Symbol' column?): {e}", exc_info=True)
+        return ()
+
+def load_symbols_from_csv(csv_path: str = DEFAULT_SP500_CSV_PATH) -> Tuple[str, ...]:
+    """
+    Loads stock symbols from a CSV file. Expects a column named 'Symbol'.
+    Parses only the 'Symbol' column with pyarrow (via a sibling Parquet cache), and memoizes
+    the result so adapters sharing a CSV parse it once. Returns an immutable tuple.
+    """
+    abs_path = os.path.abspath(csv_path)
+    try:
+        mtime = os.path.getmtime(abs_path)
+    except OSError:
+        mtime = 0.0 # Missing CSV; ensure_parquet_cache may still find the Parquet copy
+    return _load_symbols_cached(abs_path, mtime)
 
 class AlphaVantageAdapter:
-    def __init__(self, api_key: str = None, httpx_client: httpx.AsyncClient = None, sp500_csv_path: str = DEFAULT_SP500_CSV_PATH):
+    def __init__(self, api_key: str = None, httpx_client: httpx.AsyncClient = None, sp500_csv_path: str = DEFAULT_SP500_CSV_PATH, calls_per_minute: int = 5, max_concurrency: int = 5, cache_dir: Path = CACHE_DIR, cache_ttl_days: int = 7):
         self.api_key = api_key if api_key else ALPHA_VANTAGE_API_KEY
         if not self.api_key:
             logger.error("Alpha Vantage API key not provided. Please set the ALPHA_VANTAGE_API_KEY in config.settings or pass it during instantiation.")
             raise ValueError("Alpha Vantage API key is required.")
         
         self._client = httpx_client
+        # Free tier: 5 calls/minute. The semaphore caps in-flight requests, the limiter paces them.
+        self._limiter = AsyncRateLimiter(max_rate=calls_per_minute, time_period=60)
+        self._sem = asyncio.Semaphore(max_concurrency)
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.cache_ttl_days = cache_ttl_days
         self.sp500_symbols = load_symbols_from_csv(sp500_csv_path)
         if not self.sp500_symbols:
             logger.warning("No S&P 500 symbols loaded. Time series functions for S&P 500 might not return data unless symbols are explicitly provided.")
         else:
             logger.info(f"AlphaVantageAdapter initialized with {len(self.sp500_symbols)} S&P 500 symbols.")
 
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
     async def _get_client(self) -> httpx.AsyncClient:
         """Returns the shared httpx client or creates a new one."""
         if self._client is None:
-            # If you need specific configurations (proxies, timeouts), set them here
-            self._client = httpx.AsyncClient() 
+            # Pooled HTTP/2 client so every time series and news call reuses one TCP/TLS session.
+            # keepalive_expiry is raised above httpx's 5s default since rate-limited calls are spaced out.
+            self._client = httpx.AsyncClient(
+                http2=True,
+                limits=httpx.Limits(max_connections=100, max_keepalive_connections=20, keepalive_expiry=30.0),
+                timeout=httpx.Timeout(30.0, connect=5.0),
+            )
         return self._client
 
+    async def _get_json(self, params: Dict[str, str]) -> Dict[str, Any]:
+        """
+        GETs the query endpoint and returns the decoded JSON body.
+        HTTP 429s are retried up to MAX_RETRIES times, sleeping for Retry-After when the server sends it
+        and exponential backoff (capped at 60s) otherwise. Other HTTP errors are raised.
+        """
+        client = await self._get_client()
+        for attempt in range(MAX_RETRIES + 1):
+            response = await client.get(ALPHA_VANTAGE_BASE_URL, params=params)
+            if response.status_code != 429 or attempt == MAX_RETRIES:
+                break
+            retry_after = response.headers.get("Retry-After")
+            delay = float(retry_after) if retry_after and retry_after.isdigit() else min(2 ** (attempt + 1), 60)
+            logger.warning(f"Alpha Vantage returned 429 for {params.get('function')}, retrying in {delay:.1f}s (attempt {attempt + 1}/{MAX_RETRIES})")
+            await asyncio.sleep(delay)
+        response.raise_for_status()
+        return orjson.loads(await response.aread())
+
+    async def _fetch_daily(self, symbol: str, output_size: str) -> pd.DataFrame:
+        """Calls the TIME_SERIES_DAILY endpoint through the pooled client and returns an OHLCV DataFrame."""
+        import pandas as pd
+        params = {
+            "function": "TIME_SERIES_DAILY",
+            "symbol": symbol,
+            "outputsize": output_size,
+            "apikey": self.api_key,
+        }
+        payload = await self._get_json(params)
+
+        if "Error Message" in payload:
+            raise ValueError(payload["Error Message"])
+        # Alpha Vantage reports throttling in a 200 body under "Note" or "Information"
+        for key in ("Note", "Information"):
+            if key in payload:
+                raise ValueError(payload[key])
+        time_series = payload.get("Time Series (Daily)")
+        if not time_series:
+            raise ValueError(f"Unexpected response structure for TIME_SERIES_DAILY: {list(payload.keys())}")
+
+        data = pd.DataFrame.from_dict(time_series, orient='index', dtype=float)
+        data.index.name = 'date'
+        return data
+
+    def _cache_path(self, symbol: str, output_size: str) -> Path:
+        """Parquet cache file for a symbol/output size, valid for the current day."""
+        return self.cache_dir / f"{symbol}_{output_size}_{date.today().isoformat()}.parquet"
+
+    def _purge_cache(self):
+        """Deletes cached time series older than cache_ttl_days."""
+        cutoff = time.time() - self.cache_ttl_days * 86400
+        for path in self.cache_dir.glob("*.parquet"):
+            try:
+                if path.stat().st_mtime < cutoff:
+                    path.unlink()
+            except OSError as e:
+                logger.warning(f"Could not purge Alpha Vantage cache file {path}: {e}")
+
     async def close(self):
         """Closes the httpx client if it was created by this adapter."""
         if self._client:
@@ -96,64 +233,94 @@ class AlphaVantageAdapter:
         elif len(target_symbols) > 25: # General warning for free tier users
              logger.warning(f"Fetching data for {len(target_symbols)} symbols. This may take a long time and hit Alpha Vantage free tier rate limits (5 calls/min, 500 calls/day).")
 
-        ts = TimeSeries(key=self.api_key, output_format='pandas', treat_info_as_error=True)
-        results = {}
-        call_count = 0
-        
-        for i, symbol in enumerate(target_symbols):
-            try:
-                logger.info(f"Fetching daily time series for {symbol} ({i+1}/{len(target_symbols)})... ")
-                data, meta_data = await ts.get_daily(symbol=symbol, outputsize=output_size)
-                data.columns = [col.split('. ')[1] if '. ' in col else col for col in data.columns]
-                data.index = pd.to_datetime(data.index)
-                results[symbol] = data
-                logger.info(f"Successfully fetched daily time series for {symbol}. Shape: {data.shape}")
-                call_count += 1
-                
-                # Respect rate limits: 5 calls per minute for free tier.
-                # Stricter sleep if many symbols, less strict if few.
-                if call_count % 4 == 0 and (len(target_symbols) - (i+1) > 0 ) : # After every 4 calls, if there are more symbols
-                    logger.info("Approaching rate limit, pausing for 60 seconds...")
-                    await asyncio.sleep(60) # Wait 60 seconds to reset the minute window for 5 calls.
-                elif len(target_symbols) > 1 and (len(target_symbols) - (i+1) > 0 ):
-                     await asyncio.sleep(1) # Small polite delay between individual calls if not hitting the batch limit
-
-            except Exception as e:
-                # Check for specific rate limit message from Alpha Vantage
-                if "standard API call frequency is 5 calls per minute and 500 calls per day" in str(e).lower():
-                    logger.error(f"Alpha Vantage Rate Limit Hit for {symbol}: {e}. Consider a paid plan or reducing frequency/number of symbols.")
-                    # Potentially stop further calls or implement a longer backoff
-                    results[symbol] = None # or re-raise to stop the process
-                    break # Stop trying to fetch more symbols if rate limit is definitely hit.
-                else:
-                    logger.error(f"Error fetching daily time series for {symbol} from Alpha Vantage: {e}", exc_info=False) # Set exc_info to False to avoid huge logs for many errors
-                    results[symbol] = None
-            
-        await ts.close()
-        logger.info(f"Finished fetching time series for {len(results)} out of {len(target_symbols)} requested symbols.")
+        self._purge_cache()
+        import pandas as pd # Deferred so symbol loading and news calls don't pay for pandas
+        rate_limit_hit = asyncio.Event()
+
+        async def _fetch_one(i: int, symbol: str) -> Optional[pd.DataFrame]:
+            cache_path = self._cache_path(symbol, output_size)
+            if cache_path.exists():
+                # Same-day cache hit: no API call, so it never waits on the semaphore or limiter
+                logger.info(f"Loaded daily time series for {symbol} from cache {cache_path}")
+                return await asyncio.to_thread(pd.read_parquet, cache_path)
+            async with self._sem, self._limiter:
+                if rate_limit_hit.is_set():
+                    return None # Daily quota exhausted; don't spend more calls
+                try:
+                    logger.info(f"Fetching daily time series for {symbol} ({i+1}/{len(target_symbols)})... ")
+                    data = await self._fetch_daily(symbol, output_size)
+                    data.rename(columns=_AV_DAILY_COL_MAP, inplace=True)
+                    data.index = pd.to_datetime(data.index, format="%Y-%m-%d", cache=True)
+                    logger.info(f"Successfully fetched daily time series for {symbol}. Shape: {data.shape}")
+                    try:
+                        await asyncio.to_thread(data.to_parquet, cache_path)
+                    except Exception as e:
+                        logger.warning(f"Could not write Alpha Vantage cache for {symbol} to {cache_path}: {e}")
+                    return data
+                except Exception as e:
+                    # Check for specific rate limit message from Alpha Vantage
+                    if "rate limit" in str(e).lower() or "api call frequency" in str(e).lower():
+                        logger.error(f"Alpha Vantage Rate Limit Hit for {symbol}: {e}. Consider a paid plan or reducing frequency/number of symbols.")
+                        rate_limit_hit.set() # Stop the remaining symbols from trying
+                    else:
+                        logger.error(f"Error fetching daily time series for {symbol} from Alpha Vantage: {e}", exc_info=False) # Set exc_info to False to avoid huge logs for many errors
+                    return None
+
+        results_list = await asyncio.gather(*[_fetch_one(i, symbol) for i, symbol in enumerate(target_symbols)], return_exceptions=True)
+        results: Dict[str, Optional[pd.DataFrame]] = dict.fromkeys(target_symbols) # Sized once, filled in place
+        for symbol, res in zip(target_symbols, results_list):
+            if not isinstance(res, BaseException):
+                results[symbol] = res
+
+        logger.info(f"Finished fetching time series for {sum(1 for df in results.values() if df is not None)} out of {len(target_symbols)} requested symbols.")
         return results
 
-    async def get_news_sentiment(self, tickers: Optional[List[str]] = None, topics: Optional[List[str]] = None, limit: int = 50) -> Optional[List[Dict[str, Any]]]:
+    async def _fetch_news_batch(self, params: Dict[str, str]) -> Optional[List[Dict[str, Any]]]:
+        """Issues one NEWS_SENTIMENT request and returns its feed, or None on error."""
+        try:
+            logger.info(f"Fetching news and sentiment from Alpha Vantage with params: {params}")
+            async with self._sem, self._limiter:
+                data = await self._get_json(params)
+
+            if "feed" in data:
+                logger.info(f"Successfully fetched {len(data['feed'])} news/sentiment items.")
+                return data["feed"]
+            elif "Information" in data and "rate limit" in data["Information"]:
+                logger.warning(f"Alpha Vantage rate limit hit for news/sentiment: {data['Information']}")
+                return None
+            elif "Error Message" in data:
+                 logger.error(f"Alpha Vantage API error for news/sentiment: {data['Error Message']}")
+                 return None
+            else:
+                logger.warning(f"Unexpected response structure for news/sentiment: {data}")
+                return None
+        except httpx.HTTPStatusError as e:
+            logger.error(f"HTTP error fetching news/sentiment from Alpha Vantage: {e.response.status_code} - {e.response.text}", exc_info=True)
+            return None
+        except Exception as e:
+            logger.error(f"Error fetching news/sentiment from Alpha Vantage: {e}", exc_info=True)
+            return None
+
+    async def get_news_sentiment(self, tickers: Optional[List[str]] = None, topics: Optional[List[str]] = None, limit: int = 50, sort: str = "LATEST") -> Optional[List[Dict[str, Any]]]:
         """
         Fetches news and sentiment data.
         Alpha Vantage API endpoint: https://www.alphavantage.co/documentation/#news-sentiment
         'tickers': e.g., ['AAPL', 'MSFT']
         'topics': e.g., ['technology', 'earnings']
         'limit': Number of results to return, max 1000 for premium, typically less for free.
+        'sort': 'LATEST', 'EARLIEST' or 'RELEVANCE'.
         
+        Tickers are sent comma-joined in as few requests as possible; lists longer than
+        NEWS_TICKERS_PER_REQUEST are split into batches fetched concurrently over the shared client.
         Returns a list of news articles with sentiment.
         """
-        base_url = "https://www.alphavantage.co/query"
-        function = "NEWS_SENTIMENT"
-        
         params = {
-            "function": function,
+            "function": "NEWS_SENTIMENT",
             "apikey": self.api_key,
-            "limit": str(limit) # API expects string for limit
+            "limit": str(limit), # API expects string for limit
+            "sort": sort,
         }
         
-        if tickers:
-            params["tickers"] = ",".join(tickers)
         if topics:
             # Topics could be: blockchain, earnings, ipo, mergers_and_acquisitions, 
             # financial_markets, economy_fiscal, economy_monetary, economy_macro,
@@ -161,31 +328,14 @@ class AlphaVantageAdapter:
             # real_estate, retail_wholesale, technology
             params["topics"] = ",".join(topics)
 
-        try:
-            client = await self._get_client()
-            logger.info(f"Fetching news and sentiment from Alpha Vantage with params: {params}")
-            response = await client.get(base_url, params=params)
-            response.raise_for_status() # Raise an exception for bad status codes
-            data = response.json()
+        if not tickers:
+            return await self._fetch_news_batch(params)
 
-            if "feed" in data:
-                logger.info(f"Successfully fetched {len(data['feed'])} news/sentiment items.")
-                return data["feed"]
-            elif "Information" in data and "rate limit" in data["Information"]:
-                logger.warning(f"Alpha Vantage rate limit hit for news/sentiment: {data['Information']}")
-                return None
-            elif "Error Message" in data:
-                 logger.error(f"Alpha Vantage API error for news/sentiment: {data['Error Message']}")
-                 return None
-            else:
-                logger.warning(f"Unexpected response structure for news/sentiment: {data}")
-                return None
-        except httpx.HTTPStatusError as e:
-            logger.error(f"HTTP error fetching news/sentiment from Alpha Vantage: {e.response.status_code} - {e.response.text}", exc_info=True)
-            return None
-        except Exception as e:
-            logger.error(f"Error fetching news/sentiment from Alpha Vantage: {e}", exc_info=True)
+        batches = [tickers[i:i + NEWS_TICKERS_PER_REQUEST] for i in range(0, len(tickers), NEWS_TICKERS_PER_REQUEST)]
+        feeds = await asyncio.gather(*[self._fetch_news_batch({**params, "tickers": ",".join(batch)}) for batch in batches])
+        if all(feed is None for feed in feeds):
             return None
+        return [item for feed in feeds if feed for item in feed]
 
 # Example Usage
 async def main_alpha_vantage_test():
@@ -201,8 +351,14 @@ async def main_alpha_vantage_test():
         logger.info("Please set the ALPHA_VANTAGE_API_KEY in your config.settings.")
         return
 
-    logger.info("--- Testing get_daily_time_series for a few default symbols ---")
-    default_data = await av_adapter.get_daily_time_series(symbols=['GOOGL', 'TSLA'], output_size='compact')
+    # Time series and news run concurrently so the shared client and limiter are exercised together
+    logger.info("--- Testing get_daily_time_series (GOOGL, TSLA) and get_news_sentiment (MSFT, finance topic) concurrently ---")
+    start = time.perf_counter()
+    default_data, news_items = await asyncio.gather(
+        av_adapter.get_daily_time_series(symbols=['GOOGL', 'TSLA'], output_size='compact'),
+        av_adapter.get_news_sentiment(tickers=['MSFT'], topics=['finance'], limit=3),
+    )
+    logger.info(f"Concurrent Alpha Vantage requests finished: elapsed_s={time.perf_counter() - start:.2f}")
     for symbol, data_df in default_data.items():
         if data_df is not None:
             logger.info(f"{symbol} daily data (last 2 days):\n{data_df.head(2)}")
@@ -223,10 +379,6 @@ async def main_alpha_vantage_test():
     # else:
     #     logger.warning("S&P 500 symbol list is empty. Skipping S&P 500 test.")
 
-    # News sentiment test (keeping it short to avoid using too many API calls during testing)
-    # await asyncio.sleep(60) # Wait a bit if you just ran a batch of time series calls
-    logger.info("\n--- Testing get_news_sentiment (MSFT, finance topic) ---")
-    news_items = await av_adapter.get_news_sentiment(tickers=['MSFT'], topics=['finance'], limit=3)
     if news_items:
         logger.info(f"Fetched {len(news_items)} news items for MSFT/finance.")
         for item_idx, item in enumerate(news_items):
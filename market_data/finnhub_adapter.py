@@ -1,3 +1,5 @@
+from __future__ import annotations
+
 import os
 import sys # Add sys import
 import logging
@@ -12,12 +14,18 @@ logger = logging.getLogger(__name__)
 
 import asyncio
 import time
-import finnhub
-import pandas as pd
+from dataclasses import asdict, dataclass
+import aiohttp
+import orjson
 from datetime import datetime, timedelta
-from typing import Optional, List, Dict, Any
+from typing import TYPE_CHECKING, Optional, List, Dict, Any
 from config import settings
 from utils.market_utils import update_sp500_csv, DEFAULT_SP500_CSV_PATH_FOR_UTILS
+from utils.rate_limiter import AsyncRateLimiter
+from utils.event_loop import run_async
+
+if TYPE_CHECKING:
+    import pandas as pd
 
 # Assuming sp500_tickers.csv is in the project root, relative to where this script might be run from
 # or that PYTHONPATH is set up correctly.
@@ -30,6 +38,7 @@ except ImportError:
     logger.warning("Could not import load_symbols_from_csv from alpha_vantage_adapter. Defining a local version.")
     DEFAULT_SP500_CSV_PATH = "sp500_tickers.csv"
     def load_symbols_from_csv(csv_path: str = DEFAULT_SP500_CSV_PATH) -> List[str]:
+        import pandas as pd
         try:
             df = pd.read_csv(csv_path)
             if "Symbol" not in df.columns:
@@ -51,15 +60,32 @@ except ImportError:
 
 
 FINNHUB_API_KEY = settings.FINNHUB_API_KEY
+FINNHUB_BASE_URL = "https://finnhub.io/api/v1"
+MAX_RETRIES = 3 # Retries for 429 responses
+
+@dataclass(slots=True)
+class Quote:
+    """Latest daily snapshot for one symbol from Finnhub's /quote endpoint."""
+    symbol: str
+    open: Optional[float]
+    high: Optional[float]
+    low: Optional[float]
+    close: Optional[float]
+    previous_close: Optional[float]
+    timestamp: Optional[int] # Unix seconds
 
 class FinnhubAdapter:
-    def __init__(self, api_key: str = None, sp500_csv_path: str = DEFAULT_SP500_CSV_PATH, update_sp500: bool = False):
+    def __init__(self, api_key: str = None, sp500_csv_path: str = DEFAULT_SP500_CSV_PATH, update_sp500: bool = False, calls_per_minute: int = 60, max_concurrency: int = 10):
         self.api_key = api_key if api_key else FINNHUB_API_KEY
         if not self.api_key:
             logger.error("Finnhub API key not provided. Please set FINNHUB_API_KEY in config.settings or pass during instantiation.")
             raise ValueError("Finnhub API key is required.")
         
-        self.client = finnhub.Client(api_key=self.api_key)
+        # Pooled aiohttp session for the REST endpoints, created lazily inside the running loop
+        self._session: Optional[aiohttp.ClientSession] = None
+        # Free tier: 60 calls/minute. The semaphore caps in-flight requests, the limiter paces them.
+        self._limiter = AsyncRateLimiter(max_rate=calls_per_minute, time_period=60)
+        self._sem = asyncio.Semaphore(max_concurrency)
         self.sp500_csv_path = sp500_csv_path
         
         # Update S&P 500 list if requested
@@ -76,68 +102,129 @@ class FinnhubAdapter:
         else:
             logger.info(f"FinnhubAdapter initialized with {len(self.sp500_symbols)} S&P 500 symbols from {sp500_csv_path}.")
 
-    async def get_daily_snapshot_quote(self, symbol: str) -> Optional[pd.DataFrame]:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def close(self):
+        """Closes the pooled aiohttp session."""
+        if self._session and not self._session.closed:
+            await self._session.close()
+            logger.info("FinnhubAdapter's aiohttp session closed.")
+        self._session = None
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        """Returns the shared aiohttp session, creating it on first use."""
+        if self._session is None or self._session.closed:
+            # keepalive_timeout is raised above aiohttp's 15s default since rate-limited calls are spaced out;
+            # the DNS cache avoids re-resolving finnhub.io for every request.
+            connector = aiohttp.TCPConnector(limit=100, limit_per_host=30, keepalive_timeout=30, ttl_dns_cache=300)
+            self._session = aiohttp.ClientSession(
+                base_url=FINNHUB_BASE_URL + "/",
+                headers={"X-Finnhub-Token": self.api_key},
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=30, connect=5),
+            )
+        return self._session
+
+    async def _request(self, path: str, **params) -> Any:
+        """
+        GETs a Finnhub REST endpoint through the pooled session and returns the decoded JSON.
+        429 responses are retried up to MAX_RETRIES times, honouring Retry-After when present.
+        Raises aiohttp.ClientResponseError for other HTTP errors.
+        """
+        session = self._get_session()
+        for attempt in range(MAX_RETRIES + 1):
+            async with session.get(path.lstrip("/"), params=params) as response:
+                if response.status != 429 or attempt == MAX_RETRIES:
+                    response.raise_for_status()
+                    return await response.json(loads=orjson.loads, content_type=None)
+                retry_after = response.headers.get("Retry-After")
+            delay = float(retry_after) if retry_after and retry_after.isdigit() else 2 ** attempt
+            logger.warning(f"Finnhub rate limit (429) on {path}, retrying in {delay:.1f}s (attempt {attempt + 1}/{MAX_RETRIES})")
+            await asyncio.sleep(delay)
+
+    async def get_daily_snapshot_quote(self, symbol: str) -> Optional[Quote]:
         """
         Fetches the latest available daily quote (OHLC, previous close) for a symbol.
         Uses the /quote endpoint.
-        Returns a single-row DataFrame.
+        Returns a Quote record; DataFrames are only built once, for batches.
         """
         try:
-            loop = asyncio.get_running_loop()
-            # client.quote is synchronous
-            quote_data = await loop.run_in_executor(None, self.client.quote, symbol)
+            quote_data = await self._request("/quote", symbol=symbol)
             
             if not quote_data or quote_data.get('c') is None: # Check if current price is missing, indicating no valid data
                 logger.warning(f"No valid quote data returned for {symbol} from Finnhub. Response: {quote_data}")
                 return None
 
-            # Convert to DataFrame
             # Timestamp 't' is for when the quote was generated. 
             # For EOD, this usually represents the market close day.
-            df = pd.DataFrame({
-                'open': [quote_data.get('o')],
-                'high': [quote_data.get('h')],
-                'low': [quote_data.get('l')],
-                'close': [quote_data.get('c')], # Current price, effectively close for EOD
-                'previous_close': [quote_data.get('pc')],
-                'timestamp': [pd.to_datetime(quote_data.get('t'), unit='s')]
-            })
-            df.set_index('timestamp', inplace=True)
+            quote = Quote(
+                symbol=symbol,
+                open=quote_data.get('o'),
+                high=quote_data.get('h'),
+                low=quote_data.get('l'),
+                close=quote_data.get('c'), # Current price, effectively close for EOD
+                previous_close=quote_data.get('pc'),
+                timestamp=quote_data.get('t'),
+            )
             logger.info(f"Successfully fetched daily snapshot quote for {symbol} from Finnhub.")
-            return df
-        except finnhub.FinnhubAPIException as e:
-            if e.status_code == 403:
+            return quote
+        except aiohttp.ClientResponseError as e:
+            status_code = e.status
+            if status_code == 403:
                  logger.error(f"Finnhub API access forbidden (403) for quote on {symbol}: {e}. This endpoint might also be restricted for your key.")
-            elif e.status_code == 429: 
+            elif status_code == 429: 
                  logger.error(f"Finnhub API rate limit hit (429) for quote on {symbol}: {e}")
             else:
-                 logger.error(f"Finnhub API exception for quote on {symbol}: {e} (Status: {e.status_code})")
+                 logger.error(f"Finnhub API exception for quote on {symbol}: {e} (Status: {status_code})")
             return None
         except Exception as e:
             logger.error(f"Error fetching daily snapshot quote for {symbol} from Finnhub: {e}", exc_info=True)
             return None
 
-    async def get_latest_daily_quotes_for_sp500(self) -> Dict[str, Optional[pd.DataFrame]]:
+    async def get_quote(self, symbol: str) -> Optional[Quote]:
+        """get_daily_snapshot_quote under the adapter's concurrency cap and rate limiter; safe to gather many at once."""
+        async with self._sem, self._limiter:
+            return await self.get_daily_snapshot_quote(symbol)
+
+    async def _fetch_quote(self, i: int, symbol: str) -> Optional[Quote]:
+        """Fetches one S&P 500 quote under the concurrency cap and rate limiter."""
+        async with self._sem, self._limiter: # Respect 60 calls/minute limit
+            logger.info(f"Fetching quote for {symbol} ({i+1}/{len(self.sp500_symbols)})...")
+            return await self.get_daily_snapshot_quote(symbol)
+
+    async def get_latest_daily_quotes_for_sp500(self) -> pd.DataFrame:
         """
         Fetches the latest daily snapshot quote for all loaded S&P 500 symbols.
+        Returns one DataFrame indexed by (symbol, timestamp); symbols without a valid quote are omitted.
         """
+        import pandas as pd # Deferred: only the batch path builds a DataFrame
         if not self.sp500_symbols:
             logger.warning("S&P 500 symbol list is empty. Cannot fetch quotes.")
-            return {}
+            return pd.DataFrame()
 
-        results: Dict[str, Optional[pd.DataFrame]] = {}
         logger.info(f"Fetching latest daily snapshot quotes for {len(self.sp500_symbols)} S&P 500 symbols...")
-        
-        for i, symbol in enumerate(self.sp500_symbols):
-            logger.info(f"Fetching quote for {symbol} ({i+1}/{len(self.sp500_symbols)})...")
-            quote_df = await self.get_daily_snapshot_quote(symbol)
-            results[symbol] = quote_df
-            
-            if (i + 1) < len(self.sp500_symbols):
-                await asyncio.sleep(1.1) # Respect 60 calls/minute limit
-        
-        logger.info(f"Finished fetching quotes for S&P 500. Results acquired for {sum(1 for df in results.values() if df is not None)} symbols.")
-        return results
+
+        # get_daily_snapshot_quote handles its own errors, so one bad symbol never cancels the group
+        async with asyncio.TaskGroup() as tg:
+            tasks = [tg.create_task(self._fetch_quote(i, symbol)) for i, symbol in enumerate(self.sp500_symbols)]
+        quotes = [asdict(quote) for task in tasks if (quote := task.result()) is not None]
+
+        logger.info(f"Finished fetching quotes for S&P 500. Results acquired for {len(quotes)} symbols.")
+        if not quotes:
+            return pd.DataFrame()
+        df = pd.DataFrame.from_records(quotes)
+        # Finnhub answers unknown or halted symbols with zeroed fields; drop them with one vectorized mask
+        valid = (df["close"] > 0) & (df["open"] > 0) & (df["high"] >= df["low"]) & df["timestamp"].notna()
+        if not valid.all():
+            logger.warning(f"Dropping {int((~valid).sum())} S&P 500 quotes with empty or inconsistent prices.")
+            df = df.loc[valid].copy()  # A real copy, so the timestamp assignment below doesn't write into a slice
+        df["timestamp"] = pd.to_datetime(df["timestamp"].to_numpy(dtype="int64"), unit="s")
+        df.set_index(["symbol", "timestamp"], inplace=True)
+        return df
     
     async def get_news_sentiment(self, symbol: str) -> Optional[List[Dict[str, Any]]]:
         """
@@ -147,17 +234,17 @@ class FinnhubAdapter:
         Free plan usually allows this for major stocks.
         """
         try:
-            loop = asyncio.get_running_loop()
-            news_sentiment = await loop.run_in_executor(None, self.client.news_sentiment, symbol)
+            news_sentiment = await self._request("/news-sentiment", symbol=symbol)
             logger.info(f"Fetched news sentiment for {symbol}. Count: {len(news_sentiment) if news_sentiment else 0}")
             return news_sentiment
-        except finnhub.FinnhubAPIException as e:
-            if e.status_code == 403:
+        except aiohttp.ClientResponseError as e:
+            status_code = e.status
+            if status_code == 403:
                 logger.error(f"Finnhub API access forbidden (403) for news sentiment on {symbol}: {e}.")
-            elif e.status_code == 429:
+            elif status_code == 429:
                  logger.error(f"Finnhub API rate limit hit (429) for news sentiment on {symbol}: {e}")
             else:
-                 logger.error(f"Finnhub API exception for news sentiment on {symbol}: {e} (Status: {e.status_code})")
+                 logger.error(f"Finnhub API exception for news sentiment on {symbol}: {e} (Status: {status_code})")
             return None
         except Exception as e:
             logger.error(f"Error fetching news sentiment for {symbol} from Finnhub: {e}", exc_info=True)
@@ -170,15 +257,7 @@ class FinnhubAdapter:
         Returns the raw JSON response which includes a 'data' list of monthly sentiment and the symbol.
         """
         try:
-            loop = asyncio.get_running_loop()
-            # client.stock_insider_sentiment is synchronous
-            sentiment_data = await loop.run_in_executor(
-                None, 
-                self.client.stock_insider_sentiment, 
-                symbol, 
-                from_date, 
-                to_date
-            )
+            sentiment_data = await self._request("/stock/insider-sentiment", symbol=symbol, **{"from": from_date, "to": to_date})
             
             if not sentiment_data or not sentiment_data.get('data'):
                 logger.warning(f"No insider sentiment data returned for {symbol} from {from_date} to {to_date}. Response: {sentiment_data}")
@@ -186,13 +265,14 @@ class FinnhubAdapter:
             
             logger.info(f"Successfully fetched insider sentiment for {symbol} from {from_date} to {to_date}. Number of monthly entries: {len(sentiment_data['data'])}")
             return sentiment_data # Contains {'data': [...], 'symbol': 'AAPL'}
-        except finnhub.FinnhubAPIException as e:
-            if e.status_code == 403:
+        except aiohttp.ClientResponseError as e:
+            status_code = e.status
+            if status_code == 403:
                  logger.error(f"Finnhub API access forbidden (403) for insider sentiment on {symbol}: {e}.")
-            elif e.status_code == 429: 
+            elif status_code == 429: 
                  logger.error(f"Finnhub API rate limit hit (429) for insider sentiment on {symbol}: {e}")
             else:
-                 logger.error(f"Finnhub API exception for insider sentiment on {symbol}: {e} (Status: {e.status_code})")
+                 logger.error(f"Finnhub API exception for insider sentiment on {symbol}: {e} (Status: {status_code})")
             return None
         except Exception as e:
             logger.error(f"Error fetching insider sentiment for {symbol} from Finnhub: {e}", exc_info=True)
@@ -206,11 +286,10 @@ class FinnhubAdapter:
         Returns a list of news dicts or None on error.
         """
         try:
-            loop = asyncio.get_running_loop()
-            news = await loop.run_in_executor(None, self.client.general_news, category, min_id)
+            news = await self._request("/news", category=category, minId=min_id)
             logger.info(f"Fetched {len(news)} news items from Finnhub (category={category}).")
             return news
-        except finnhub.FinnhubAPIException as e:
+        except aiohttp.ClientResponseError as e:
             logger.error(f"Finnhub API exception for market news: {e}")
             return None
         except Exception as e:
@@ -238,11 +317,20 @@ async def main_finnhub_test():
     if fh_adapter.sp500_symbols:
          logger.info(f"Sample of loaded S&P 500 symbols (first 5 from CSV): {fh_adapter.sp500_symbols[:5]}")
 
-    await asyncio.sleep(1.2) # Small delay before hammering API
+    # --- Fetch latest market news and a few quotes concurrently ---
+    # Running them together exercises the shared session, semaphore and limiter at once.
+    sample_symbols = fh_adapter.sp500_symbols[:3]
+    logger.info(f"\n--- Testing get_latest_market_news (category='general') alongside quotes for {sample_symbols} ---")
+    start = time.perf_counter()
+    news, *quotes = await asyncio.gather(
+        fh_adapter.get_latest_market_news(category='general'),
+        *[fh_adapter.get_quote(symbol) for symbol in sample_symbols],
+    )
+    logger.info(f"Concurrent Finnhub requests finished: elapsed_s={time.perf_counter() - start:.2f}")
+    for quote in quotes:
+        if quote is not None:
+            logger.info(f"Sample quote: {quote}")
 
-    # --- Fetch and print latest market news ---
-    logger.info("\n--- Testing get_latest_market_news (category='general') ---")
-    news = await fh_adapter.get_latest_market_news(category='general')
     if news:
         logger.info(f"Sample news headlines:")
         for item in news[:5]:
@@ -250,25 +338,22 @@ async def main_finnhub_test():
     else:
         logger.warning("No news returned or error occurred.")
 
+    await fh_adapter.close()
+
     # --- S&P 500 price fetching is commented out for now ---
     # logger.info("\n--- Testing get_latest_daily_quotes_for_sp500 (FULL LIST from CSV) ---")
     # if fh_adapter.sp500_symbols:
     #     start_time = time.time()
     #     sp500_data_full = await fh_adapter.get_latest_daily_quotes_for_sp500()
     #     end_time = time.time()
-    #     successful_fetches = sum(1 for df in sp500_data_full.values() if df is not None)
-    #     logger.info(f"Fetched quotes for {successful_fetches} out of {len(fh_adapter.sp500_symbols)} S&P 500 symbols.")
+    #     successful_symbols = set(sp500_data_full.index.get_level_values("symbol")) if not sp500_data_full.empty else set()
+    #     logger.info(f"Fetched quotes for {len(successful_symbols)} out of {len(fh_adapter.sp500_symbols)} S&P 500 symbols.")
     #     logger.info(f"Total time for full S&P 500 quote fetch: {end_time - start_time:.2f} seconds.")
-    #     count = 0
-    #     for symbol, df in sp500_data_full.items():
-    #         if df is not None and count < 3:
-    #             logger.info(f"Full list - Sample Quote for {symbol}:\n{df}")
-    #             count += 1
-    #         elif df is None and count < 10: 
-    #             logger.info(f"Full list - Failed to get quote for symbol: {symbol}")
-    #             count +=1 
+    #     logger.info(f"Full list - Sample Quotes:\n{sp500_data_full.head(3)}")
+    #     failed_symbols = [s for s in fh_adapter.sp500_symbols if s not in successful_symbols]
+    #     logger.info(f"Full list - Failed to get quotes for symbols: {failed_symbols[:10]}")
     # else:
     #     logger.warning("S&P 500 symbol list (from CSV) is empty. Skipping FULL S&P 500 quote test.")
 
 if __name__ == '__main__':
-    asyncio.run(main_finnhub_test()) 
\ No newline at end of file
+    run_async(main_finnhub_test()) 
\ No newline at end of file
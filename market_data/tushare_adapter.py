@@ -1,18 +1,95 @@
+import asyncio
 import tushare as ts
 import pandas as pd
 import logging
+import math
 import os
+import random
+import threading
+import time
+import requests
+from bisect import bisect_left
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta
-from typing import Optional, Dict
+from typing import Any, Iterator, Optional, Dict, List
 from config import settings
+from market_data._cache import ParquetTTLCache
 
 logger = logging.getLogger(__name__)
 
 # Read token from environment variable
 TUSHARE_API_TOKEN = settings.TUSHARE_API_TOKEN
+# Cap on in-flight Tushare requests so fan-outs stay within the API's rate limit
+MAX_CONCURRENT_TUSHARE_REQUESTS = 10
+# Cache lifetimes in seconds. Past trading days are immutable, so they never expire.
+STOCK_LIST_TTL = 24 * 3600
+TRADE_CAL_TTL = 30 * 24 * 3600
+INDEX_CLASSIFY_TTL = 7 * 24 * 3600
+INDEX_MEMBER_TTL = 24 * 3600
+CURRENT_DAY_TTL = 3600
+# Columns get_major_movers needs from the daily endpoint
+MOVERS_FIELDS = 'ts_code,trade_date,close,pct_chg'
+# Columns the per-index sector fallback requests from index_daily
+SECTOR_FIELDS = 'ts_code,trade_date,close,pct_chg,vol,amount'
+# Retry policy for transient Tushare failures
+MAX_RETRIES = 3
+RETRY_BASE_DELAY = 0.5
+RETRY_JITTER = 0.1
+# Tushare reports quota exhaustion as a plain exception message ("每分钟最多访问该接口N次")
+RATE_LIMIT_MARKERS = ("最多访问", "访问频率", "rate limit")
+
+# ts.pro_api clients shared by every adapter using the same token
+_PRO_CLIENTS: Dict[str, Any] = {}
+_PRO_CLIENTS_LOCK = threading.Lock()
+
+def _get_pro_client(token: str) -> Any:
+    """Returns the process-wide ts.pro_api client for a token, creating it on first use."""
+    client = _PRO_CLIENTS.get(token)
+    if client is None:
+        with _PRO_CLIENTS_LOCK:
+            client = _PRO_CLIENTS.get(token)
+            if client is None:
+                client = ts.pro_api(token)
+                _PRO_CLIENTS[token] = client
+    return client
+
+def _trade_date_ttl(trade_date: str) -> float:
+    """Cache lifetime for data keyed by a YYYYMMDD trade date."""
+    return math.inf if trade_date < datetime.now().strftime('%Y%m%d') else CURRENT_DAY_TTL
+
+def _combine_sector_frames(frames: List[Optional[pd.DataFrame]], name_map: Dict[str, str]) -> Optional[pd.DataFrame]:
+    """
+    Builds one frame from the per-index (typically one-row) frames and labels industries in one vectorized pass.
+    Rows are collected as records and constructed once, avoiding a dtype-unifying concat. None if all are empty.
+    """
+    records = [record for df in frames if df is not None and not df.empty for record in df.to_dict('records')]
+    if not records:
+        return None
+    result = pd.DataFrame.from_records(records)
+    result['industry_name'] = result['ts_code'].map(name_map)
+    return result
+
+def _numeric_pct_chg(daily_data: pd.DataFrame) -> Optional[pd.DataFrame]:
+    """Returns daily_data with pct_chg coerced to numeric and unconvertible rows dropped; None if the column is missing or coercion fails."""
+    # Ensure 'pct_chg' column exists and is numeric
+    if 'pct_chg' not in daily_data.columns:
+        logger.error("'pct_chg' column not found in daily market data.")
+        return None
+    try:
+        # Single pass: coerce once, keep rows that converted. Never mutates the (possibly memoized) input frame.
+        pct_chg = pd.to_numeric(daily_data['pct_chg'], errors='coerce')
+        valid = pct_chg.notna()
+        return daily_data.loc[valid].assign(pct_chg=pct_chg[valid])
+    except Exception as e:
+        logger.error(f"Error converting 'pct_chg' to numeric: {e}")
+        return None
+
+def _index_code_column(indices: pd.DataFrame) -> str:
+    """index_classify returns the index code as index_code; accept ts_code too for consistency with index_daily."""
+    return 'index_code' if 'index_code' in indices.columns else 'ts_code'
 
 class TushareAdapter:
-    def __init__(self, token: str = None):
+    def __init__(self, token: str = None, cache_dir: str = os.path.join(".cache", "tushare")):
         actual_token = token if token else TUSHARE_API_TOKEN
         if not actual_token:
             logger.error("Tushare API token not provided. Please set the TUSHARE_API_TOKEN environment variable or pass it during instantiation.")
@@ -23,35 +100,124 @@ class TushareAdapter:
              logger.warning("Using a placeholder Tushare API token string. Please ensure TUSHARE_API_TOKEN environment variable is set correctly.")
              # Depending on policy, you might still want to raise ValueError here
 
-        self.pro = ts.pro_api(actual_token)
+        self.pro = _get_pro_client(actual_token)
+        self._cache = ParquetTTLCache(cache_dir)
+        self._snapshots: Dict[str, tuple[float, pd.DataFrame]] = {} # trade_date -> (stored_at, merged daily + daily_basic frame)
+        self._trade_days: List[str] = []
+        self._trade_day_set: set = set()
         logger.info("Tushare Pro API initialized.")
 
-    def get_stock_list(self) -> Optional[pd.DataFrame]:
-        """Fetches the list of all stocks (stock_basic)."""
+    def _call(self, endpoint: str, **kwargs) -> Optional[pd.DataFrame]:
+        """
+        Calls self.pro.<endpoint>(**kwargs), retrying transient failures (network errors and Tushare's
+        per-minute quota message) with exponential backoff plus jitter. Other errors are raised immediately.
+        """
+        for attempt in range(MAX_RETRIES + 1):
+            try:
+                return getattr(self.pro, endpoint)(**kwargs)
+            except Exception as e:
+                transient = isinstance(e, requests.exceptions.RequestException) or any(marker in str(e) for marker in RATE_LIMIT_MARKERS)
+                if not transient or attempt == MAX_RETRIES:
+                    raise
+                delay = RETRY_BASE_DELAY * 2 ** attempt + random.uniform(0, RETRY_JITTER)
+                logger.warning(f"Transient Tushare error on {endpoint} ({e}); retrying in {delay:.2f}s (attempt {attempt + 1}/{MAX_RETRIES})")
+                time.sleep(delay)
+
+    def _cached_call(self, endpoint: str, ttl: float, cache: bool = True, **kwargs) -> Optional[pd.DataFrame]:
+        """Calls self.pro.<endpoint>(**kwargs) through the on-disk cache. cache=False forces a fresh request."""
+        if cache:
+            cached = self._cache.get(endpoint, kwargs, ttl)
+            if cached is not None:
+                logger.debug(f"Tushare cache hit for {endpoint} {kwargs}")
+                return cached
+        df = self._call(endpoint, **kwargs)
+        if cache and df is not None and not df.empty: # Empty answers may just mean "not published yet"
+            self._cache.set(endpoint, kwargs, df)
+        return df
+
+    def _trading_days(self, cache: bool = True) -> List[str]:
+        """
+        Sorted SSE open days (YYYYMMDD) from last January through the end of next year. Cached on disk for
+        TRADE_CAL_TTL and in memory; refetched when today falls past the cached range.
+        """
+        today = datetime.now().strftime('%Y%m%d')
+        if cache and self._trade_days and self._trade_days[-1] >= today:
+            return self._trade_days
+        year = datetime.now().year
+        # Year-aligned bounds keep the disk cache key stable for a whole year
+        params = dict(exchange='SSE', is_open='1', start_date=f"{year - 1}0101", end_date=f"{year + 1}1231", fields='cal_date')
+        cal = self._cached_call('trade_cal', TRADE_CAL_TTL, cache=cache, **params)
+        if cache and cal is not None and not cal.empty and cal['cal_date'].max() < today:
+            cal = self._cached_call('trade_cal', TRADE_CAL_TTL, cache=False, **params) # Stale calendar on disk
+        self._trade_days = sorted(cal['cal_date'].astype(str)) if cal is not None else []
+        self._trade_day_set = set(self._trade_days)
+        return self._trade_days
+
+    def _is_trading_day(self, trade_date: str) -> bool:
+        """
+        O(1) check against the cached SSE calendar. Dates outside the cached range, or an unavailable
+        calendar, are treated as trading days so requests are never skipped on missing information.
+        """
+        try:
+            days = self._trading_days()
+        except Exception as e:
+            logger.warning(f"Could not load Tushare trade calendar to check {trade_date}: {e}")
+            return True
+        if not days or not (days[0] <= trade_date <= days[-1]):
+            return True
+        return trade_date in self._trade_day_set
+
+    def get_last_trading_day(self) -> str:
+        """
+        Returns the last SSE trading day strictly before today (YYYYMMDD), so defaults skip weekends and
+        holidays. Falls back to yesterday if the trade calendar is unavailable.
+        """
+        today = datetime.now().strftime('%Y%m%d')
+        try:
+            days = self._trading_days()
+            i = bisect_left(days, today)
+            if i > 0:
+                return days[i - 1]
+        except Exception as e:
+            logger.warning(f"Could not resolve last trading day from Tushare trade calendar: {e}")
+        return (datetime.now() - timedelta(days=1)).strftime('%Y%m%d')
+
+    def get_stock_list(self, cache: bool = True) -> Optional[pd.DataFrame]:
+        """
+        Fetches the list of all stocks (stock_basic).
+        'area' and 'industry' are returned as category dtype: ~5000 rows share a few dozen values each.
+        """
         try:
-            data = self.pro.stock_basic(exchange='', list_status='L', fields='ts_code,symbol,name,area,industry,list_date')
+            data = self._cached_call('stock_basic', STOCK_LIST_TTL, cache=cache, exchange='', list_status='L', fields='ts_code,symbol,name,area,industry,list_date')
+            data = data.astype({'area': 'category', 'industry': 'category'})
             logger.info(f"Successfully fetched {len(data)} stocks from Tushare.")
             return data
         except Exception as e:
             logger.error(f"Error fetching stock list from Tushare: {e}", exc_info=True)
             return None
 
-    def get_daily_market_data(self, trade_date: str = None, ts_code: str = None) -> Optional[pd.DataFrame]:
+    def get_daily_market_data(self, trade_date: str = None, ts_code: str = None, cache: bool = True, fields: str = None) -> Optional[pd.DataFrame]:
         """
         Fetches daily market data (OHLCV, percent change, etc.) for specific stocks or all stocks for a trade_date.
         trade_date format: YYYYMMDD
         ts_code: Tushare stock code, e.g., '600519.SH'. If None, fetches for all stocks (might be large).
+        fields: Optional comma-separated column list to shrink the response, e.g. 'ts_code,trade_date,pct_chg'.
         """
         if not trade_date:
-            trade_date = (datetime.now() - timedelta(days=1)).strftime('%Y%m%d') # Default to yesterday
+            trade_date = self.get_last_trading_day()
             logger.info(f"trade_date not provided, defaulting to {trade_date}")
+        elif not self._is_trading_day(trade_date):
+            logger.info(f"{trade_date} is not a trading day; skipping daily market data request.")
+            return None
 
         try:
+            # Without ts_code this fetches all stocks on the date
+            params = {'trade_date': trade_date}
             if ts_code:
-                df = self.pro.daily(ts_code=ts_code, trade_date=trade_date)
-            else:
-                # Fetching for all stocks on a specific date
-                df = self.pro.daily(trade_date=trade_date)
+                params['ts_code'] = ts_code
+            if fields:
+                params['fields'] = fields
+            df = self._cached_call('daily', _trade_date_ttl(trade_date), cache=cache, **params)
             
             logger.info(f"Fetched daily market data for {ts_code or 'all stocks'} on {trade_date}. Rows: {len(df) if df is not None else 0}")
             return df
@@ -59,90 +225,197 @@ class TushareAdapter:
             logger.error(f"Error fetching daily market data from Tushare for {ts_code or 'all stocks'} on {trade_date}: {e}", exc_info=True)
             return None
 
-    def get_daily_basic_metrics(self, trade_date: str = None, ts_code: str = None) -> Optional[pd.DataFrame]:
+    def get_daily_basic_metrics(self, trade_date: str = None, ts_code: str = None, cache: bool = True, fields: str = None) -> Optional[pd.DataFrame]:
         """
         Fetches daily basic metrics (PE, PB, turnover rate, total market cap, etc.).
         trade_date format: YYYYMMDD
         ts_code: Tushare stock code. If None, fetches for all stocks.
+        fields: Optional comma-separated column list to shrink the response.
         """
         if not trade_date:
-            trade_date = (datetime.now() - timedelta(days=1)).strftime('%Y%m%d')
+            trade_date = self.get_last_trading_day()
             logger.info(f"trade_date not provided for daily_basic, defaulting to {trade_date}")
+        elif not self._is_trading_day(trade_date):
+            logger.info(f"{trade_date} is not a trading day; skipping daily basic metrics request.")
+            return None
         
         try:
+            params = {'trade_date': trade_date}
             if ts_code:
-                df = self.pro.daily_basic(ts_code=ts_code, trade_date=trade_date)
-            else:
-                df = self.pro.daily_basic(trade_date=trade_date)
+                params['ts_code'] = ts_code
+            if fields:
+                params['fields'] = fields
+            df = self._cached_call('daily_basic', _trade_date_ttl(trade_date), cache=cache, **params)
             logger.info(f"Fetched daily basic metrics for {ts_code or 'all stocks'} on {trade_date}. Rows: {len(df) if df is not None else 0}")
             return df
         except Exception as e:
             logger.error(f"Error fetching daily basic metrics from Tushare for {ts_code or 'all stocks'} on {trade_date}: {e}", exc_info=True)
             return None
 
-    def get_major_movers(self, trade_date: str = None, top_n: int = 10) -> Dict[str, pd.DataFrame]:
+    def _memoized_snapshot(self, trade_date: str) -> Optional[pd.DataFrame]:
+        """The memoized snapshot for trade_date, unless it has outlived _trade_date_ttl (only today's can)."""
+        entry = self._snapshots.get(trade_date)
+        if entry is None or time.time() - entry[0] > _trade_date_ttl(trade_date):
+            return None
+        return entry[1]
+
+    def get_daily_snapshot(self, trade_date: str = None, cache: bool = True) -> Optional[pd.DataFrame]:
+        """
+        Fetches daily and daily_basic for all stocks on trade_date in parallel and merges them on
+        (ts_code, trade_date); overlapping daily_basic columns get a '_basic' suffix.
+        The merged frame is memoized per trade date so later lookups on this adapter skip both requests;
+        the current day's entry expires after CURRENT_DAY_TTL like the on-disk cache.
+        """
+        if not trade_date:
+            trade_date = self.get_last_trading_day()
+            logger.info(f"trade_date not provided for daily snapshot, defaulting to {trade_date}")
+        if cache and (snapshot := self._memoized_snapshot(trade_date)) is not None:
+            return snapshot
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            daily_future = executor.submit(self.get_daily_market_data, trade_date, None, cache)
+            basic_future = executor.submit(self.get_daily_basic_metrics, trade_date, None, cache)
+            daily, basic = daily_future.result(), basic_future.result()
+
+        if daily is None or daily.empty:
+            logger.warning(f"No daily market data for snapshot on {trade_date}.")
+            return None
+        if basic is not None and not basic.empty:
+            snapshot = daily.merge(basic, on=['ts_code', 'trade_date'], how='outer', suffixes=('', '_basic'))
+        else:
+            logger.warning(f"No daily basic metrics for snapshot on {trade_date}; using daily data only.")
+            snapshot = daily
+        self._snapshots[trade_date] = (time.time(), snapshot)
+        return snapshot
+
+    def iter_daily_market_data(self, trade_date: str = None, chunk_size: int = 500, cache: bool = True, fields: str = None) -> Iterator[pd.DataFrame]:
+        """
+        Yields all-stock daily market data for trade_date in slices of chunk_size ts_codes (from stock_basic),
+        so callers can process the market incrementally instead of holding one full-market frame.
+        """
+        if not trade_date:
+            trade_date = self.get_last_trading_day()
+            logger.info(f"trade_date not provided for chunked daily data, defaulting to {trade_date}")
+        stocks = self.get_stock_list(cache=cache)
+        if stocks is None or stocks.empty:
+            logger.warning(f"No stock list available to chunk daily market data for {trade_date}.")
+            return
+        ts_codes = stocks['ts_code'].tolist()
+        for i in range(0, len(ts_codes), chunk_size):
+            chunk = self.get_daily_market_data(trade_date=trade_date, ts_code=','.join(ts_codes[i:i + chunk_size]), cache=cache, fields=fields)
+            if chunk is not None and not chunk.empty:
+                yield chunk
+
+    def get_major_movers(self, trade_date: str = None, top_n: int = 10, cache: bool = True, chunk_size: Optional[int] = None) -> Dict[str, pd.DataFrame]:
         """
         Identifies top N gainers and losers for a given trade date.
+        With chunk_size, the market is streamed via iter_daily_market_data and only each chunk's top/bottom N
+        rows are kept, bounding memory by the chunk size.
         Returns a dictionary with 'gainers' and 'losers' DataFrames.
         """
-        daily_data = self.get_daily_market_data(trade_date=trade_date)
-        if daily_data is None or daily_data.empty:
-            logger.warning(f"No daily market data to identify major movers for {trade_date}.")
-            return {"gainers": pd.DataFrame(), "losers": pd.DataFrame()}
+        if chunk_size:
+            gainer_parts, loser_parts = [], []
+            for chunk in self.iter_daily_market_data(trade_date=trade_date, chunk_size=chunk_size, cache=cache, fields=MOVERS_FIELDS):
+                chunk = _numeric_pct_chg(chunk)
+                if chunk is not None:
+                    gainer_parts.append(chunk.nlargest(top_n, 'pct_chg'))
+                    loser_parts.append(chunk.nsmallest(top_n, 'pct_chg'))
+            if not gainer_parts:
+                logger.warning(f"No daily market data to identify major movers for {trade_date}.")
+                return {"gainers": pd.DataFrame(), "losers": pd.DataFrame()}
+            gainers = pd.concat(gainer_parts, ignore_index=True).nlargest(top_n, 'pct_chg')
+            losers = pd.concat(loser_parts, ignore_index=True).nsmallest(top_n, 'pct_chg')
+        else:
+            # Reuse an already-loaded snapshot; otherwise only the columns needed for ranking are requested
+            daily_data = self._memoized_snapshot(trade_date) if cache else None
+            if daily_data is None:
+                daily_data = self.get_daily_market_data(trade_date=trade_date, cache=cache, fields=MOVERS_FIELDS)
+            if daily_data is None or daily_data.empty:
+                logger.warning(f"No daily market data to identify major movers for {trade_date}.")
+                return {"gainers": pd.DataFrame(), "losers": pd.DataFrame()}
 
-        # Ensure 'pct_chg' column exists and is numeric
-        if 'pct_chg' not in daily_data.columns:
-            logger.error("'pct_chg' column not found in daily market data.")
-            return {"gainers": pd.DataFrame(), "losers": pd.DataFrame()}
-        
-        try:
-            daily_data['pct_chg'] = pd.to_numeric(daily_data['pct_chg'], errors='coerce')
-            daily_data = daily_data.dropna(subset=['pct_chg']) # Remove rows where conversion failed
-        except Exception as e:
-            logger.error(f"Error converting 'pct_chg' to numeric: {e}")
-            return {"gainers": pd.DataFrame(), "losers": pd.DataFrame()}
+            daily_data = _numeric_pct_chg(daily_data)
+            if daily_data is None:
+                return {"gainers": pd.DataFrame(), "losers": pd.DataFrame()}
 
+            # Partial selection instead of two full sorts
+            gainers = daily_data.nlargest(top_n, 'pct_chg')
+            losers = daily_data.nsmallest(top_n, 'pct_chg')
 
-        gainers = daily_data.sort_values(by='pct_chg', ascending=False).head(top_n)
-        losers = daily_data.sort_values(by='pct_chg', ascending=True).head(top_n)
+        # Attach names/industries with one join per side instead of per-ticker lookups
+        stocks = self.get_stock_list(cache=cache)
+        if stocks is not None and not stocks.empty:
+            stock_info = stocks[['ts_code', 'name', 'industry']]
+            gainers = gainers.merge(stock_info, on='ts_code', how='left')
+            losers = losers.merge(stock_info, on='ts_code', how='left')
         
         logger.info(f"Identified top {top_n} gainers and losers for {trade_date}.")
         return {"gainers": gainers, "losers": losers}
 
-    def get_sector_performance(self, trade_date: str = None) -> Optional[pd.DataFrame]:
+    def _fetch_one_sector(self, ts_code: str, industry_name: str, trade_date: str, cache: bool = True) -> Optional[pd.DataFrame]:
+        """Fetches index_daily for one industry index. industry_name is only used for logging. Returns None on error."""
+        try:
+            return self._cached_call('index_daily', _trade_date_ttl(trade_date), cache=cache, ts_code=ts_code, trade_date=trade_date, fields=SECTOR_FIELDS)
+        except Exception as e:
+            logger.warning(f"Error fetching data for sector {industry_name}: {e}")
+            return None
+
+    def _fetch_sectors_bulk(self, indices: pd.DataFrame, trade_date: str, cache: bool = True) -> Optional[pd.DataFrame]:
+        """
+        Fetches all SW industry index quotes for trade_date in a single sw_daily call and keeps the
+        indices listed in 'indices'. Returns None if the endpoint fails or matches nothing.
+        """
+        try:
+            all_idx = self._cached_call('sw_daily', _trade_date_ttl(trade_date), cache=cache, trade_date=trade_date)
+            if all_idx is None or all_idx.empty:
+                return None
+            # sw_daily names the change column pct_change; index_daily (and callers) use pct_chg
+            all_idx = all_idx.rename(columns={'pct_change': 'pct_chg'})
+            code_col = _index_code_column(indices)
+            codes = indices[[code_col, 'industry_name']].rename(columns={code_col: 'ts_code'})
+            result = all_idx.merge(codes, on='ts_code', how='inner')
+            return result if not result.empty else None
+        except Exception as e:
+            logger.warning(f"Bulk sw_daily fetch failed for {trade_date}, falling back to per-sector requests: {e}")
+            return None
+
+    def get_sector_performance(self, trade_date: str = None, cache: bool = True) -> Optional[pd.DataFrame]:
         """
         Fetches daily performance data for all sectors/industries.
         Returns a DataFrame with sector performance metrics.
         """
         if not trade_date:
-            trade_date = (datetime.now() - timedelta(days=1)).strftime('%Y%m%d')
+            trade_date = self.get_last_trading_day()
             logger.info(f"trade_date not provided for sector performance, defaulting to {trade_date}")
+        elif not self._is_trading_day(trade_date):
+            logger.info(f"{trade_date} is not a trading day; skipping sector performance requests.")
+            return None
 
         try:
             # Get all industry indices
-            indices = self.pro.index_classify(level='L1', src='SW')
+            indices = self._cached_call('index_classify', INDEX_CLASSIFY_TTL, cache=cache, level='L1', src='SW')
             if indices is None or indices.empty:
                 logger.error("Failed to fetch industry indices")
                 return None
 
-            # Get daily data for each industry index
-            sector_data = []
-            for _, row in indices.iterrows():
-                try:
-                    daily = self.pro.index_daily(ts_code=row['ts_code'], trade_date=trade_date)
-                    if daily is not None and not daily.empty:
-                        daily['industry_name'] = row['industry_name']
-                        sector_data.append(daily)
-                except Exception as e:
-                    logger.warning(f"Error fetching data for sector {row['industry_name']}: {e}")
-                    continue
-
-            if not sector_data:
-                logger.warning(f"No sector data found for {trade_date}")
-                return None
+            # One bulk call for every SW index on the date; fall back to per-index requests if it is unavailable
+            result = self._fetch_sectors_bulk(indices, trade_date, cache)
+            if result is None:
+                sector_data = []
+                code_col = _index_code_column(indices)
+                name_map = dict(zip(indices[code_col].to_numpy(), indices['industry_name'].to_numpy()))
+                with ThreadPoolExecutor(max_workers=MAX_CONCURRENT_TUSHARE_REQUESTS) as executor:
+                    futures = [
+                        executor.submit(self._fetch_one_sector, ts_code, industry_name, trade_date, cache)
+                        for ts_code, industry_name in name_map.items()
+                    ]
+                    for future in as_completed(futures):
+                        sector_data.append(future.result())
 
-            # Combine all sector data
-            result = pd.concat(sector_data, ignore_index=True)
+                result = _combine_sector_frames(sector_data, name_map)
+                if result is None:
+                    logger.warning(f"No sector data found for {trade_date}")
+                    return None
             # Sort by percentage change
             result = result.sort_values(by='pct_chg', ascending=False)
             
@@ -152,13 +425,62 @@ class TushareAdapter:
             logger.error(f"Error fetching sector performance data: {e}", exc_info=True)
             return None
 
-    def get_sector_constituents(self, sector_code: str) -> Optional[pd.DataFrame]:
+    async def aget_daily_market_data(self, trade_date: str = None, ts_code: str = None, cache: bool = True, fields: str = None) -> Optional[pd.DataFrame]:
+        """Async variant of get_daily_market_data; the blocking SDK call runs in a worker thread."""
+        return await asyncio.to_thread(self.get_daily_market_data, trade_date, ts_code, cache, fields)
+
+    async def aget_daily_basic_metrics(self, trade_date: str = None, ts_code: str = None, cache: bool = True, fields: str = None) -> Optional[pd.DataFrame]:
+        """Async variant of get_daily_basic_metrics; the blocking SDK call runs in a worker thread."""
+        return await asyncio.to_thread(self.get_daily_basic_metrics, trade_date, ts_code, cache, fields)
+
+    async def aget_sector_performance(self, trade_date: str = None, cache: bool = True) -> Optional[pd.DataFrame]:
+        """
+        Async variant of get_sector_performance. SDK calls run in worker threads so the event loop stays free;
+        the per-index fallback is fanned out with gather under a semaphore.
+        """
+        if not trade_date:
+            trade_date = await asyncio.to_thread(self.get_last_trading_day)
+            logger.info(f"trade_date not provided for sector performance, defaulting to {trade_date}")
+        elif not await asyncio.to_thread(self._is_trading_day, trade_date):
+            logger.info(f"{trade_date} is not a trading day; skipping sector performance requests.")
+            return None
+
+        try:
+            indices = await asyncio.to_thread(self._cached_call, 'index_classify', INDEX_CLASSIFY_TTL, cache, level='L1', src='SW')
+            if indices is None or indices.empty:
+                logger.error("Failed to fetch industry indices")
+                return None
+
+            result = await asyncio.to_thread(self._fetch_sectors_bulk, indices, trade_date, cache)
+            if result is None:
+                code_col = _index_code_column(indices)
+                name_map = dict(zip(indices[code_col].to_numpy(), indices['industry_name'].to_numpy()))
+                sem = asyncio.Semaphore(MAX_CONCURRENT_TUSHARE_REQUESTS)
+
+                async def _fetch(ts_code: str, industry_name: str) -> Optional[pd.DataFrame]:
+                    async with sem:
+                        return await asyncio.to_thread(self._fetch_one_sector, ts_code, industry_name, trade_date, cache)
+
+                sector_data = await asyncio.gather(*[_fetch(ts_code, industry_name) for ts_code, industry_name in name_map.items()])
+                result = _combine_sector_frames(sector_data, name_map)
+                if result is None:
+                    logger.warning(f"No sector data found for {trade_date}")
+                    return None
+            result = result.sort_values(by='pct_chg', ascending=False)
+
+            logger.info(f"Successfully fetched sector performance data for {trade_date}")
+            return result
+        except Exception as e:
+            logger.error(f"Error fetching sector performance data: {e}", exc_info=True)
+            return None
+
+    def get_sector_constituents(self, sector_code: str, cache: bool = True) -> Optional[pd.DataFrame]:
         """
         Fetches the list of stocks that belong to a specific sector/industry.
         sector_code: The Tushare industry code (e.g., from index_classify)
         """
         try:
-            constituents = self.pro.index_member(index_code=sector_code)
+            constituents = self._cached_call('index_member', INDEX_MEMBER_TTL, cache=cache, index_code=sector_code)
             if constituents is None or constituents.empty:
                 logger.warning(f"No constituents found for sector {sector_code}")
                 return None
@@ -171,7 +493,6 @@ class TushareAdapter:
 
 # Example Usage (for testing this module directly)
 async def main_tushare_test():
-    import asyncio
     logging.basicConfig(level=logging.INFO)
     
     # IMPORTANT: Ensure TUSHARE_API_TOKEN environment variable is set before running.
@@ -185,30 +506,25 @@ async def main_tushare_test():
         logger.info("Example: set TUSHARE_API_TOKEN=your_actual_token_here (Windows CMD)")
         return
 
-    logger.info("--- Testing get_stock_list ---")
-    stock_list = adapter.get_stock_list()
-    if stock_list is not None:
-        logger.info(f"First 5 stocks:\n{stock_list.head()}")
+    # Test with the most recent completed trading day (YYYYMMDD format), resolved from the cached trade calendar
+    test_trade_date = adapter.get_last_trading_day()
 
-    # Test with a specific recent trade date (YYYYMMDD format)
-    # Adjust this date to a valid recent trading day if needed
-    test_trade_date = (datetime.now() - timedelta(days=1)).strftime('%Y%m%d') 
-    # You might need to adjust if yesterday was not a trading day. 
-    # Tushare also has a trade_cal endpoint to check trading days.
-    
-    logger.info(f"--- Testing get_daily_market_data for a specific stock on {test_trade_date} ---")
+    # The SDK is blocking, so each call runs in a worker thread and the independent calls are gathered.
     # Example stock: Ping An Bank (平安银行)
-    daily_data_single = adapter.get_daily_market_data(ts_code='000001.SZ', trade_date=test_trade_date)
+    logger.info(f"--- Testing get_stock_list, get_daily_market_data, get_daily_basic_metrics and get_major_movers for {test_trade_date} concurrently ---")
+    stock_list, daily_data_single, daily_basic_single, movers = await asyncio.gather(
+        asyncio.to_thread(adapter.get_stock_list),
+        asyncio.to_thread(adapter.get_daily_market_data, trade_date=test_trade_date, ts_code='000001.SZ'),
+        asyncio.to_thread(adapter.get_daily_basic_metrics, trade_date=test_trade_date, ts_code='000001.SZ'),
+        asyncio.to_thread(adapter.get_major_movers, trade_date=test_trade_date, top_n=5),
+    )
+
+    if stock_list is not None:
+        logger.info(f"First 5 stocks:\n{stock_list.head()}")
     if daily_data_single is not None:
         logger.info(f"Daily data for 000001.SZ:\n{daily_data_single}")
-
-    logger.info(f"--- Testing get_daily_basic_metrics for a specific stock on {test_trade_date} ---")
-    daily_basic_single = adapter.get_daily_basic_metrics(ts_code='000001.SZ', trade_date=test_trade_date)
     if daily_basic_single is not None:
         logger.info(f"Daily basic metrics for 000001.SZ:\n{daily_basic_single}")
-
-    logger.info(f"--- Testing get_major_movers for {test_trade_date} ---")
-    movers = adapter.get_major_movers(trade_date=test_trade_date, top_n=5)
     if movers["gainers"] is not None:
         logger.info(f"Top 5 Gainers:\n{movers['gainers']}")
     if movers["losers"] is not None:
@@ -222,8 +538,6 @@ async def main_tushare_test():
 
 
 if __name__ == '__main__':
-    import asyncio
-    # Note: Tushare SDK is synchronous, so direct asyncio.run is fine for this example.
-    # If integrating into a larger async app, you might run these synchronous calls 
-    # in a thread pool executor (e.g., asyncio.to_thread in Python 3.9+)
+    # Note: Tushare SDK is synchronous; main_tushare_test shows running its calls via asyncio.to_thread
+    # (or use the aget_* methods) so they don't block the event loop in a larger async app.
     asyncio.run(main_tushare_test()) 
\ No newline at end of file
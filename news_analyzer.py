@@ -1,25 +1,41 @@
 # Standard Library Imports
 import asyncio
+import heapq
 import logging
 import os
+import random
 import re
+import threading
+import time
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Tuple
-import textwrap
+from functools import cached_property, lru_cache
+from types import MappingProxyType
+from typing import AsyncIterator, Dict, List, Mapping, Optional, Tuple
 import argparse
 import pytz
 
 # Third-Party Imports
 import pandas as pd
+try:
+    import re2 as _regex
+except ImportError:  # google-re2 not installed; fall back to the backtracking engine
+    _regex = re
 from bson import ObjectId
-from pymongo import MongoClient, UpdateOne
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
 
 # Local Application Imports
 from config import settings
 from email_utils import EmailService
-from llm_utils import (GEMINI_MODELS_CONFIG, create_clients,
-                       send_query_to_first_available_model)
+from llm_utils import (GEMINI_MODELS_CONFIG, build_model_callers, create_clients,
+                       collect_batch_job, resolve_batch_model, send_query_with_model_callers,
+                       submit_batch_job)
 from market_data.tushare_adapter import TushareAdapter
+from utils.analysis_cache import AnalysisCache, prompt_cache_key
+from utils.content_dedup import BlockRegistry, condense
+from utils.event_loop import run_async
+from utils.rate_limiter import AsyncRequestTokenLimiter
 from crawlers.eastmoney_market_crawler import EastmoneyMarketCrawler
 
 
@@ -31,95 +47,349 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# --- LLM Worker Pool ---
+LLM_WORKER_COUNT = 4  # Concurrent LLM calls per batch
+LLM_MAX_CONCURRENCY = 8  # Concurrent LLM calls across all batches/sources processed at once
+LLM_QUEUE_MAXSIZE = 64  # Backpressure bound between the article feed and the workers
+LLM_RPM = 60  # Provider request budget per minute, shared by all workers
+LLM_TPM = 100_000  # Provider token budget per minute (estimated from prompt length)
+SAVE_FLUSH_SIZE = 10  # Results buffered per source before they are written to Mongo
+SAVE_FLUSH_INTERVAL_SECONDS = 30  # ...or how long they may wait, whichever comes first
+BULK_WRITE_CHUNK_SIZE = 1000  # Upper bound on ops per bulk_write, keeping each request well under the 16MB message cap
+LLM_MAX_ATTEMPTS = 3  # Full passes over the model list before an article is marked failed
+LLM_MAX_BACKOFF_SECONDS = 30
+MIN_CONTENT_CHARS = 20  # Articles with less body text than this are not worth an LLM call
 
-def extract_analysis_details(analysis_text: str) -> Dict:
+# --- Mongo Access ---
+# Partial index holding only unanalyzed articles, so it stays small however large the collection grows.
+# Writers (crawlers, Finnhub importer) always store analyzed=False, and save_analysis flips it to True.
+UNANALYZED_INDEX = [("fetched_at", -1)]
+UNANALYZED_INDEX_OPTIONS = {"name": "unanalyzed_by_fetched_at", "partialFilterExpression": {"analyzed": False}}
+BATCH_API_MIN_AGE = timedelta(hours=6)  # With use_batch_api, articles fetched longer ago than this go to the Batch API
+BATCH_JOBS_COLLECTION = "llm_batch_jobs"  # Per source database: Batch API jobs submitted but not yet collected
+ARTICLE_PROJECTION = {"_id": 1, "title": 1, "content": 1, "source": 1, "url": 1, "fetched_at": 1}  # Fields the analysis reads
+
+# --- LLM Response Patterns (compiled once) ---
+# RE2 matches in linear time, which matters for the DOTALL captures over long responses.
+# Flags are written inline so the same patterns compile under both re2 and re.
+_RE_IMPORTANCE = _regex.compile(r"(?i)Importance_Score:\s*(\d+)")
+_RE_SENTIMENT = _regex.compile(r"(?i)Sentiment_Score:\s*(\d+)")
+_RE_SECTOR_BLOCK = _regex.compile(r"(?is)Affected_Sectors_Start(.*?)Affected_Sectors_End")
+_RE_SECTOR_ITEM = _regex.compile(r"(?m)^\s*-\s*(.*)")
+_RE_SUMMARY = _regex.compile(r"(?is)Analysis_Summary:\s*(.*)")
+
+# --- Prompt Templates ---
+# Built once at import and filled with str.format_map. The indentation inside the strings is part of the
+# prompt (and of its analysis cache key), so it is kept exactly as the original inline f-strings had it.
+_EVENING_PROMPT_TEMPLATE = """
+            Analyze the following Chinese news article in the context of today's market performance.
+
+            **Market Context:**
+            {market_context}
+
+            **News Article:**
+            - **Title:** "{title}"
+            - **Content:** "{content}"
+            - **Source:** "{source}"
+            - **URL:** {url}
+
+            **Your Task:**
+            Provide a structured analysis in Chinese. Your entire response MUST strictly follow the format below, using the exact headers without any markdown (like ** or *):
+
+            Importance_Score: [1-10, where 10 is critically important. Be conservative: only use 8+ for major policy changes, large company earnings, or significant market events. Most routine news should be 5-7.]
+            Sentiment_Score: [1-10, where 1 is very negative, 5 is neutral, 10 is very positive]
+            Affected_Sectors_Start
+            - [Sector Name 1]: [Brief explanation of the impact]
+            - [Sector Name 2]: [Brief explanation of the impact]
+            Affected_Sectors_End
+            Analysis_Summary: [A concise summary of your reasoning and predictive analysis, explaining why this news is or isn't important based on the market context.]
+            """
+
+_MORNING_PROMPT_TEMPLATE = """
+            Analyze the following US news article and its potential impact on the Chinese stock market.
+
+            **News Article:**
+            - **Title:** "{title}"
+            - **Content:** "{content}"
+            - **Source:** "{source}"
+            - **URL:** {url}
+
+            **Your Task:**
+            Provide a structured analysis in Chinese. Your entire response MUST strictly follow the format below, using the exact headers without any markdown (like ** or *):
+
+            Importance_Score: [1-10, where 10 is critically important. Be conservative: only use 8+ for major policy changes, large company earnings, or significant market events. Most routine news should be 5-7.]
+            Sentiment_Score: [1-10, where 1 is very negative, 5 is neutral, 10 is very positive]
+            Affected_Sectors_Start
+            - [Sector Name 1]: [Brief explanation of the impact]
+            - [Sector Name 2]: [Brief explanation of the impact]
+            Affected_Sectors_End
+            Analysis_Summary: [A concise summary of your reasoning and predictive analysis]
+
+            **Example Response Format:**
+            Importance_Score: 7
+            Sentiment_Score: 8
+            Affected_Sectors_Start
+            - 新能源汽车: 美国市场的政策变化可能影响中国相关产业链的出口预期。
+            - 半导体: 对全球供应链的担忧可能传导至中国的芯片设计和制造公司。
+            Affected_Sectors_End
+            Analysis_Summary: 该新闻预示着美国新能源政策的重大转变，可能对中国的相关出口构成挑战，但也会加速国内市场的整合。预计短期内相关板块将承压。
+            """
+
+
+class _PromptFields(dict):
+    """Article fields for a prompt template; missing keys render as N/A, like article.get(key, 'N/A')."""
+    def __missing__(self, key):
+        return "N/A"
+
+
+# --- US -> China Stock Mapping (read-only; shared by every caller) ---
+US_CHINA_STOCK_MAPPING: Mapping[str, Tuple[str, ...]] = MappingProxyType({
+    "TSLA": ("002594.SZ", "300750.SZ"),  # Tesla -> BYD, CATL
+    "AAPL": ("002475.SZ", "002241.SZ"),  # Apple -> Luxshare, Goertek
+    "NVDA": ("002049.SZ", "300782.SZ"),  # NVIDIA -> Unisoc, Cambricon
+    "AMD": ("688012.SH", "688396.SH"),   # AMD -> Montage, Hygon
+    "INTC": ("688012.SH", "688396.SH"),  # Intel -> Montage, Hygon
+    "MSFT": ("002230.SZ", "300454.SZ"),  # Microsoft -> Kingsoft, Wondershare
+    "GOOGL": ("002230.SZ", "300454.SZ"), # Google -> Kingsoft, Wondershare
+    "META": ("002230.SZ", "300454.SZ"),  # Meta -> Kingsoft, Wondershare
+    "AMZN": ("002024.SZ", "002251.SZ"),  # Amazon -> Suning, 360
+    "NFLX": ("300413.SZ", "300133.SZ"),  # Netflix -> iQiyi, Huace
+    # Add more mappings as needed
+})
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token estimate for rate limiting; mixed Chinese/English prompts average ~3 chars per token."""
+    return max(1, len(text) // 3)
+
+
+def _column_values(df: pd.DataFrame, column: str) -> List:
+    """Returns a column as a plain list, or Nones when the source did not provide it."""
+    if column not in df.columns:
+        return [None] * len(df)
+    return df[column].tolist()
+
+
+def _numeric_column_values(df: pd.DataFrame, column: str) -> List[float]:
+    """Returns a column coerced to floats, with missing or unparsable values as 0.0."""
+    if column not in df.columns:
+        return [0.0] * len(df)
+    return pd.to_numeric(df[column], errors="coerce").fillna(0.0).tolist()
+
+
+def _leading_int(text: str) -> Optional[int]:
+    """Parses the number at the start of text, skipping leading whitespace as the score patterns do."""
+    text = text.lstrip()
+    end = 0
+    while end < len(text) and text[end].isdecimal():
+        end += 1
+    return int(text[:end]) if end else None
+
+
+def _parse_analysis_lines(analysis_text: str) -> Optional[Tuple[int, Tuple[str, ...], int, str]]:
     """
-    Extracts structured information from the LLM's analysis text using a simple, robust format.
+    Single-pass parser for the header format the prompt asks for, one header per line.
+    Returns None when either score header is missing, or the sectors block is never closed (everything after
+    Affected_Sectors_Start, the summary included, would be swallowed), so the caller can fall back to the regex scan.
     """
-    if not analysis_text:
-        logger.warning("Analysis text is empty. Returning default details.")
-        return {
-            "importance_score": 0,
-            "sectors": [],
-            "sentiment_score": 0,
-            "analysis_summary": ""
-        }
-    
-    details = {
-        "importance_score": 0,
-        "sectors": [],
-        "sentiment_score": 0,
-        "analysis_summary": ""
-    }
+    importance_score = sentiment_score = None
+    sectors: Tuple[str, ...] = ()
+    sector_lines: Optional[List[str]] = None  # Not None while inside the sectors block
+    summary_lines: Optional[List[str]] = None  # Not None once the summary header has been seen
+
+    for line in analysis_text.splitlines():
+        if summary_lines is not None:
+            summary_lines.append(line)  # The summary runs to the end of the response
+            continue
+        stripped = line.strip()
+        header = stripped[:22].lower()
+        if sector_lines is not None:
+            if header.startswith("affected_sectors_end"):
+                sectors = tuple(sector_lines)
+                sector_lines = None
+            elif stripped.startswith("-"):
+                sector_lines.append(stripped[1:].strip())
+        elif header.startswith("importance_score:"):
+            if importance_score is None:
+                importance_score = _leading_int(stripped[17:])
+        elif header.startswith("sentiment_score:"):
+            if sentiment_score is None:
+                sentiment_score = _leading_int(stripped[16:])
+        elif header.startswith("affected_sectors_start"):
+            sector_lines = []
+        elif header.startswith("analysis_summary:"):
+            summary_lines = [stripped[17:]]
+
+    if importance_score is None or sentiment_score is None or sector_lines is not None:
+        return None
+    analysis_summary = "\n".join(summary_lines).strip() if summary_lines is not None else ""
+    return importance_score, sectors, sentiment_score, analysis_summary
+
+
+@lru_cache(maxsize=2048)
+def _extract_analysis_cached(analysis_text: str) -> Tuple[int, Tuple[str, ...], int, str]:
+    """
+    Parses an LLM response into (importance, sectors, sentiment, summary).
+    Cached because retries and failure sentinels hand back identical text; results are immutable so hits can be shared.
+    Well-formed responses take the single-pass line parser; anything else gets the more forgiving regex scan.
+    """
+    parsed = _parse_analysis_lines(analysis_text)
+    if parsed is not None:
+        logger.debug(f"Parsed analysis in a single pass. Details: Importance={parsed[0]}, Sentiment={parsed[2]}")
+        return parsed
+    logger.debug("Score headers not found at line starts; falling back to regex extraction.")
+
+    importance_score, sectors, sentiment_score, analysis_summary = 0, (), 0, ""
 
     try:
         # Importance Score
-        importance_match = re.search(r"Importance_Score:\s*(\d+)", analysis_text, re.IGNORECASE)
+        importance_match = _RE_IMPORTANCE.search(analysis_text)
         if importance_match:
-            details["importance_score"] = int(importance_match.group(1))
-            logger.debug(f"Found importance score: {details['importance_score']}")
+            importance_score = int(importance_match.group(1))
+            logger.debug(f"Found importance score: {importance_score}")
         else:
             logger.debug("Importance_Score pattern not found.")
 
         # Sentiment Score
-        sentiment_match = re.search(r"Sentiment_Score:\s*(\d+)", analysis_text, re.IGNORECASE)
+        sentiment_match = _RE_SENTIMENT.search(analysis_text)
         if sentiment_match:
-            details["sentiment_score"] = int(sentiment_match.group(1))
-            logger.debug(f"Found sentiment score: {details['sentiment_score']}")
+            sentiment_score = int(sentiment_match.group(1))
+            logger.debug(f"Found sentiment score: {sentiment_score}")
         else:
             logger.debug("Sentiment_Score pattern not found.")
 
         # Affected Sectors
-        sector_section_match = re.search(r"Affected_Sectors_Start(.*?)Affected_Sectors_End", analysis_text, re.DOTALL | re.IGNORECASE)
+        sector_section_match = _RE_SECTOR_BLOCK.search(analysis_text)
         if sector_section_match:
             sector_text = sector_section_match.group(1)
             # Find all list items (lines starting with -)
-            sector_lines = re.findall(r"^\s*-\s*(.*)", sector_text, re.MULTILINE)
+            sector_lines = _RE_SECTOR_ITEM.findall(sector_text)
             if sector_lines:
-                details["sectors"] = [line.strip() for line in sector_lines]
-                logger.debug(f"Found sectors: {details['sectors']}")
+                sectors = tuple(line.strip() for line in sector_lines)
+                logger.debug(f"Found sectors: {sectors}")
             else:
                 logger.debug("Sector items format ('- [Sector]: [Description]') not found in sector section.")
         else:
             logger.debug("Affected_Sectors_Start/End block not found.")
         
         # Analysis Summary
-        summary_match = re.search(r"Analysis_Summary:\s*(.*)", analysis_text, re.DOTALL | re.IGNORECASE)
+        summary_match = _RE_SUMMARY.search(analysis_text)
         if summary_match:
-            details["analysis_summary"] = summary_match.group(1).strip()
+            analysis_summary = summary_match.group(1).strip()
             logger.debug(f"Found analysis summary.")
         else:
             logger.debug("Analysis_Summary pattern not found.")
 
-        logger.debug(f"Finished extraction. Details: Importance={details['importance_score']}, Sentiment={details['sentiment_score']}")
+        logger.debug(f"Finished extraction. Details: Importance={importance_score}, Sentiment={sentiment_score}")
     except Exception as e:
         logger.error(f"Error during regex extraction in extract_analysis_details: {e}", exc_info=True)
     
-    return details
+    return importance_score, sectors, sentiment_score, analysis_summary
+
+
+def extract_analysis_details(analysis_text: str) -> Dict:
+    """
+    Extracts structured information from the LLM's analysis text using a simple, robust format.
+    """
+    if not analysis_text:
+        logger.warning("Analysis text is empty. Returning default details.")
+        return {
+            "importance_score": 0,
+            "sectors": [],
+            "sentiment_score": 0,
+            "analysis_summary": ""
+        }
+
+    importance_score, sectors, sentiment_score, analysis_summary = _extract_analysis_cached(analysis_text)
+    return {
+        "importance_score": importance_score,
+        "sectors": list(sectors),
+        "sentiment_score": sentiment_score,
+        "analysis_summary": analysis_summary
+    }
+
+
+# Motor clients are bound to the event loop they first run on, so keep one (and its connection pool) per loop and URI.
+_MOTOR_CLIENTS: Dict[Tuple[asyncio.AbstractEventLoop, str], AsyncIOMotorClient] = {}
+
+
+def get_motor_client(mongo_uri: str) -> AsyncIOMotorClient:
+    """Returns the shared Motor client for mongo_uri on the running event loop, creating it on first use."""
+    key = (asyncio.get_running_loop(), mongo_uri)
+    client = _MOTOR_CLIENTS.get(key)
+    if client is None:
+        client = _MOTOR_CLIENTS[key] = AsyncIOMotorClient(mongo_uri)
+    return client
+
+
+def _build_component(label: str, factory):
+    """Constructs a NewsAnalyzer dependency, returning None (after logging) if it fails."""
+    try:
+        component = factory()
+        logger.info(f"{label} initialized successfully.")
+        return component
+    except Exception as e:
+        logger.error(f"Failed to initialize {label}: {e}", exc_info=True)
+        return None
 
 
 class NewsAnalyzer:
-    def __init__(self, mongo_uri: str = "mongodb://localhost:27017/"):
-        self.client = MongoClient(mongo_uri)
-        logger.info(f"NewsAnalyzer initialized with MongoDB URI: {mongo_uri}")
+    def __init__(self, mongo_uri: str = "mongodb://localhost:27017/", use_batch_api: bool = False):
+        self.mongo_uri = mongo_uri
+        # Send backlog articles (older than BATCH_API_MIN_AGE) as one discounted batch job instead of interactive calls
+        self.use_batch_api = use_batch_api
+        self.llm_limiter = AsyncRequestTokenLimiter(rpm=LLM_RPM, tpm=LLM_TPM)
+        # Per-batch worker pools multiply when sources run concurrently; this caps the total in flight
+        self.llm_semaphore = asyncio.Semaphore(LLM_MAX_CONCURRENCY)
+        self._indexed_collections = set()
+        self.block_registry = BlockRegistry()
+        self._market_context: Optional[Tuple[asyncio.AbstractEventLoop, asyncio.Future]] = None
         try:
-            self.studio_client, self.vertex_client = create_clients()
-            logger.info("LLM clients created successfully.")
-            
-            self.tushare_adapter = TushareAdapter()
-            logger.info("Tushare adapter initialized successfully.")
-            
-            self.eastmoney_crawler = EastmoneyMarketCrawler()
-            logger.info("Eastmoney crawler initialized successfully.")
-            
-            self.email_service = EmailService()
-            logger.info("Email service initialized successfully.")
+            self.analysis_cache = AnalysisCache()
         except Exception as e:
-            logger.error(f"Failed to initialize components: {e}", exc_info=True)
-            self.studio_client, self.vertex_client = None, None
-            self.tushare_adapter = None
-            self.eastmoney_crawler = None
-            self.email_service = None
+            logger.warning(f"Analysis cache unavailable, every article will be sent to the LLM: {e}")
+            self.analysis_cache = None
+        # LLM clients are created on first use (see model_callers), so runs that only hit the cache skip credential discovery
+        self._model_callers: Optional[list] = None
+        self._studio_client = None
+        self._model_callers_lock = threading.Lock()
+        logger.info(f"NewsAnalyzer initialized with MongoDB URI: {mongo_uri}")
+
+    @property
+    def client(self) -> AsyncIOMotorClient:
+        """Motor client for the running event loop, shared with any other analyzer using the same URI."""
+        return get_motor_client(self.mongo_uri)
+
+    # Market data and email components are built on first use: morning runs never touch
+    # Tushare/Eastmoney, and email is only needed when an alert fires.
+    # A failed construction is logged once and cached as None.
+
+    @property
+    def model_callers(self) -> list:
+        """Model callers in fallback order; the genai clients are built on first access. A failed build yields []."""
+        if self._model_callers is None:
+            with self._model_callers_lock:
+                if self._model_callers is None:
+                    try:
+                        self._studio_client, vertex_client = create_clients()
+                        self._model_callers = build_model_callers(self._studio_client, vertex_client, GEMINI_MODELS_CONFIG)
+                        logger.info("LLM clients created successfully.")
+                    except Exception as e:
+                        logger.error(f"Failed to initialize LLM clients: {e}", exc_info=True)
+                        self._model_callers = []
+        return self._model_callers
+
+    @cached_property
+    def tushare_adapter(self) -> Optional[TushareAdapter]:
+        return _build_component("Tushare adapter", TushareAdapter)
+
+    @cached_property
+    def eastmoney_crawler(self) -> Optional[EastmoneyMarketCrawler]:
+        return _build_component("Eastmoney crawler", EastmoneyMarketCrawler)
+
+    @cached_property
+    def email_service(self) -> Optional[EmailService]:
+        return _build_component("Email service", EmailService)
 
     async def get_market_movers(self):
         """
@@ -127,62 +397,86 @@ class NewsAnalyzer:
         from Eastmoney (Dragon and Tiger List) and Tushare (Sector Performance).
         """
         all_movers = []
-        
-        # 1. Fetch from Eastmoney Dragon and Tiger List
-        try:
-            # Note: This returns a pandas DataFrame
-            lhb_df = await self.eastmoney_crawler.fetch_dragon_tiger_list()
-            if lhb_df is not None and not lhb_df.empty:
-                logger.info(f"Successfully fetched {len(lhb_df)} records from Eastmoney LHB.")
-                for index, item in lhb_df.iterrows():
-                    try:
-                        all_movers.append({
-                            "name": item.get("SECURITY_NAME_ABBR"),
-                            "change_pct": float(item.get("CHANGE_RATE", 0)),
-                            "reason": item.get("EXPLAIN")
-                        })
-                    except (ValueError, TypeError) as e:
-                        logger.warning(f"Could not parse item from LHB data: {item}. Error: {e}")
-        except Exception as e:
-            logger.error(f"Error fetching data from Eastmoney LHB: {e}", exc_info=True)
 
-        # 2. Fetch from Tushare Sector Performance
-        try:
-            sector_data = self.tushare_adapter.get_sector_performance()
-            if sector_data is not None and not sector_data.empty:
-                logger.info(f"Successfully fetched {len(sector_data)} records from Tushare Sectors.")
-                for index, item in sector_data.iterrows():
-                    try:
-                        all_movers.append({
-                            "name": item.get("name"),
-                            "change_pct": float(item.get("pct_chg", 0)),
-                            "reason": "Sector Performance"
-                        })
-                    except (ValueError, TypeError) as e:
-                        logger.warning(f"Could not parse item from Tushare sector data: {item}. Error: {e}")
-        except Exception as e:
-            logger.error(f"Error fetching data from Tushare Sectors: {e}", exc_info=True)
+        # Each leg looks up its component inside the coroutine, so a component that failed to build (None)
+        # or a call that raises is reported per source below instead of escaping the gather
+        async def fetch_lhb():
+            crawler = self.eastmoney_crawler
+            return await crawler.fetch_dragon_tiger_list() if crawler is not None else None
+
+        async def fetch_sectors():
+            adapter = self.tushare_adapter
+            return await adapter.aget_sector_performance() if adapter is not None else None
+
+        # Both sources are independent network fetches, so run them concurrently
+        # Note: each returns a pandas DataFrame
+        lhb_df, sector_data = await asyncio.gather(fetch_lhb(), fetch_sectors(), return_exceptions=True)
+
+        # 1. Eastmoney Dragon and Tiger List
+        if isinstance(lhb_df, BaseException):
+            logger.error(f"Error fetching data from Eastmoney LHB: {lhb_df}", exc_info=lhb_df)
+        elif lhb_df is not None and not lhb_df.empty:
+            logger.info(f"Successfully fetched {len(lhb_df)} records from Eastmoney LHB.")
+            all_movers.extend(
+                {"name": n, "change_pct": c, "reason": r}
+                for n, c, r in zip(
+                    _column_values(lhb_df, "SECURITY_NAME_ABBR"),
+                    _numeric_column_values(lhb_df, "CHANGE_RATE"),
+                    _column_values(lhb_df, "EXPLAIN"),
+                )
+            )
+
+        # 2. Tushare Sector Performance
+        if isinstance(sector_data, BaseException):
+            logger.error(f"Error fetching data from Tushare Sectors: {sector_data}", exc_info=sector_data)
+        elif sector_data is not None and not sector_data.empty:
+            logger.info(f"Successfully fetched {len(sector_data)} records from Tushare Sectors.")
+            # The per-index fallback frames carry industry_name instead of name
+            name_column = "name" if "name" in sector_data else "industry_name"
+            all_movers.extend(
+                {"name": n, "change_pct": c, "reason": "Sector Performance"}
+                for n, c in zip(
+                    _column_values(sector_data, name_column),
+                    _numeric_column_values(sector_data, "pct_chg"),
+                )
+            )
 
         if not all_movers:
             logger.warning("No market mover data available from any source.")
             return {"gainers": [], "losers": []}
 
         # 3. Sort and return top gainers and losers
-        seen_names = set()
-        unique_movers = []
+        unique_movers = {}
         for mover in all_movers:
-            if mover.get('name') and mover['name'] not in seen_names:
-                unique_movers.append(mover)
-                seen_names.add(mover['name'])
+            if mover.get('name'):
+                unique_movers.setdefault(mover['name'], mover)  # First source to report a name wins
 
-        sorted_movers = sorted(unique_movers, key=lambda x: x.get('change_pct', 0), reverse=True)
-        
-        gainers = [m for m in sorted_movers if m.get('change_pct', 0) > 0][:10]
-        losers = sorted([m for m in sorted_movers if m.get('change_pct', 0) < 0], key=lambda x: x.get('change_pct', 0))[:10]
+        # Only the ten from each end are needed, so select with heaps instead of sorting everything
+        gainers = heapq.nlargest(10, (m for m in unique_movers.values() if m['change_pct'] > 0), key=lambda x: x['change_pct'])
+        losers = heapq.nsmallest(10, (m for m in unique_movers.values() if m['change_pct'] < 0), key=lambda x: x['change_pct'])
 
         logger.info(f"Identified {len(gainers)} top gainers and {len(losers)} top losers.")
         return {"gainers": gainers, "losers": losers}
 
+    def close(self):
+        """Closes the SMTP session if an alert opened one; the lazy components are not built just to close them."""
+        email_service = self.__dict__.get("email_service")  # cached_property stores the built value here
+        if email_service:
+            email_service.close()
+
+    async def get_market_context_str(self) -> str:
+        """
+        Formatted market movers for evening prompts. Fetched once per event loop and shared, so sources
+        processed concurrently don't each hit Eastmoney and Tushare for the same data.
+        """
+        loop = asyncio.get_running_loop()
+        if self._market_context is None or self._market_context[0] is not loop:
+            async def fetch() -> str:
+                return self.format_market_movers_for_prompt(await self.get_market_movers())
+            self._market_context = (loop, asyncio.ensure_future(fetch()))
+        # Shielded so one cancelled source doesn't cancel the fetch the others are waiting on
+        return await asyncio.shield(self._market_context[1])
+
     def format_market_movers_for_prompt(self, market_movers: Dict) -> str:
         """Formats the market movers data into a string for the LLM prompt."""
         
@@ -202,175 +496,314 @@ class NewsAnalyzer:
 
         return f"Market Context:\n{gainers_str}\n{losers_str}"
 
-    def get_us_china_stock_mapping(self) -> Dict[str, List[str]]:
+    def get_us_china_stock_mapping(self) -> Mapping[str, Tuple[str, ...]]:
         """
         Returns a mapping of US stocks to their Chinese counterparts.
         This is a simplified version - you might want to expand this with more sophisticated mapping logic.
         """
+        return US_CHINA_STOCK_MAPPING
+
+    async def _query_llm_with_retry(self, prompt: str, article_id) -> Optional[Tuple[str, str]]:
+        """
+        Sends the prompt through the model fallback chain, retrying the whole chain with exponential backoff
+        when every model fails (typically a transient 429/5xx). Returns None once all attempts are exhausted.
+        """
+        for attempt in range(LLM_MAX_ATTEMPTS):
+            try:
+                # Gate submission on the shared RPM/TPM budget instead of sleeping after every article
+                async with self.llm_semaphore:
+                    await self.llm_limiter.acquire(estimate_tokens(prompt))
+                    # The genai call is blocking; run it in a thread so the worker pool actually overlaps.
+                    llm_output = await asyncio.to_thread(send_query_with_model_callers, prompt, self.model_callers)
+                if llm_output:
+                    return llm_output
+                logger.warning(f"All models failed for article ID {article_id} (attempt {attempt + 1}/{LLM_MAX_ATTEMPTS}).")
+            except Exception as e:
+                logger.warning(f"LLM call raised for article ID {article_id} (attempt {attempt + 1}/{LLM_MAX_ATTEMPTS}): {e}")
+
+            if attempt + 1 < LLM_MAX_ATTEMPTS:
+                await asyncio.sleep(min(2 ** attempt + random.random(), LLM_MAX_BACKOFF_SECONDS))
+
+        logger.error(f"Giving up on article ID {article_id} after {LLM_MAX_ATTEMPTS} attempts.")
+        return None
+
+    def _build_result(self, article: Dict, analysis_type: str, analysis_text: str, db_name: Optional[str], collection_name: Optional[str]) -> Dict:
+        """Parses the raw LLM text and packages it with the article metadata for saving and alerting."""
+        article_id = article.get("_id", "N/A")
+        extracted_details = extract_analysis_details(analysis_text)
+        logger.info(f"Extracted analysis for article ID: {article_id} - Importance: {extracted_details.get('importance_score')}, Sentiment: {extracted_details.get('sentiment_score')}")
+        
         return {
-            "TSLA": ["002594.SZ", "300750.SZ"],  # Tesla -> BYD, CATL
-            "AAPL": ["002475.SZ", "002241.SZ"],  # Apple -> Luxshare, Goertek
-            "NVDA": ["002049.SZ", "300782.SZ"],  # NVIDIA -> Unisoc, Cambricon
-            "AMD": ["688012.SH", "688396.SH"],   # AMD -> Montage, Hygon
-            "INTC": ["688012.SH", "688396.SH"],  # Intel -> Montage, Hygon
-            "MSFT": ["002230.SZ", "300454.SZ"],  # Microsoft -> Kingsoft, Wondershare
-            "GOOGL": ["002230.SZ", "300454.SZ"], # Google -> Kingsoft, Wondershare
-            "META": ["002230.SZ", "300454.SZ"],  # Meta -> Kingsoft, Wondershare
-            "AMZN": ["002024.SZ", "002251.SZ"],  # Amazon -> Suning, 360
-            "NFLX": ["300413.SZ", "300133.SZ"],  # Netflix -> iQiyi, Huace
-            # Add more mappings as needed
+            "article_id": article_id,
+            "article_title": article.get("title", "N/A"),
+            "article_source_db_name": db_name or "N/A",
+            "article_source_collection_name": collection_name or "N/A",
+            "article_url": article.get("url", "N/A"),
+            "analysis_type": analysis_type,
+            "analysis_raw": analysis_text,
+            "analysis_structured": extracted_details,
+            "analyzed_at": datetime.now()
         }
 
-    async def analyze_news_article(self, article: Dict, analysis_type: str = "evening") -> Dict:
+    @staticmethod
+    def _build_prompt(article: Dict, analysis_type: str, prompt_content: str, market_context_str: Optional[str]) -> str:
+        """Formats the analysis prompt; evening prompts embed the market context, morning ones target US news."""
+        fields = _PromptFields(article)
+        fields["content"] = prompt_content
+        if analysis_type == "evening":
+            fields["market_context"] = market_context_str or ""
+            return _EVENING_PROMPT_TEMPLATE.format_map(fields)
+        return _MORNING_PROMPT_TEMPLATE.format_map(fields)
+
+    async def analyze_news_article(self, article: Dict, analysis_type: str = "evening", market_context_str: Optional[str] = None,
+                                   db_name: Optional[str] = None, collection_name: Optional[str] = None) -> Dict:
         """
         Analyze a single news article using Gemini LLM.
         analysis_type: "morning" or "evening" to determine the focus of analysis
+        market_context_str: Pre-formatted market movers for evening analysis; fetched here only if not supplied.
+        db_name / collection_name: Source of the article, recorded on the result.
         """
         article_id = article.get("_id", "N/A")
         article_title = article.get("title", "N/A")
         logger.info(f"Starting {analysis_type} analysis for article ID: {article_id}, Title: '{article_title[:50]}...'")
 
-        # Get market context
-        market_context = ""
-        
-        prompt = "" # Initialize prompt to prevent UnboundLocalError
-        if analysis_type == "evening":
-            movers = await self.get_market_movers()
-            market_context = self.format_market_movers_for_prompt(movers)
-            prompt = f"""
-            Analyze the following Chinese news article in the context of today's market performance.
-
-            **Market Context:**
-            {market_context}
-
-            **News Article:**
-            - **Title:** "{article.get('title', 'N/A')}"
-            - **Content:** "{article.get('content', 'N/A')}"
-            - **Source:** "{article.get('source', 'N/A')}"
-            - **URL:** {article.get('url', 'N/A')}
-
-            **Your Task:**
-            Provide a structured analysis in Chinese. Your entire response MUST strictly follow the format below, using the exact headers without any markdown (like ** or *):
-
-            Importance_Score: [1-10, where 10 is critically important. Be conservative: only use 8+ for major policy changes, large company earnings, or significant market events. Most routine news should be 5-7.]
-            Sentiment_Score: [1-10, where 1 is very negative, 5 is neutral, 10 is very positive]
-            Affected_Sectors_Start
-            - [Sector Name 1]: [Brief explanation of the impact]
-            - [Sector Name 2]: [Brief explanation of the impact]
-            Affected_Sectors_End
-            Analysis_Summary: [A concise summary of your reasoning and predictive analysis, explaining why this news is or isn't important based on the market context.]
-            """
-        else:  # morning analysis
-            prompt = f"""
-            Analyze the following US news article and its potential impact on the Chinese stock market.
-
-            **News Article:**
-            - **Title:** "{article.get('title', 'N/A')}"
-            - **Content:** "{article.get('content', 'N/A')}"
-            - **Source:** "{article.get('source', 'N/A')}"
-            - **URL:** {article.get('url', 'N/A')}
-
-            **Your Task:**
-            Provide a structured analysis in Chinese. Your entire response MUST strictly follow the format below, using the exact headers without any markdown (like ** or *):
-
-            Importance_Score: [1-10, where 10 is critically important. Be conservative: only use 8+ for major policy changes, large company earnings, or significant market events. Most routine news should be 5-7.]
-            Sentiment_Score: [1-10, where 1 is very negative, 5 is neutral, 10 is very positive]
-            Affected_Sectors_Start
-            - [Sector Name 1]: [Brief explanation of the impact]
-            - [Sector Name 2]: [Brief explanation of the impact]
-            Affected_Sectors_End
-            Analysis_Summary: [A concise summary of your reasoning and predictive analysis]
-
-            **Example Response Format:**
-            Importance_Score: 7
-            Sentiment_Score: 8
-            Affected_Sectors_Start
-            - 新能源汽车: 美国市场的政策变化可能影响中国相关产业链的出口预期。
-            - 半导体: 对全球供应链的担忧可能传导至中国的芯片设计和制造公司。
-            Affected_Sectors_End
-            Analysis_Summary: 该新闻预示着美国新能源政策的重大转变，可能对中国的相关出口构成挑战，但也会加速国内市场的整合。预计短期内相关板块将承压。
-            """
+        content = article.get("content")
+        if not content or len(content.strip()) < MIN_CONTENT_CHARS:
+            logger.info(f"Skipping LLM analysis for article ID: {article_id}: no usable content.")
+            return self._build_result(article, analysis_type, "", db_name, collection_name)
+        # Drop passages the source repeated within the article
+        prompt_content = condense(content)
 
-        if not prompt:
-            logger.error(f"Prompt was not generated for article {article_id} with analysis type {analysis_type}.")
-            return {}
+        if analysis_type == "evening" and market_context_str is None:
+            market_context_str = await self.get_market_context_str()
+        prompt = self._build_prompt(article, analysis_type, prompt_content, market_context_str)
 
         try:
             analysis_text = ""
-            if self.studio_client or self.vertex_client:
-                llm_output = send_query_to_first_available_model(
-                    query=prompt,
-                    studio_client=self.studio_client,
-                    vertex_client=self.vertex_client,
-                    models_config=GEMINI_MODELS_CONFIG
-                )
+            cache_key = prompt_cache_key(prompt)
+            cached = self.analysis_cache.get(cache_key) if self.analysis_cache else None
+            # Wire copy republished by another outlet reuses the analysis of the earlier article
+            duplicate_text = None if cached else self.block_registry.find_duplicate(content, analysis_type)
+            if cached:
+                model_used, analysis_text = cached
+                logger.info(f"Reusing cached {model_used} analysis for article ID: {article_id}.")
+            elif duplicate_text:
+                analysis_text = duplicate_text
+                logger.info(f"Reusing analysis of an earlier article with the same text for article ID: {article_id}.")
+            elif self.model_callers:
+                llm_output = await self._query_llm_with_retry(prompt, article_id)
+                if not llm_output:
+                    # Every attempt failed; leave the article unanalyzed so the next run retries it
+                    return {}
                 # Handle potential tuple return from the LLM utility function
                 if isinstance(llm_output, tuple):
                     model_used, analysis_text = llm_output # Unpack model name and response
                     logger.debug(f"LLM analysis completed with model: {model_used}")
                 else:
-                    analysis_text = llm_output
+                    model_used, analysis_text = None, llm_output
+                if analysis_text and self.analysis_cache:
+                    self.analysis_cache.set(cache_key, model_used, analysis_text)
+                if analysis_text:
+                    self.block_registry.register(content, analysis_type, analysis_text)
                 
                 logger.debug(f"LLM raw analysis to be parsed: {analysis_text}") # Log the raw response for debugging
             else:
                 logger.error("LLM clients not initialized and not using mock. Cannot analyze.")
                 raise ValueError("LLM clients not initialized and not using mock.")
 
-            extracted_details = extract_analysis_details(analysis_text)
-            logger.info(f"Extracted analysis for article ID: {article_id} - Importance: {extracted_details.get('importance_score')}, Sentiment: {extracted_details.get('sentiment_score')}")
-            
-            return {
-                "article_id": article_id,
-                "article_title": article_title,
-                "article_source_db_name": article.get("db_name", "N/A"),
-                "article_source_collection_name": article.get("collection_name", "N/A"),
-                "article_url": article.get("url", "N/A"),
-                "analysis_type": analysis_type,
-                "analysis_raw": analysis_text,
-                "analysis_structured": extracted_details,
-                "analyzed_at": datetime.now()
-            }
+            return self._build_result(article, analysis_type, analysis_text, db_name, collection_name)
         except Exception as e:
             logger.error(f"Error querying LLM for article ID {article_id}: {e}", exc_info=True)
             return {}
 
-    async def analyze_batch(self, articles: List[Dict], db_name: str, collection_name: str, analysis_type: str = "evening") -> List[Dict]:
-        """Analyze a batch of news articles concurrently."""
+    async def iter_batch_results(self, articles: List[Dict], db_name: str, collection_name: str, analysis_type: str = "evening") -> AsyncIterator[Dict]:
+        """
+        Analyze a batch of news articles with a fixed pool of LLM workers, yielding each result as soon as it completes
+        (so in completion order, not input order).
+        """
+        async for _, result in self._iter_indexed_results(articles, db_name, collection_name, analysis_type):
+            yield result
+
+    async def _iter_indexed_results(self, articles: List[Dict], db_name: str, collection_name: str, analysis_type: str) -> AsyncIterator[Tuple[int, Dict]]:
+        """
+        Yields (index into articles, result) pairs as the workers finish them.
+        Articles are fed through a bounded queue so at most LLM_WORKER_COUNT calls are in flight.
+        """
         logger.info(f"Starting {analysis_type} batch analysis for {len(articles)} articles from {db_name}/{collection_name}.")
-        contextual_articles = []
+        if not articles:
+            return
+        # The market context is the same for every article (and every source), so fetch it once
+        market_context_str = None
+        if analysis_type == "evening":
+            market_context_str = await self.get_market_context_str()
+
+        # Build the LLM clients off the event loop; client construction blocks on credential lookups
+        await asyncio.to_thread(getattr, self, "model_callers")
+
+        queue: asyncio.Queue = asyncio.Queue(maxsize=LLM_QUEUE_MAXSIZE)
+        results: asyncio.Queue = asyncio.Queue()
+
+        async def llm_worker():
+            while True:
+                item = await queue.get()
+                try:
+                    if item is None:
+                        return
+                    index, article = item
+                    try:
+                        results.put_nowait((index, await self.analyze_news_article(article, analysis_type, market_context_str, db_name, collection_name)))
+                    except Exception as e:
+                        original_article_id = article.get('_id', 'Unknown ID')
+                        logger.error(f"Error analyzing article ID {original_article_id} in batch: {e}", exc_info=e)
+                        results.put_nowait((index, {
+                            "article_id": original_article_id,
+                            "article_title": article.get('title', 'N/A'),
+                            "analysis_type": analysis_type,
+                            "analysis_raw": "Analysis failed due to error.",
+                            "analysis_structured": extract_analysis_details("Analysis failed."),
+                            "analyzed_at": datetime.now(),
+                            "error": str(e)
+                        }))
+                finally:
+                    queue.task_done()
+
+        async def feed():
+            for item in enumerate(articles):
+                await queue.put(item)
+            for _ in workers:
+                await queue.put(None)  # Sentinel: one per worker
+
+        workers = [asyncio.create_task(llm_worker()) for _ in range(min(LLM_WORKER_COUNT, len(articles)))]
+        feeder = asyncio.create_task(feed())
+        try:
+            # Every article produces exactly one result (possibly an error record)
+            for _ in range(len(articles)):
+                yield await results.get()
+        finally:
+            # Only does work if the consumer stopped early
+            for task in (feeder, *workers):
+                task.cancel()
+            await asyncio.gather(feeder, *workers, return_exceptions=True)
+        logger.info(f"Finished {analysis_type} batch analysis for {db_name}/{collection_name}. Processed {len(articles)} results.")
+        if self.analysis_cache:
+            logger.info(f"Analysis cache stats so far: {self.analysis_cache.stats}")
+
+    async def analyze_batch(self, articles: List[Dict], db_name: str, collection_name: str, analysis_type: str = "evening") -> List[Dict]:
+        """Analyzes the whole batch and returns the results in the same order as articles."""
+        results: List[Dict] = [{}] * len(articles)
+        async for index, result in self._iter_indexed_results(articles, db_name, collection_name, analysis_type):
+            results[index] = result
+        return results
+
+    async def iter_batch_api_results(self, articles: List[Dict], db_name: str, collection_name: str, analysis_type: str = "evening") -> AsyncIterator[Dict]:
+        """
+        Batch API path for backlog articles; never waits for a job to finish. Articles without usable content and
+        analysis-cache hits are yielded right away. The rest are submitted as one job, recorded in BATCH_JOBS_COLLECTION
+        and marked with batch_job so later runs skip them; iter_collected_batch_results yields their analyses once
+        the job is done. If the job cannot be submitted, the articles fall back to the interactive workers.
+        """
+        logger.info(f"Starting {analysis_type} Batch API submission for {len(articles)} articles from {db_name}/{collection_name}.")
+        if not articles:
+            return
+        market_context_str = await self.get_market_context_str() if analysis_type == "evening" else None
+
+        pending = []  # (article, prompt, cache_key) still needing the LLM
         for article in articles:
-            article_copy = article.copy()
-            article_copy['db_name'] = db_name
-            article_copy['collection_name'] = collection_name
-            contextual_articles.append(article_copy)
-            
-        tasks = [self.analyze_news_article(article, analysis_type) for article in contextual_articles]
-        results = await asyncio.gather(*tasks, return_exceptions=True)
-
-        final_results = []
-        for i, res in enumerate(results):
-            if isinstance(res, Exception):
-                original_article_id = contextual_articles[i].get('_id', 'Unknown ID')
-                logger.error(f"Error analyzing article ID {original_article_id} in batch: {res}", exc_info=res)
-                final_results.append({
-                    "article_id": original_article_id,
-                    "article_title": contextual_articles[i].get('title', 'N/A'),
-                    "analysis_type": analysis_type,
-                    "analysis_raw": "Analysis failed due to error.",
-                    "analysis_structured": extract_analysis_details("Analysis failed."),
-                    "analyzed_at": datetime.now(),
-                    "error": str(res)
-                })
+            content = article.get("content")
+            if not content or len(content.strip()) < MIN_CONTENT_CHARS:
+                logger.info(f"Skipping LLM analysis for article ID: {article.get('_id', 'N/A')}: no usable content.")
+                yield self._build_result(article, analysis_type, "", db_name, collection_name)
+                continue
+            prompt = self._build_prompt(article, analysis_type, condense(content), market_context_str)
+            cache_key = prompt_cache_key(prompt)
+            cached = self.analysis_cache.get(cache_key) if self.analysis_cache else None
+            duplicate_text = None if cached else self.block_registry.find_duplicate(content, analysis_type)
+            if cached:
+                logger.info(f"Reusing cached {cached[0]} analysis for article ID: {article.get('_id', 'N/A')}.")
+                yield self._build_result(article, analysis_type, cached[1], db_name, collection_name)
+            elif duplicate_text:
+                logger.info(f"Reusing analysis of an earlier article with the same text for article ID: {article.get('_id', 'N/A')}.")
+                yield self._build_result(article, analysis_type, duplicate_text, db_name, collection_name)
             else:
-                final_results.append(res)
-            
-            # Add a small delay to avoid hitting API rate limits
-            await asyncio.sleep(1)
+                pending.append((article, prompt, cache_key))
+        if not pending:
+            return
 
-        logger.info(f"Finished {analysis_type} batch analysis for {db_name}/{collection_name}. Processed {len(final_results)} results.")
-        return final_results
+        await asyncio.to_thread(getattr, self, "model_callers")
+        batch_model = resolve_batch_model(GEMINI_MODELS_CONFIG)
+        try:
+            if self._studio_client is None or batch_model is None:
+                raise RuntimeError("no AI Studio client/model is available for batch jobs")
+            model_name_key, model_config = batch_model
+            job_name = await asyncio.to_thread(submit_batch_job, self._studio_client, model_name_key, model_config,
+                                               [prompt for _, prompt, _ in pending], f"{db_name}-{collection_name}-{analysis_type}")
+        except Exception as e:
+            logger.error(f"Could not submit Batch API job for {db_name}/{collection_name}, analyzing interactively instead: {e}", exc_info=True)
+            async for result in self.iter_batch_results([article for article, _, _ in pending], db_name, collection_name, analysis_type):
+                yield result
+            return
+
+        article_ids = [article["_id"] for article, _, _ in pending]
+        try:
+            db = self.client[db_name]
+            await db[BATCH_JOBS_COLLECTION].insert_one({
+                "_id": job_name,
+                "collection_name": collection_name,
+                "analysis_type": analysis_type,
+                "model": model_name_key,
+                "article_ids": article_ids,
+                "cache_keys": [cache_key for _, _, cache_key in pending],
+                "submitted_at": datetime.now(),
+            })
+            await db[collection_name].update_many({"_id": {"$in": article_ids}}, {"$set": {"batch_job": job_name}})
+            logger.info(f"Submitted Batch API job {job_name} for {len(article_ids)} articles from {db_name}/{collection_name}.")
+        except Exception as e:
+            # Unrecorded, the job's answers are never collected; the articles stay unmarked and are resubmitted next run
+            logger.error(f"Could not record Batch API job {job_name} for {db_name}/{collection_name}: {e}", exc_info=True)
 
-    def get_unanalyzed_news(self, db_name: str, collection_name: str, limit: int = 20, max_age_days: int = 2) -> List[Dict]:
+    async def iter_collected_batch_results(self, db_name: str, collection_name: str) -> AsyncIterator[Dict]:
+        """
+        Checks each outstanding Batch API job for this source once and yields the analyses of the finished ones.
+        A collected job's articles are unmarked, so any it failed to analyze return to the unanalyzed pool.
+        """
+        try:
+            db = self.client[db_name]
+            jobs = await db[BATCH_JOBS_COLLECTION].find({"collection_name": collection_name}).to_list(length=None)
+        except Exception as e:
+            logger.error(f"Could not list Batch API jobs for {db_name}/{collection_name}: {e}", exc_info=True)
+            return
+        if not jobs:
+            return
+        await asyncio.to_thread(getattr, self, "model_callers")
+        if self._studio_client is None:
+            logger.warning(f"AI Studio client unavailable; leaving {len(jobs)} Batch API jobs for {db_name}/{collection_name} uncollected.")
+            return
+
+        for job in jobs:
+            job_name, article_ids = job["_id"], job["article_ids"]
+            try:
+                texts = await asyncio.to_thread(collect_batch_job, self._studio_client, job_name, len(article_ids))
+            except Exception as e:
+                logger.error(f"Batch API job {job_name} for {db_name}/{collection_name} failed; its articles will be analyzed again: {e}")
+                texts = []
+            if texts is None:
+                continue  # Still running; check again next run
+
+            articles = await db[collection_name].find({"_id": {"$in": article_ids}}, ARTICLE_PROJECTION).to_list(length=None)
+            articles_by_id = {article["_id"]: article for article in articles}
+            for article_id, cache_key, analysis_text in zip(article_ids, job["cache_keys"], texts):
+                article = articles_by_id.get(article_id)
+                if not analysis_text or article is None:
+                    continue
+                if self.analysis_cache:
+                    self.analysis_cache.set(cache_key, job["model"], analysis_text)
+                self.block_registry.register(article.get("content") or "", job["analysis_type"], analysis_text)
+                yield self._build_result(article, job["analysis_type"], analysis_text, db_name, collection_name)
+
+            await db[collection_name].update_many({"_id": {"$in": article_ids}}, {"$unset": {"batch_job": ""}})
+            await db[BATCH_JOBS_COLLECTION].delete_one({"_id": job_name})
+
+    async def get_unanalyzed_news(self, db_name: str, collection_name: str, limit: int = 20, max_age_days: int = 2) -> List[Dict]:
         """Retrieve recent, unanalyzed news articles from MongoDB."""
         logger.debug(f"Fetching up to {limit} unanalyzed articles from the last {max_age_days} days from {db_name}/{collection_name}.")
         
@@ -381,13 +814,25 @@ class NewsAnalyzer:
             db = self.client[db_name]
             collection = db[collection_name]
             
-            # Find articles that are not analyzed AND are recent
+            if (db_name, collection_name) not in self._indexed_collections:
+                # Idempotent; only the first call per collection per process pays the round-trip
+                try:
+                    await collection.create_index(UNANALYZED_INDEX, **UNANALYZED_INDEX_OPTIONS)
+                except Exception as e:
+                    logger.warning(f"Could not ensure unanalyzed index on {db_name}/{collection_name}: {e}")
+                self._indexed_collections.add((db_name, collection_name))
+
+            # Find articles that are not analyzed AND are recent, skipping any waiting on a Batch API job.
+            # An equality match on analyzed=False lets the planner use the partial index; $ne: True cannot.
             query = {
-                "analyzed": {"$ne": True},
-                "fetched_at": {"$gte": cutoff_date} # Use fetched_at for recency check
+                "analyzed": False,
+                "fetched_at": {"$gte": cutoff_date}, # Use fetched_at for recency check
+                "batch_job": {"$exists": False}
             }
             
-            news_list = list(collection.find(query).limit(limit))
+            # batch_size=limit returns everything in the first reply instead of a follow-up getMore
+            cursor = collection.find(query, ARTICLE_PROJECTION, batch_size=limit).limit(limit)
+            news_list = await cursor.to_list(length=limit)
             logger.info(f"Found {len(news_list)} recent, unanalyzed articles in {db_name}/{collection_name}.")
             return news_list
         except Exception as e:
@@ -398,7 +843,7 @@ class NewsAnalyzer:
                 logger.error(f"Error fetching unanalyzed news from {db_name}/{collection_name}: {e}", exc_info=True)
             return []
 
-    def save_analysis(self, db_name: str, collection_name: str, analysis_results: List[Dict]):
+    async def save_analysis(self, db_name: str, collection_name: str, analysis_results: List[Dict]):
         """Save analysis results back to MongoDB."""
         if not analysis_results:
             logger.info(f"No analysis results to save for {db_name}/{collection_name}.")
@@ -408,70 +853,74 @@ class NewsAnalyzer:
             db = self.client[db_name]
             target_collection = db[collection_name]
             
+            ops = []
             for result in analysis_results:
                 if "error" in result and result.get("analysis_raw") == "Analysis failed due to error.":
                     # Handle how to save errored analyses, maybe mark as error or skip structured part
-                     target_collection.update_one(
-                        {"_id": result["article_id"]},
-                        {
-                            "$set": {
-                                "analysis_error": result.get("error", "Unknown analysis error"),
-                                "analyzed": True, # Or a different flag like 'analysis_attempted_with_error'
-                                "analyzed_at": result["analyzed_at"]
-                            }
-                        }
-                    )
+                    update = {
+                        "analysis_error": result.get("error", "Unknown analysis error"),
+                        "analyzed": True, # Or a different flag like 'analysis_attempted_with_error'
+                        "analyzed_at": result["analyzed_at"]
+                    }
                 else:
-                    target_collection.update_one(
-                        {"_id": result["article_id"]},
-                        {
-                            "$set": {
-                                "analysis_raw": result["analysis_raw"],
-                                "analysis_structured": result["analysis_structured"],
-                                "analyzed": True,
-                                "analyzed_at": result["analyzed_at"]
-                            }
-                        }
-                    )
-            logger.info(f"Successfully saved {len(analysis_results)} results to {db_name}/{collection_name}.")
+                    update = {
+                        "analysis_raw": result["analysis_raw"],
+                        "analysis_structured": result["analysis_structured"],
+                        "analyzed": True,
+                        "analyzed_at": result["analyzed_at"]
+                    }
+                ops.append(UpdateOne({"_id": result["article_id"]}, {"$set": update}))
+
+            # One round-trip per chunk; unordered so one bad document doesn't block the rest
+            modified = 0
+            for start in range(0, len(ops), BULK_WRITE_CHUNK_SIZE):
+                bulk_result = await target_collection.bulk_write(ops[start:start + BULK_WRITE_CHUNK_SIZE], ordered=False)
+                modified += bulk_result.modified_count
+            logger.info(f"Successfully saved {modified}/{len(ops)} results to {db_name}/{collection_name}.")
+        except BulkWriteError as e:
+            logger.error(f"Bulk write to {db_name}/{collection_name} partially failed: {e.details}")
         except Exception as e:
             logger.error(f"Error saving analysis results to {db_name}/{collection_name}: {e}", exc_info=True)
 
-    def check_alerts_and_send_emails(self, analysis_results: List[Dict], alert_thresholds: Dict):
-        """
-        Collects all triggered alerts, formats them into a single digest email, and sends it.
-        """
-        if not self.email_service:
-            logger.error("EmailService not initialized. Cannot send alerts.")
-            return
+    @staticmethod
+    def meets_alert_threshold(result: Dict, alert_thresholds: Dict) -> bool:
+        """True if a successful analysis is important enough, and strongly enough signed, to alert on."""
+        if "error" in result:
+            return False
 
-        alerts_to_send = []
-        for result in analysis_results:
-            if "error" in result:
-                continue
+        structured_data = result.get("analysis_structured", {})
+        importance = structured_data.get("importance_score", 0)
+        sentiment = structured_data.get("sentiment_score", 0)
 
-            structured_data = result.get("analysis_structured", {})
-            importance = structured_data.get("importance_score", 0)
-            sentiment = structured_data.get("sentiment_score", 0)
+        return importance >= alert_thresholds["IMPORTANCE_THRESHOLD"] and (
+            sentiment >= alert_thresholds["POSITIVE_SENTIMENT_THRESHOLD"] or
+            sentiment <= alert_thresholds["NEGATIVE_SENTIMENT_THRESHOLD"])
 
-            if importance >= alert_thresholds["IMPORTANCE_THRESHOLD"]:
-                if (sentiment >= alert_thresholds["POSITIVE_SENTIMENT_THRESHOLD"] or
-                        sentiment <= alert_thresholds["NEGATIVE_SENTIMENT_THRESHOLD"]):
-                    alerts_to_send.append(result)
+    def _collect_alerts(self, analysis_results: List[Dict], alert_thresholds: Dict) -> List[Dict]:
+        """Filters results down to alerts; returns [] (after logging) if there is nothing to send or no way to send it."""
+        alerts_to_send = [result for result in analysis_results if self.meets_alert_threshold(result, alert_thresholds)]
 
         if not alerts_to_send:
             logger.info("Finished checking alerts. No articles met the threshold for an alert.")
-            return
+            return []
+
+        # Checked after filtering so runs without alerts never construct the email service
+        if not self.email_service:
+            logger.error("EmailService not initialized. Cannot send alerts.")
+            return []
 
         logger.info(f"Found {len(alerts_to_send)} articles that meet the alert threshold. Compiling digest email.")
+        return alerts_to_send
 
-        # Build the digest email
+    @staticmethod
+    def _compose_alert_digest(alerts_to_send: List[Dict]) -> Tuple[str, str]:
+        """Formats alerts into the (subject, body) of a single digest email."""
         email_subject = f"每日新闻分析警报 - {len(alerts_to_send)}条重要新闻"
         
-        email_body_parts = [
+        email_body_parts = [(
             f"您好，\n\n系统分析发现 {len(alerts_to_send)} 条可能影响市场的重要新闻，详情如下：\n"
             "--------------------------------------------------\n"
-        ]
+        )]
 
         for alert in alerts_to_send:
             structured = alert.get("analysis_structured", {})
@@ -482,21 +931,31 @@ class NewsAnalyzer:
             sectors = ", ".join(structured.get("sectors", []))
             summary = structured.get("analysis_summary", "无摘要")
 
-            article_html = f"""
-            新闻标题: {title}
-            重要性评分: {importance}/10
-            市场情绪评分: {sentiment}/10
-            影响板块: {sectors if sectors else "未提及"}
-            
-            分析摘要:
-            {summary}
+            email_body_parts.append("\n".join((
+                "",
+                f"新闻标题: {title}",
+                f"重要性评分: {importance}/10",
+                f"市场情绪评分: {sentiment}/10",
+                f"影响板块: {sectors if sectors else '未提及'}",
+                "",
+                "分析摘要:",
+                summary,
+                "",
+                f"新闻链接: {url}",
+                "--------------------------------------------------",
+                "",
+            )))
 
-            新闻链接: {url}
-            --------------------------------------------------
-            """
-            email_body_parts.append(textwrap.dedent(article_html))
+        return email_subject, "\n".join(email_body_parts)
 
-        final_email_body = "\n".join(email_body_parts)
+    def check_alerts_and_send_emails(self, analysis_results: List[Dict], alert_thresholds: Dict):
+        """
+        Collects all triggered alerts, formats them into a single digest email, and sends it.
+        """
+        alerts_to_send = self._collect_alerts(analysis_results, alert_thresholds)
+        if not alerts_to_send:
+            return
+        email_subject, final_email_body = self._compose_alert_digest(alerts_to_send)
 
         try:
             self.email_service.send_email(
@@ -507,25 +966,112 @@ class NewsAnalyzer:
         except Exception as e:
             logger.error(f"Failed to send digest email: {e}", exc_info=True)
 
+    async def acheck_alerts_and_send_emails(self, analysis_results: List[Dict], alert_thresholds: Dict):
+        """Async variant of check_alerts_and_send_emails; the blocking SMTP send runs in a worker thread."""
+        alerts_to_send = self._collect_alerts(analysis_results, alert_thresholds)
+        if not alerts_to_send:
+            return
+        email_subject, final_email_body = self._compose_alert_digest(alerts_to_send)
 
-async def run_analysis_pipeline_for_sources(analyzer: NewsAnalyzer, sources: List[Tuple[str, str]], alert_thresholds: Dict, analysis_type: str, limit: int, max_age_days: int):
+        try:
+            await asyncio.to_thread(self.email_service.send_email, subject=email_subject, body=final_email_body)
+            logger.info(f"Successfully sent digest email with {len(alerts_to_send)} alerts.")
+        except Exception as e:
+            logger.error(f"Failed to send digest email: {e}", exc_info=True)
+
+
+async def _merge_streams(streams: List[AsyncIterator[Dict]]) -> AsyncIterator[Dict]:
+    """Yields items from several async iterators as each produces them."""
+    merged: asyncio.Queue = asyncio.Queue()
+    done = object()
+
+    async def drain(stream):
+        try:
+            async for item in stream:
+                await merged.put(item)
+        except Exception as e:
+            logger.error(f"Analysis stream failed: {e}", exc_info=True)
+        finally:
+            await merged.put(done)
+
+    tasks = [asyncio.create_task(drain(stream)) for stream in streams]
+    try:
+        remaining = len(tasks)
+        while remaining:
+            item = await merged.get()
+            if item is done:
+                remaining -= 1
+            else:
+                yield item
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+async def _process_source(analyzer: NewsAnalyzer, db_name: str, collection_name: str, alert_thresholds: Dict, analysis_type: str, limit: int, max_age_days: int):
     """
-    Runs the full analysis and alerting pipeline for a list of sources.
+    Fetches, analyzes, saves and alerts on one source's unanalyzed articles.
     """
-    for db_name, collection_name in sources:
-        logger.info(f"Processing source for {analysis_type} pipeline: {db_name}/{collection_name}")
-        unanalyzed_news = analyzer.get_unanalyzed_news(db_name, collection_name, limit=limit, max_age_days=max_age_days) 
+    logger.info(f"Processing source for {analysis_type} pipeline: {db_name}/{collection_name}")
+    unanalyzed_news = await analyzer.get_unanalyzed_news(db_name, collection_name, limit=limit, max_age_days=max_age_days)
 
-        if unanalyzed_news:
-            logger.info(f"Found {len(unanalyzed_news)} articles in {db_name}/{collection_name} for {analysis_type} pipeline. Analyzing...")
-            analysis_results = await analyzer.analyze_batch(unanalyzed_news, db_name, collection_name, analysis_type)
-            
-            analyzer.save_analysis(db_name, collection_name, analysis_results)
-            
-            # Call the new method for checking alerts
-            analyzer.check_alerts_and_send_emails(analysis_results, alert_thresholds)
+    streams = []
+    if analyzer.use_batch_api:
+        # Analyses from Batch API jobs submitted on earlier runs are saved and alerted on like any other result
+        streams.append(analyzer.iter_collected_batch_results(db_name, collection_name))
+    if unanalyzed_news:
+        logger.info(f"Found {len(unanalyzed_news)} articles in {db_name}/{collection_name} for {analysis_type} pipeline. Analyzing...")
+        if analyzer.use_batch_api:
+            # Fresh articles stay on the interactive path; the backlog is submitted to the cheaper, slower Batch API
+            cutoff = datetime.now() - BATCH_API_MIN_AGE
+            fresh, backlog = [], []
+            for article in unanalyzed_news:
+                fetched_at = article.get("fetched_at")
+                (backlog if fetched_at and fetched_at < cutoff else fresh).append(article)
+            logger.info(f"{len(fresh)} fresh articles go to interactive analysis, {len(backlog)} backlog articles to the Batch API.")
+            streams.append(analyzer.iter_batch_results(fresh, db_name, collection_name, analysis_type))
+            streams.append(analyzer.iter_batch_api_results(backlog, db_name, collection_name, analysis_type))
         else:
-            logger.info(f"No recent, unanalyzed articles found in {db_name}/{collection_name}.")
+            streams.append(analyzer.iter_batch_results(unanalyzed_news, db_name, collection_name, analysis_type))
+    else:
+        logger.info(f"No recent, unanalyzed articles found in {db_name}/{collection_name}.")
+    if not streams:
+        return
+
+    # Stream results into Mongo in small chunks; only alert candidates are kept until the end
+    pending_writes, alerts = [], []
+    last_flush = time.monotonic()
+    async for result in _merge_streams(streams):
+        if not result:
+            continue  # LLM query failed outright; leave the article unanalyzed for the next run
+        pending_writes.append(result)
+        if analyzer.meets_alert_threshold(result, alert_thresholds):
+            alerts.append(result)
+        if len(pending_writes) >= SAVE_FLUSH_SIZE or time.monotonic() - last_flush >= SAVE_FLUSH_INTERVAL_SECONDS:
+            await analyzer.save_analysis(db_name, collection_name, pending_writes)
+            pending_writes = []
+            last_flush = time.monotonic()
+    if pending_writes:
+        await analyzer.save_analysis(db_name, collection_name, pending_writes)
+
+    # Call the new method for checking alerts
+    await analyzer.acheck_alerts_and_send_emails(alerts, alert_thresholds)
+
+
+async def run_analysis_pipeline_for_sources(analyzer: NewsAnalyzer, sources: List[Tuple[str, str]], alert_thresholds: Dict, analysis_type: str, limit: int, max_age_days: int):
+    """
+    Runs the full analysis and alerting pipeline for a list of sources.
+    Sources are processed concurrently; the analyzer's shared LLM limiter keeps the combined request rate in check.
+    """
+    results = await asyncio.gather(
+        *(_process_source(analyzer, db_name, collection_name, alert_thresholds, analysis_type, limit, max_age_days)
+          for db_name, collection_name in sources),
+        return_exceptions=True,
+    )
+    for (db_name, collection_name), result in zip(sources, results):
+        if isinstance(result, BaseException):
+            logger.error(f"Pipeline failed for {db_name}/{collection_name}: {result}", exc_info=result)
 
 
 if __name__ == "__main__":
@@ -542,6 +1088,11 @@ if __name__ == "__main__":
         default=2,
         help="Maximum age in days for articles to be analyzed."
     )
+    parser.add_argument(
+        "--batch-api",
+        action="store_true",
+        help="Submit articles fetched more than 6 hours ago to the Gemini Batch API (cheaper); their analyses are collected on a later run."
+    )
     args = parser.parse_args()
 
     logger.info(f"news_analyzer.py script started with limit={args.limit}, days={args.days}.")
@@ -553,7 +1104,7 @@ if __name__ == "__main__":
         "NEGATIVE_SENTIMENT_THRESHOLD": 3,
     }
 
-    news_analyzer_instance = NewsAnalyzer() 
+    news_analyzer_instance = NewsAnalyzer(use_batch_api=args.batch_api)
 
     # Define sources for different analysis types
     chinese_sources = [
@@ -581,7 +1132,7 @@ if __name__ == "__main__":
         # Evening analysis: 2 PM - 6 AM China time (after market close)
         if 6 <= china_hour < 14:
             logger.info("Starting morning analysis pipeline (US news focus) - China market opening soon/open")
-            asyncio.run(run_analysis_pipeline_for_sources(
+            run_async(run_analysis_pipeline_for_sources(
                 news_analyzer_instance, 
                 us_sources, 
                 ALERT_THRESHOLDS,
@@ -591,7 +1142,7 @@ if __name__ == "__main__":
             ))
         else:
             logger.info("Starting evening analysis pipeline (Chinese news focus) - China market closed")
-            asyncio.run(run_analysis_pipeline_for_sources(
+            run_async(run_analysis_pipeline_for_sources(
                 news_analyzer_instance, 
                 chinese_sources, 
                 ALERT_THRESHOLDS,
@@ -601,6 +1152,8 @@ if __name__ == "__main__":
             ))
     except Exception as e:
         logger.critical(f"Critical error in main execution: {e}", exc_info=True)
+    finally:
+        news_analyzer_instance.close()
     
     logger.info("news_analyzer.py script finished.")
 
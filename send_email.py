@@ -1,10 +1,9 @@
 # Import necessary libraries
 import smtplib
 import ssl
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
 from getpass import getpass # To securely get password
 from config import settings
+from email_utils import SMTP_SSL_PORT, SMTP_STARTTLS_PORT, EmailSender
 
 def send_email(sender_email, app_password, receiver_email, subject, body):
     """
@@ -18,7 +17,7 @@ def send_email(sender_email, app_password, receiver_email, subject, body):
     # Yahoo: smtp.mail.yahoo.com, port 587 (TLS) or 465 (SSL)
     # iCloud: smtp.mail.me.com, port 587 (TLS)
     smtp_server = "smtp.gmail.com"  # Defaulting to Gmail, change if needed
-    port = 587  # For starttls
+    port = SMTP_SSL_PORT  # Implicit TLS; falls back to 587 with STARTTLS if 465 is unreachable
 
     # # --- Get Email Details from User ---
     # sender_email = input("Enter your email address: ")
@@ -28,40 +27,18 @@ def send_email(sender_email, app_password, receiver_email, subject, body):
     # subject = input("Enter the subject of the email: ")
     # body = input("Enter the body of the email (plain text): ")
 
-    # --- Create the Email Message ---
-    message = MIMEMultipart("alternative")
-    message["Subject"] = subject
-    message["From"] = sender_email
-    message["To"] = receiver_email
-
-    # Create the plain-text version of your message
-    text_part = MIMEText(body, "plain")
-
-    # Add plain-text part to MIMEMultipart message
-    # The email client will try to render the last part first
-    message.attach(text_part)
-
     # --- Send the Email ---
     try:
-        # Create a secure SSL context
-        context = ssl.create_default_context()
-
-        # Connect to the SMTP server
-        # Using a 'with' statement ensures the connection is automatically closed
-        with smtplib.SMTP(smtp_server, port) as server:
-            print(f"Connecting to {smtp_server}...")
-            # Start TLS for security (Transport Layer Security)
-            server.starttls(context=context)
-            print("Connection secured with TLS.")
-
-            # Login to the email account
-            print(f"Logging in as {sender_email}...")
-            server.login(sender_email, app_password)
+        # EmailSender connects over TLS and logs in on entry,
+        # and closes the connection on exit. To send several emails, keep one sender open
+        # and call send() repeatedly instead of calling this function per message.
+        print(f"Connecting to {smtp_server} and logging in as {sender_email}...")
+        with EmailSender(smtp_server, port, sender_email, app_password, fallback_port=SMTP_STARTTLS_PORT) as sender:
             print("Login successful.")
 
             # Send the email
             print(f"Sending email to {receiver_email}...")
-            server.sendmail(sender_email, receiver_email, message.as_string())
+            sender.send(receiver_email, subject, body)
             print("Email sent successfully!")
 
     except smtplib.SMTPAuthenticationError:
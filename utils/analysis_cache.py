@@ -0,0 +1,62 @@
+import hashlib
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_PATH = Path(".cache") / "llm_analysis.sqlite3"
+DEFAULT_TTL_SECONDS = 7 * 24 * 3600
+
+
+def prompt_cache_key(prompt: str) -> str:
+    """Exact-match key: the full prompt covers analysis type, article fields and market context."""
+    return hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+
+
+class AnalysisCache:
+    """
+    On-disk store of raw LLM analyses keyed by prompt_cache_key, so a prompt that is sent again
+    (a re-crawled or syndicated article, or one left unsaved by a failed run) is answered without the LLM.
+    Entries older than ttl_seconds are ignored and purged on startup.
+    """
+    def __init__(self, path: Path = DEFAULT_CACHE_PATH, ttl_seconds: float = DEFAULT_TTL_SECONDS):
+        self.path = Path(path)
+        self.ttl_seconds = ttl_seconds
+        self.stats = {"hits": 0, "misses": 0}
+        self._lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS analyses ("
+                "key TEXT PRIMARY KEY, model TEXT, analysis_text TEXT NOT NULL, created_at REAL NOT NULL)"
+            )
+            self._conn.execute("DELETE FROM analyses WHERE created_at < ?", (time.time() - ttl_seconds,))
+
+    def get(self, key: str) -> Optional[Tuple[str, str]]:
+        """Returns (model, analysis_text) for a cached analysis, or None."""
+        try:
+            with self._lock:
+                row = self._conn.execute(
+                    "SELECT model, analysis_text FROM analyses WHERE key = ? AND created_at >= ?",
+                    (key, time.time() - self.ttl_seconds),
+                ).fetchone()
+                self.stats["hits" if row else "misses"] += 1
+            return (row[0], row[1]) if row else None
+        except sqlite3.Error as e:
+            logger.warning(f"Analysis cache lookup failed for {key}: {e}")
+            return None
+
+    def set(self, key: str, model: str, analysis_text: str):
+        try:
+            with self._lock, self._conn:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO analyses (key, model, analysis_text, created_at) VALUES (?, ?, ?, ?)",
+                    (key, model, analysis_text, time.time()),
+                )
+        except sqlite3.Error as e:
+            logger.warning(f"Could not write analysis cache entry {key}: {e}")
@@ -0,0 +1,101 @@
+import hashlib
+import threading
+import zlib
+from typing import Dict, List, Optional, Tuple
+
+BLOCK_BOUNDARY_MODULUS = 4  # A line closes a block when crc32(line) % modulus == 0, i.e. ~4 lines per block
+MIN_BLOCK_CHARS = 40  # Shorter blocks (bylines, dates) never count towards matching another article
+DUPLICATE_COVERAGE = 0.9  # Share of an article's long-block text an earlier article must contain to count as the same story
+
+
+def split_blocks(content: str) -> List[str]:
+    """
+    Content-defined chunking on lines: boundaries depend only on the line text, so a passage
+    copied into another article splits into the same blocks regardless of what surrounds it.
+    """
+    blocks, current = [], []
+    for line in content.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        current.append(line)
+        if zlib.crc32(line.encode("utf-8")) % BLOCK_BOUNDARY_MODULUS == 0:
+            blocks.append("\n".join(current))
+            current = []
+    if current:
+        blocks.append("\n".join(current))
+    return blocks
+
+
+def block_digest(block: str) -> bytes:
+    return hashlib.blake2b(block.encode("utf-8"), digest_size=16).digest()
+
+
+def _long_blocks(content: str) -> Dict[bytes, int]:
+    """Digest -> length of each distinct block long enough to identify the article's text."""
+    return {block_digest(block): len(block) for block in split_blocks(content) if len(block) >= MIN_BLOCK_CHARS}
+
+
+def condense(content: str) -> str:
+    """
+    Drops passages repeated within the article itself (e.g. a paragraph pasted twice by the source).
+    Depends only on the article, so the same article always yields the same prompt text.
+    The original content is returned untouched when nothing is dropped.
+    """
+    seen, kept = set(), []
+    omitted = 0
+    for block in split_blocks(content):
+        digest = block_digest(block)
+        if digest in seen:
+            omitted += 1
+            continue
+        seen.add(digest)
+        kept.append(block)
+
+    if not omitted:
+        return content
+    kept.append(f"[{omitted} repeated passage(s) omitted]")
+    return "\n".join(kept)
+
+
+class BlockRegistry:
+    """
+    Process-wide index of analyzed article text, per analysis type. Lets an article whose text was
+    already analyzed (wire copy republished by another outlet) reuse that analysis instead of a new LLM call.
+    """
+    def __init__(self, coverage: float = DUPLICATE_COVERAGE):
+        self.coverage = coverage
+        self._analyses: List[str] = []
+        self._owners: Dict[Tuple[str, bytes], int] = {}  # (analysis_type, block digest) -> index into _analyses
+        self._lock = threading.Lock()
+
+    def find_duplicate(self, content: str, analysis_type: str) -> Optional[str]:
+        """
+        Returns the analysis text of an earlier article that contains at least `coverage` of this
+        article's long-block text, or None. Articles without long blocks never match.
+        """
+        blocks = _long_blocks(content)
+        total = sum(blocks.values())
+        if not total:
+            return None
+        covered: Dict[int, int] = {}
+        with self._lock:
+            for digest, length in blocks.items():
+                owner = self._owners.get((analysis_type, digest))
+                if owner is not None:
+                    covered[owner] = covered.get(owner, 0) + length
+            if not covered:
+                return None
+            owner, chars = max(covered.items(), key=lambda item: item[1])
+            return self._analyses[owner] if chars >= self.coverage * total else None
+
+    def register(self, content: str, analysis_type: str, analysis_text: str):
+        """Records an analyzed article's text; blocks keep pointing at the first analysis that contained them."""
+        blocks = _long_blocks(content)
+        if not blocks:
+            return
+        with self._lock:
+            index = len(self._analyses)
+            self._analyses.append(analysis_text)
+            for digest in blocks:
+                self._owners.setdefault((analysis_type, digest), index)
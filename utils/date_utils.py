@@ -1,6 +1,8 @@
 from datetime import datetime
-from typing import Optional, List
+from functools import lru_cache
+from typing import Optional, List, Tuple
 import logging
+import re
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -20,27 +22,69 @@ DEFAULT_FORMATS = [
     # Add more formats as needed
 ]
 
-def parse_date_string_to_datetime(date_string: Optional[str], formats: Optional[List[str]] = None, silent: bool = False, relative_to_today_if_time_only: bool = False) -> Optional[datetime]:
+# strptime's own regexes for the directives DEFAULT_FORMATS uses (see _strptime.TimeRE), so the fast path
+# accepts exactly the strings strptime does: ASCII-only ranges where strptime uses them, \d where it uses \d
+# (which also matches other Unicode digits), and the space-padded day strptime allows for %d.
+_DIRECTIVE_PATTERNS = {
+    "Y": r"(\d\d\d\d)",
+    "m": r"(1[0-2]|0[1-9]|[1-9])",
+    "d": r"(3[0-1]|[1-2]\d|0[1-9]|[1-9]| [1-9])",
+    "H": r"(2[0-3]|[0-1]\d|\d)",
+    "M": r"([0-5]\d|\d)",
+    "S": r"(6[0-1]|[0-5]\d|\d)",
+}
+
+def _compile_default_format(fmt: str) -> Tuple[re.Pattern, str]:
+    """Translates a strptime format into (pattern, fields) the way strptime does; a space matches any run of whitespace."""
+    parts, fields = [], ""
+    for literal, directive in re.findall(r"([^%]*)(?:%(.))?", fmt):
+        parts.append(r"\s+".join(re.escape(chunk) for chunk in literal.split(" ")))
+        if directive:
+            parts.append(_DIRECTIVE_PATTERNS[directive])
+            fields += directive
+    return re.compile("".join(parts)), fields
+
+# Shape-classifying patterns for DEFAULT_FORMATS, in the same order. Each maps its groups to datetime fields,
+# so the default path builds the datetime directly instead of trying strptime format after format.
+_DEFAULT_DISPATCH = [_compile_default_format(fmt) for fmt in DEFAULT_FORMATS]
+
+@lru_cache(maxsize=64)
+def _format_meta(fmt: str) -> Tuple[bool, bool]:
+    """(has_year, has_month_or_day) for a strptime format, computed once per distinct format."""
+    return ("%Y" in fmt or "%y" in fmt), ("%m" in fmt or "%d" in fmt)
+
+def _parse_default_formats(date_string: str) -> Tuple[Optional[datetime], bool]:
     """
-    Parses a date string into a datetime object using a list of possible formats.
-    Handles common variations including Chinese date formats.
-    If year is missing, assumes current year.
-    If silent is True, suppresses warnings on parsing failure.
-    If relative_to_today_if_time_only is True and the format parsed is time-only, it assumes the current date.
+    Parses date_string against DEFAULT_FORMATS via _DEFAULT_DISPATCH; None if no shape matches or values are out of range.
+    The flag is True when the result depends on the current date.
     """
-    if not date_string:
-        return None
-
-    parse_formats = formats if formats else DEFAULT_FORMATS
-    now = datetime.now()
+    uses_clock = False
+    for pattern, fields in _DEFAULT_DISPATCH:
+        match = pattern.fullmatch(date_string)
+        if match is None:
+            continue
+        values = dict(zip(fields, map(int, match.groups())))
+        uses_clock = uses_clock or "Y" not in values
+        try:
+            year = datetime.now().year if "Y" not in values else values["Y"] # Only yearless shapes need the clock
+            return datetime(year, values["m"], values["d"],
+                            values.get("H", 0), values.get("M", 0), values.get("S", 0)), uses_clock
+        except ValueError:
+            continue # Right shape, impossible date (e.g. April 31); strptime would move on to the next format too
+    return None, uses_clock
 
-    for fmt in parse_formats:
+def _parse_with_formats(date_string: str, formats: Tuple[str, ...], relative_to_today_if_time_only: bool) -> Tuple[Optional[datetime], bool]:
+    """strptime over caller-supplied formats; the flag is True when the result depends on the current date."""
+    now = None # Read at most once, and only if a format lacks date parts
+    for fmt in formats:
         try:
             dt = datetime.strptime(date_string, fmt)
+            has_year, has_month_or_day = _format_meta(fmt)
             # If the format doesn't include year, and the original string doesn't seem to have it,
             # and the format is one that typically omits year (like "%m月%d日 %H:%M"),
             # assume current year.
-            if "%Y" not in fmt and "%y" not in fmt:
+            if not has_year:
+                now = now or datetime.now()
                 # A simple check: if the parsed year is default (1900), it means strptime used a default
                 # because year wasn't in the format string. We should then set it to current year.
                 if dt.year == 1900: # Default year for strptime when year is not in format
@@ -49,22 +93,54 @@ def parse_date_string_to_datetime(date_string: Optional[str], formats: Optional[
             # If relative_to_today_if_time_only is True, and we only parsed time components
             # (i.e., year, month, day are default from strptime or current year if year was missing in format),
             # set date to today.
-            is_time_only_format = ("%Y" not in fmt and "%y" not in fmt and
-                                   "%m" not in fmt and "%d" not in fmt) # Approximation of time-only format
+            is_time_only_format = not has_year and not has_month_or_day # Approximation of time-only format
 
             if relative_to_today_if_time_only and is_time_only_format:
                  # If dt still has year 1900, it means it was purely time.
                  # Or if year was set to current year but month/day were not in format (parsed as 1/1)
-                if dt.year == 1900 or (dt.month == 1 and dt.day == 1 and ("%m" not in fmt and "%d" not in fmt)):
+                if dt.year == 1900 or (dt.month == 1 and dt.day == 1 and not has_month_or_day):
                     dt = dt.replace(year=now.year, month=now.month, day=now.day)
             
-            return dt
+            return dt, not has_year
         except ValueError:
             continue # Try the next format
-    
-    if not silent:
+    return None, False
+
+def _parse(date_string: str, formats: Tuple[str, ...], relative_to_today_if_time_only: bool) -> Tuple[Optional[datetime], bool]:
+    if not formats:
+        return _parse_default_formats(date_string)
+    return _parse_with_formats(date_string, formats, relative_to_today_if_time_only)
+
+_USES_CLOCK = object() # Cache marker: this string's result depends on today's date, so re-parse it
+
+@lru_cache(maxsize=4096)
+def _parse_cached(date_string: str, formats: Tuple[str, ...], relative_to_today_if_time_only: bool):
+    """
+    Memoizes parses of repeated timestamps. Results that depend on the current date (yearless or
+    time-only formats) are stored as _USES_CLOCK rather than a datetime, so they never go stale.
+    """
+    dt, uses_clock = _parse(date_string, formats, relative_to_today_if_time_only)
+    return _USES_CLOCK if uses_clock else dt
+
+def parse_date_string_to_datetime(date_string: Optional[str], formats: Optional[List[str]] = None, silent: bool = False, relative_to_today_if_time_only: bool = False) -> Optional[datetime]:
+    """
+    Parses a date string into a datetime object using a list of possible formats.
+    Handles common variations including Chinese date formats.
+    If year is missing, assumes current year.
+    If silent is True, suppresses warnings on parsing failure.
+    If relative_to_today_if_time_only is True and the format parsed is time-only, it assumes the current date.
+    """
+    if not date_string:
+        return None
+
+    formats_key = tuple(formats) if formats else ()
+    dt = _parse_cached(date_string, formats_key, relative_to_today_if_time_only)
+    if dt is _USES_CLOCK:
+        dt, _ = _parse(date_string, formats_key, relative_to_today_if_time_only)
+
+    if dt is None and not silent:
         logger.warning(f"Could not parse date string: '{date_string}' with any of the provided formats.")
-    return None
+    return dt
 
 # Example Usage (can be run directly for testing)
 if __name__ == "__main__":
@@ -0,0 +1,21 @@
+import asyncio
+import logging
+from typing import Any, Coroutine, TypeVar
+
+try:
+    import uvloop
+except ImportError: # uvloop is not available on Windows
+    uvloop = None
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+def run_async(main: Coroutine[Any, Any, T]) -> T:
+    """
+    Runs a coroutine to completion like asyncio.run, on uvloop when it is installed.
+    """
+    if uvloop is not None:
+        return uvloop.run(main)
+    logger.debug("uvloop not installed; falling back to the default asyncio event loop.")
+    return asyncio.run(main)
@@ -1,8 +1,15 @@
+from __future__ import annotations
+
 import requests
-import pandas as pd
+import json
 import logging
 import os
 import sys
+import time
+from typing import TYPE_CHECKING, Optional
+
+if TYPE_CHECKING:
+    import pandas as pd
 
 # Add project root to sys.path to allow for correct module imports
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -14,47 +21,156 @@ logger = logging.getLogger(__name__)
 # Define the default path for the S&P 500 tickers CSV in the project root
 DEFAULT_SP500_CSV_PATH_FOR_UTILS = os.path.join(PROJECT_ROOT, "sp500_tickers.csv")
 
-def get_sp500_tickers_wikipedia(timeout: int = 10) -> pd.DataFrame:
+# Local cache of the parsed Wikipedia table, plus the HTTP validators needed for conditional GETs
+SP500_CACHE_DIR = os.path.join(PROJECT_ROOT, ".cache", "sp500")
+SP500_CACHE_PARQUET = os.path.join(SP500_CACHE_DIR, "sp500_tickers.parquet")
+SP500_CACHE_VALIDATORS = os.path.join(SP500_CACHE_DIR, "validators.json")
+SP500_CACHE_TTL_SECONDS = 24 * 3600  # Constituents change a few times a year
+SP500_REQUIRED_COLUMNS = ['Symbol', 'Security', 'GICS Sector']
+
+def _parse_streamed_html(response: requests.Response):
+    """Feeds the body to lxml chunk by chunk as it downloads, so the raw page is never held in memory whole."""
+    import lxml.html
+
+    parser = lxml.html.HTMLParser(encoding=response.encoding or "utf-8")
+    for chunk in response.iter_content(chunk_size=65536):
+        parser.feed(chunk)
+    return parser.close()
+
+def _parse_constituents_table(document) -> Optional[pd.DataFrame]:
+    """
+    Pulls the required columns straight out of Wikipedia's table with id="constituents" using lxml XPath,
+    instead of having pandas.read_html build a DataFrame for every table on the page.
+    Returns None if that table, or one of the required headers, is missing.
+    """
+    import pandas as pd
+
+    tables = document.xpath('//table[@id="constituents"]')
+    if not tables:
+        return None
+    rows = tables[0].xpath('.//tr')
+    if not rows:
+        return None
+    header = [th.text_content().strip() for th in rows[0].xpath('./th')]
+    try:
+        indices = [header.index(col) for col in SP500_REQUIRED_COLUMNS]
+    except ValueError:
+        return None
+
+    data = []
+    last_index = max(indices)
+    for row in rows[1:]:
+        cells = row.xpath('./td')
+        if len(cells) <= last_index:
+            continue
+        values = [cells[i].text_content().strip() for i in indices]
+        if all(values): # Same effect as dropna() on read_html's NaN for empty cells
+            data.append(values)
+    return pd.DataFrame(data, columns=SP500_REQUIRED_COLUMNS)
+
+def _read_sp500_cache() -> Optional[pd.DataFrame]:
+    """Returns the cached table, or None if there is no readable cache."""
+    import pandas as pd
+
+    try:
+        return pd.read_parquet(SP500_CACHE_PARQUET)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logger.warning(f"Ignoring unreadable S&P 500 cache {SP500_CACHE_PARQUET}: {e}")
+        return None
+
+def _read_sp500_validators() -> dict:
+    try:
+        with open(SP500_CACHE_VALIDATORS, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def _write_sp500_cache(sp500_table: pd.DataFrame, response: requests.Response):
+    """Stores the parsed table and the response's ETag/Last-Modified; temp file + rename so readers never see partial data."""
+    try:
+        os.makedirs(SP500_CACHE_DIR, exist_ok=True)
+        tmp_path = f"{SP500_CACHE_PARQUET}.{os.getpid()}.tmp"
+        sp500_table.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, SP500_CACHE_PARQUET)
+        validators = {k: response.headers[h] for k, h in (("etag", "ETag"), ("last_modified", "Last-Modified")) if h in response.headers}
+        with open(SP500_CACHE_VALIDATORS, "w", encoding="utf-8") as f:
+            json.dump(validators, f)
+    except Exception as e:
+        logger.warning(f"Could not write S&P 500 cache: {e}")
+
+def get_sp500_tickers_wikipedia(timeout: int = 10, ttl_seconds: float = SP500_CACHE_TTL_SECONDS) -> pd.DataFrame:
     """
     Fetches the list of S&P 500 ticker symbols, company names, and sectors from Wikipedia.
+    The parsed table is cached on disk: within ttl_seconds it is returned without a request, after that
+    Wikipedia is asked with If-None-Match/If-Modified-Since and a 304 reuses the cache.
+    Pass ttl_seconds=0 to always revalidate.
 
     Returns:
         pd.DataFrame: A DataFrame containing 'Symbol', 'Security' (Company Name), and 'GICS Sector' columns.
-                     Returns an empty DataFrame if fetching fails.
+                     Returns an empty DataFrame if fetching fails (or the stale cache, if there is one).
     """
+    import pandas as pd # Deferred: pandas costs several hundred ms to import
+
     wiki_url = "https://en.wikipedia.org/wiki/List_of_S%26P_500_companies"
     headers = {
         "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
     }
+
+    cached = _read_sp500_cache()
+    if cached is not None:
+        age = time.time() - os.path.getmtime(SP500_CACHE_PARQUET)
+        if age < ttl_seconds:
+            logger.info(f"Using cached S&P 500 constituents ({len(cached)} companies, {age / 3600:.1f}h old).")
+            return cached
+        validators = _read_sp500_validators()
+        if "etag" in validators:
+            headers["If-None-Match"] = validators["etag"]
+        if "last_modified" in validators:
+            headers["If-Modified-Since"] = validators["last_modified"]
     
     try:
         logger.info(f"Fetching S&P 500 constituents from Wikipedia: {wiki_url}")
-        response = requests.get(wiki_url, headers=headers, timeout=timeout)
-        response.raise_for_status()  # Raise an exception for HTTP errors
-        
-        # pandas.read_html returns a list of DataFrames
-        # The S&P 500 constituents table is usually the first one.
-        tables = pd.read_html(response.content, flavor='bs4') # Use BeautifulSoup4 parser
-        
-        if not tables:
-            logger.warning("No tables found on the Wikipedia page.")
-            return pd.DataFrame(columns=['Symbol', 'Security', 'GICS Sector'])
-
-        # Heuristic to find the S&P 500 table:
-        # It typically has "Symbol", "Security", "GICS Sector", "GICS Sub-Industry"
-        sp500_table = None
-        for table in tables:
-            if "Symbol" in table.columns and "Security" in table.columns and "GICS Sector" in table.columns:
-                sp500_table = table
-                logger.info("Found S&P 500 constituents table on Wikipedia.")
-                break
+        with requests.get(wiki_url, headers=headers, timeout=timeout, stream=True) as response:
+            if response.status_code == 304 and cached is not None:
+                logger.info("S&P 500 constituents unchanged on Wikipedia (304); reusing cache.")
+                os.utime(SP500_CACHE_PARQUET)  # Restart the TTL
+                return cached
+            response.raise_for_status()  # Raise an exception for HTTP errors
+            document = _parse_streamed_html(response)
         
-        if sp500_table is None:
-            logger.warning("Could not identify the S&P 500 constituents table on the Wikipedia page.")
-            return pd.DataFrame(columns=['Symbol', 'Security', 'GICS Sector'])
+        sp500_table = _parse_constituents_table(document)
+        if sp500_table is not None:
+            logger.info("Found S&P 500 constituents table on Wikipedia.")
+        else:
+            # The table id or headers changed; fall back to parsing every table and picking one by its columns
+            logger.info("Constituents table not found by id; falling back to pandas.read_html.")
+            # pandas.read_html returns a list of DataFrames
+            # The S&P 500 constituents table is usually the first one.
+            import io
+            import lxml.html
+            page_html = lxml.html.tostring(document, encoding="unicode") # Body was streamed, so re-serialize the parsed page
+            tables = pd.read_html(io.StringIO(page_html), flavor='bs4') # Use BeautifulSoup4 parser
+            
+            if not tables:
+                logger.warning("No tables found on the Wikipedia page.")
+                return pd.DataFrame(columns=['Symbol', 'Security', 'GICS Sector'])
+
+            # Heuristic to find the S&P 500 table:
+            # It typically has "Symbol", "Security", "GICS Sector", "GICS Sub-Industry"
+            for table in tables:
+                if "Symbol" in table.columns and "Security" in table.columns and "GICS Sector" in table.columns:
+                    sp500_table = table
+                    logger.info("Found S&P 500 constituents table on Wikipedia.")
+                    break
+            
+            if sp500_table is None:
+                logger.warning("Could not identify the S&P 500 constituents table on the Wikipedia page.")
+                return pd.DataFrame(columns=['Symbol', 'Security', 'GICS Sector'])
             
         # Ensure required columns exist
-        required_columns = ['Symbol', 'Security', 'GICS Sector']
+        required_columns = SP500_REQUIRED_COLUMNS
         if not all(col in sp500_table.columns for col in required_columns):
             logger.warning(f"Required columns {required_columns} not all found in the identified table.")
             return pd.DataFrame(columns=required_columns)
@@ -64,13 +180,18 @@ def get_sp500_tickers_wikipedia(timeout: int = 10) -> pd.DataFrame:
         
         # Clean symbols: Some symbols on Wikipedia might have dots (e.g., BRK.B) 
         # which financial APIs often expect with dashes (BRK-B).
-        sp500_table['Symbol'] = sp500_table['Symbol'].str.replace('.', '-')
+        # regex=False: '.' is a literal dot here, not "any character", and the plain replace is faster.
+        sp500_table['Symbol'] = sp500_table['Symbol'].str.replace('.', '-', regex=False)
         
         logger.info(f"Successfully fetched and parsed {len(sp500_table)} S&P 500 companies from Wikipedia.")
+        _write_sp500_cache(sp500_table, response)
         return sp500_table
         
     except requests.exceptions.RequestException as e:
         logger.error(f"Error fetching Wikipedia page: {e}", exc_info=True)
+        if cached is not None:
+            logger.warning(f"Falling back to stale S&P 500 cache with {len(cached)} companies.")
+            return cached
         return pd.DataFrame(columns=['Symbol', 'Security', 'GICS Sector'])
     except Exception as e:
         logger.error(f"Error parsing S&P 500 tickers from Wikipedia: {e}", exc_info=True)
@@ -82,7 +203,7 @@ def update_sp500_csv(csv_path: str = DEFAULT_SP500_CSV_PATH_FOR_UTILS) -> bool:
     The CSV will have columns: "Symbol", "Name", "Sector".
     """
     logger.info(f"Attempting to update S&P 500 tickers CSV: {csv_path}")
-    sp500_df = get_sp500_tickers_wikipedia()
+    sp500_df = get_sp500_tickers_wikipedia(ttl_seconds=0) # Explicit update: always revalidate (a 304 is still cheap)
     
     if sp500_df.empty:
         logger.error("Failed to fetch data from Wikipedia. CSV will not be updated.")
@@ -0,0 +1,76 @@
+import asyncio
+import time
+from collections import deque
+
+
+class AsyncRateLimiter:
+    """
+    Sliding-window rate limiter for asyncio code: allows at most `max_rate`
+    acquisitions in any `time_period` seconds. Use as `async with limiter:`.
+    """
+
+    def __init__(self, max_rate: int, time_period: float = 60.0):
+        self.max_rate = max_rate
+        self.time_period = time_period
+        self._timestamps: deque[float] = deque()
+        self._lock = asyncio.Lock()
+
+    def _prune(self, now: float) -> None:
+        while self._timestamps and now - self._timestamps[0] >= self.time_period:
+            self._timestamps.popleft()
+
+    def has_capacity(self) -> bool:
+        self._prune(time.monotonic())
+        return len(self._timestamps) < self.max_rate
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._prune(now)
+                if len(self._timestamps) < self.max_rate:
+                    self._timestamps.append(now)
+                    return
+                # Sleep until the oldest call in the window expires
+                await asyncio.sleep(self.time_period - (now - self._timestamps[0]))
+
+    async def __aenter__(self):
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        return False
+
+
+class AsyncRequestTokenLimiter:
+    """
+    Sliding-window limiter for LLM calls that enforces both requests per minute
+    and (estimated) tokens per minute. Call `await limiter.acquire(tokens)`
+    before submitting a request; it only waits when either budget is spent.
+    """
+
+    def __init__(self, rpm: int, tpm: int, time_period: float = 60.0):
+        self.rpm = rpm
+        self.tpm = tpm
+        self.time_period = time_period
+        self._entries: deque[tuple[float, int]] = deque()  # (timestamp, tokens)
+        self._tokens_in_window = 0
+        self._lock = asyncio.Lock()
+
+    def _prune(self, now: float) -> None:
+        while self._entries and now - self._entries[0][0] >= self.time_period:
+            self._tokens_in_window -= self._entries.popleft()[1]
+
+    async def acquire(self, tokens: int = 1) -> None:
+        # A single request larger than the whole budget would never fit; let it through once the window is empty.
+        tokens = min(tokens, self.tpm)
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._prune(now)
+                if len(self._entries) < self.rpm and self._tokens_in_window + tokens <= self.tpm:
+                    self._entries.append((now, tokens))
+                    self._tokens_in_window += tokens
+                    return
+                # Sleep until the oldest entry leaves the window, then re-check both budgets
+                await asyncio.sleep(self.time_period - (now - self._entries[0][0]))
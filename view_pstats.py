@@ -0,0 +1,128 @@
+import argparse
+import cProfile
+import json
+import logging
+import pstats
+import runpy
+import sys
+from typing import Dict, List
+
+# --- Configuration ---
+DEFAULT_PROFILE = "startup.prof"
+DEFAULT_LIMIT = 30
+DEFAULT_REGRESSION_RATIO = 1.25  # Flag functions whose own time grew by more than 25%...
+DEFAULT_REGRESSION_MIN_SECONDS = 0.05  # ...and by more than this much, so timer noise on tiny leaves is ignored
+
+# --- Logging Setup ---
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s',
+    datefmt='%Y-%m-%d %H:%M:%S'
+)
+logger = logging.getLogger(__name__)
+
+
+def record_profile(script: str, script_args: List[str], output: str):
+    """
+    Runs a script as __main__ under cProfile and writes the stats to output.
+    builtins=False leaves C builtins out, so the report shows the Python frames that call them.
+    """
+    profiler = cProfile.Profile(builtins=False)
+    sys.argv = [script, *script_args]
+    profiler.enable()
+    try:
+        runpy.run_path(script, run_name="__main__")
+    except SystemExit:
+        pass
+    finally:
+        profiler.disable()
+        profiler.dump_stats(output)
+        logger.info(f"Profile of {script} written to {output}")
+
+
+def print_report(stats: pstats.Stats, limit: int):
+    """Self time first (hot leaves), then cumulative time, then who the hottest functions call and are called by."""
+    stats.sort_stats("tottime").print_stats(limit)
+    stats.print_callees(limit)
+    stats.print_callers(limit)
+    stats.sort_stats("cumulative").print_stats(limit)
+
+
+def rollup(stats: pstats.Stats) -> Dict[str, Dict[str, float]]:
+    """Per-function totals keyed by "file:line(function)", in a form that can be saved and diffed between runs."""
+    return {
+        f"{filename}:{lineno}({function})": {"ncalls": nc, "tottime": tt, "cumtime": ct}
+        for (filename, lineno, function), (cc, nc, tt, ct, callers) in stats.stats.items()
+    }
+
+
+def find_regressions(current: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]],
+                     ratio: float = DEFAULT_REGRESSION_RATIO,
+                     min_seconds: float = DEFAULT_REGRESSION_MIN_SECONDS) -> List[tuple]:
+    """Returns (function, baseline tottime, current tottime) for functions whose own time grew past both limits."""
+    regressions = []
+    for name, entry in current.items():
+        before = baseline.get(name, {}).get("tottime", 0.0)
+        after = entry["tottime"]
+        if after - before > min_seconds and after > before * ratio:
+            regressions.append((name, before, after))
+    return sorted(regressions, key=lambda r: r[2] - r[1], reverse=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Summarize a cProfile output file, and optionally record one or gate on regressions.",
+        formatter_class=argparse.RawTextHelpFormatter
+    )
+    parser.add_argument(
+        "profile",
+        nargs="?",
+        default=DEFAULT_PROFILE,
+        help=f"Path to the .prof file to read (or write, with --record).\n(Default: {DEFAULT_PROFILE})"
+    )
+    parser.add_argument(
+        "--limit",
+        type=int,
+        default=DEFAULT_LIMIT,
+        help=f"Rows per table.\n(Default: {DEFAULT_LIMIT})"
+    )
+    parser.add_argument(
+        "--record",
+        nargs=argparse.REMAINDER,
+        metavar="SCRIPT [ARGS]",
+        help="Profile SCRIPT with the given arguments before reporting, e.g.\n--record news_analyzer.py --days 1 --limit 5"
+    )
+    parser.add_argument(
+        "--json",
+        metavar="PATH",
+        help="Write the per-function rollup as JSON, for diffing later runs with --baseline."
+    )
+    parser.add_argument(
+        "--baseline",
+        metavar="PATH",
+        help="JSON rollup from an earlier run. Exits with status 1 if any function's own time regressed."
+    )
+    args = parser.parse_args()
+
+    if args.record:
+        record_profile(args.record[0], args.record[1:], args.profile)
+
+    stats = pstats.Stats(args.profile).strip_dirs()
+    print_report(stats, args.limit)
+    print(f"For an interactive view: snakeviz {args.profile}")
+
+    current = rollup(stats)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(current, f, indent=1, sort_keys=True)
+        logger.info(f"Rollup of {len(current)} functions written to {args.json}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = find_regressions(current, baseline)
+        for name, before, after in regressions:
+            logger.warning(f"Regression in {name}: tottime {before:.3f}s -> {after:.3f}s")
+        if regressions:
+            sys.exit(1)
+        logger.info(f"No tottime regressions against {args.baseline}.")